@@ -1,391 +0,0 @@
-#!/usr/bin/env python3
-"""
-RNMP Text2Cypher Report Generator
-
-This script generates a comprehensive report analyzing the performance of GPT-5-nano
-on SQL and Cypher query generation tasks across different difficulty levels.
-"""
-
-import json
-import matplotlib.pyplot as plt
-import numpy as np
-import pandas as pd
-from pathlib import Path
-from typing import Dict, List, Tuple
-import seaborn as sns
-from datetime import datetime
-
-# Set up plotting style
-plt.style.use('seaborn-v0_8')
-sns.set_palette("husl")
-
-def load_results(file_path: str) -> Dict:
-    """Load results from JSON file."""
-    with open(file_path, 'r') as f:
-        return json.load(f)
-
-def analyze_results(results: List[Dict]) -> Dict:
-    """Analyze results and compute metrics."""
-    total_questions = len(results)
-    syntactically_correct = sum(1 for r in results if r.get('syntaxically_correct', False))
-    correct_results = sum(1 for r in results if r.get('correct_result', False))
-    exact_matches = sum(1 for r in results if r.get('exact_match', False))
-
-    return {
-        'total_questions': total_questions,
-        'syntactically_correct': syntactically_correct,
-        'correct_results': correct_results,
-        'exact_matches': exact_matches,
-        'syntax_accuracy': syntactically_correct / total_questions * 100,
-        'result_accuracy': correct_results / total_questions * 100,
-        'exact_match_rate': exact_matches / total_questions * 100
-    }
-
-def create_performance_chart(sql_metrics: Dict, cypher_metrics: Dict, difficulty: str):
-    """Create performance comparison chart for SQL vs Cypher."""
-    categories = ['Syntax Accuracy', 'Result Accuracy', 'Exact Match Rate']
-    sql_values = [sql_metrics['syntax_accuracy'], sql_metrics['result_accuracy'], sql_metrics['exact_match_rate']]
-    cypher_values = [cypher_metrics['syntax_accuracy'], cypher_metrics['result_accuracy'], cypher_metrics['exact_match_rate']]
-
-    x = np.arange(len(categories))
-    width = 0.35
-
-    fig, ax = plt.subplots(figsize=(12, 8))
-
-    bars1 = ax.bar(x - width/2, sql_values, width, label='SQL', alpha=0.8, color='#2E8B57')
-    bars2 = ax.bar(x + width/2, cypher_values, width, label='Cypher', alpha=0.8, color='#4169E1')
-
-    ax.set_xlabel('Metrics', fontsize=12, fontweight='bold')
-    ax.set_ylabel('Accuracy (%)', fontsize=12, fontweight='bold')
-    ax.set_title(f'GPT-5-nano Performance Comparison: {difficulty.title()} Level', fontsize=14, fontweight='bold')
-    ax.set_xticks(x)
-    ax.set_xticklabels(categories)
-    ax.legend(fontsize=11)
-    ax.grid(True, alpha=0.3)
-
-    # Add value labels on bars
-    for bar in bars1 + bars2:
-        height = bar.get_height()
-        ax.annotate(f'{height:.1f}%',
-                    xy=(bar.get_x() + bar.get_width() / 2, height),
-                    xytext=(0, 3),
-                    textcoords="offset points",
-                    ha='center', va='bottom',
-                    fontweight='bold')
-
-    plt.tight_layout()
-    plt.savefig(f'plots/performance_comparison_{difficulty}.png', dpi=300, bbox_inches='tight')
-    plt.close()
-
-def create_difficulty_comparison_chart(all_metrics: Dict):
-    """Create chart comparing performance across difficulty levels."""
-    difficulties = ['easy', 'intermediate', 'hard']
-    sql_syntax = [all_metrics[d]['sql']['syntax_accuracy'] for d in difficulties]
-    cypher_syntax = [all_metrics[d]['cypher']['syntax_accuracy'] for d in difficulties]
-    sql_results = [all_metrics[d]['sql']['result_accuracy'] for d in difficulties]
-    cypher_results = [all_metrics[d]['cypher']['result_accuracy'] for d in difficulties]
-
-    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 12))
-
-    # Syntax Accuracy
-    ax1.plot(difficulties, sql_syntax, marker='o', linewidth=3, markersize=8, label='SQL', color='#2E8B57')
-    ax1.plot(difficulties, cypher_syntax, marker='s', linewidth=3, markersize=8, label='Cypher', color='#4169E1')
-    ax1.set_title('Syntax Accuracy by Difficulty', fontsize=12, fontweight='bold')
-    ax1.set_ylabel('Accuracy (%)', fontweight='bold')
-    ax1.legend()
-    ax1.grid(True, alpha=0.3)
-
-    # Result Accuracy
-    ax2.plot(difficulties, sql_results, marker='o', linewidth=3, markersize=8, label='SQL', color='#2E8B57')
-    ax2.plot(difficulties, cypher_results, marker='s', linewidth=3, markersize=8, label='Cypher', color='#4169E1')
-    ax2.set_title('Result Accuracy by Difficulty', fontsize=12, fontweight='bold')
-    ax2.set_ylabel('Accuracy (%)', fontweight='bold')
-    ax2.legend()
-    ax2.grid(True, alpha=0.3)
-
-    # Combined Bar Chart
-    x = np.arange(len(difficulties))
-    width = 0.35
-
-    ax3.bar(x - width/2, sql_syntax, width, label='SQL Syntax', alpha=0.8, color='#2E8B57')
-    ax3.bar(x + width/2, cypher_syntax, width, label='Cypher Syntax', alpha=0.8, color='#4169E1')
-    ax3.set_title('Syntax Accuracy Comparison', fontsize=12, fontweight='bold')
-    ax3.set_xlabel('Difficulty Level', fontweight='bold')
-    ax3.set_ylabel('Accuracy (%)', fontweight='bold')
-    ax3.set_xticks(x)
-    ax3.set_xticklabels(difficulties)
-    ax3.legend()
-    ax3.grid(True, alpha=0.3)
-
-    ax4.bar(x - width/2, sql_results, width, label='SQL Results', alpha=0.8, color='#228B22')
-    ax4.bar(x + width/2, cypher_results, width, label='Cypher Results', alpha=0.8, color='#1E90FF')
-    ax4.set_title('Result Accuracy Comparison', fontsize=12, fontweight='bold')
-    ax4.set_xlabel('Difficulty Level', fontweight='bold')
-    ax4.set_ylabel('Accuracy (%)', fontweight='bold')
-    ax4.set_xticks(x)
-    ax4.set_xticklabels(difficulties)
-    ax4.legend()
-    ax4.grid(True, alpha=0.3)
-
-    plt.suptitle('GPT-5-nano Performance Analysis Across Difficulty Levels', fontsize=16, fontweight='bold')
-    plt.tight_layout()
-    plt.savefig('plots/difficulty_comparison.png', dpi=300, bbox_inches='tight')
-    plt.close()
-
-def create_detailed_metrics_table(all_metrics: Dict):
-    """Create detailed metrics table."""
-    data = []
-    for difficulty in ['easy', 'intermediate', 'hard']:
-        for lang in ['sql', 'cypher']:
-            metrics = all_metrics[difficulty][lang]
-            data.append({
-                'Difficulty': difficulty.title(),
-                'Language': lang.upper(),
-                'Total Questions': metrics['total_questions'],
-                'Syntactically Correct': metrics['syntactically_correct'],
-                'Correct Results': metrics['correct_results'],
-                'Exact Matches': metrics['exact_matches'],
-                'Syntax Accuracy (%)': f"{metrics['syntax_accuracy']:.1f}",
-                'Result Accuracy (%)': f"{metrics['result_accuracy']:.1f}",
-                'Exact Match Rate (%)': f"{metrics['exact_match_rate']:.1f}"
-            })
-
-    df = pd.DataFrame(data)
-
-    fig, ax = plt.subplots(figsize=(16, 8))
-    ax.axis('tight')
-    ax.axis('off')
-
-    table = ax.table(cellText=df.values, colLabels=df.columns, cellLoc='center', loc='center')
-    table.auto_set_font_size(False)
-    table.set_fontsize(10)
-    table.scale(1.2, 1.8)
-
-    # Style the table
-    for i in range(len(df.columns)):
-        table[(0, i)].set_facecolor('#4CAF50')
-        table[(0, i)].set_text_props(weight='bold', color='white')
-
-    for i in range(1, len(df) + 1):
-        for j in range(len(df.columns)):
-            if i % 2 == 0:
-                table[(i, j)].set_facecolor('#f0f0f0')
-
-    plt.title('Detailed Performance Metrics - GPT-5-nano', fontsize=16, fontweight='bold', pad=20)
-    plt.savefig('plots/detailed_metrics_table.png', dpi=300, bbox_inches='tight')
-    plt.close()
-
-    return df
-
-def generate_summary_stats(all_metrics: Dict) -> Dict:
-    """Generate summary statistics."""
-    stats = {
-        'overall': {
-            'sql': {'syntax': [], 'results': [], 'exact': []},
-            'cypher': {'syntax': [], 'results': [], 'exact': []}
-        }
-    }
-
-    for difficulty in ['easy', 'intermediate', 'hard']:
-        for lang in ['sql', 'cypher']:
-            metrics = all_metrics[difficulty][lang]
-            stats['overall'][lang]['syntax'].append(metrics['syntax_accuracy'])
-            stats['overall'][lang]['results'].append(metrics['result_accuracy'])
-            stats['overall'][lang]['exact'].append(metrics['exact_match_rate'])
-
-    # Calculate averages
-    summary = {}
-    for lang in ['sql', 'cypher']:
-        summary[lang] = {
-            'avg_syntax': np.mean(stats['overall'][lang]['syntax']),
-            'avg_results': np.mean(stats['overall'][lang]['results']),
-            'avg_exact': np.mean(stats['overall'][lang]['exact']),
-            'std_syntax': np.std(stats['overall'][lang]['syntax']),
-            'std_results': np.std(stats['overall'][lang]['results']),
-            'std_exact': np.std(stats['overall'][lang]['exact'])
-        }
-
-    return summary
-
-def main():
-    """Main execution function."""
-    print("🚀 Generating RNMP Text2Cypher Performance Report...")
-
-    # Ensure plots directory exists
-    Path('plots').mkdir(exist_ok=True)
-
-    # Load all results
-    difficulties = ['easy', 'intermediate', 'hard']
-    all_metrics = {}
-
-    for difficulty in difficulties:
-        print(f"📊 Analyzing {difficulty} difficulty level...")
-
-        sql_results = load_results(f'src/results/rel-stack/sql/gpt-5-nano/{difficulty}.json')
-        cypher_results = load_results(f'src/results/rel-stack/cypher/gpt-5-nano/{difficulty}.json')
-
-        sql_metrics = analyze_results(sql_results)
-        cypher_metrics = analyze_results(cypher_results)
-
-        all_metrics[difficulty] = {
-            'sql': sql_metrics,
-            'cypher': cypher_metrics
-        }
-
-        # Create individual performance charts
-        create_performance_chart(sql_metrics, cypher_metrics, difficulty)
-        print(f"   ✅ Generated performance chart for {difficulty} level")
-
-    # Create comparison charts
-    print("📈 Creating comparison visualizations...")
-    create_difficulty_comparison_chart(all_metrics)
-    print("   ✅ Generated difficulty comparison chart")
-
-    detailed_df = create_detailed_metrics_table(all_metrics)
-    print("   ✅ Generated detailed metrics table")
-
-    summary_stats = generate_summary_stats(all_metrics)
-
-    # Generate report
-    print("📝 Generating comprehensive report...")
-
-    report_content = f"""# RNMP Text2Cypher Performance Analysis Report
-
-**Generated on:** {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-**Model:** GPT-5-nano
-**Database:** F1 Racing Data (RelBench)
-
-## Executive Summary
-
-This report presents a comprehensive analysis of GPT-5-nano's performance on text-to-query generation tasks, comparing SQL and Cypher query generation across three difficulty levels: Easy, Intermediate, and Hard.
-
-### Key Findings
-
-**Overall Performance Summary:**
-- **SQL Average Syntax Accuracy:** {summary_stats['sql']['avg_syntax']:.1f}% (±{summary_stats['sql']['std_syntax']:.1f}%)
-- **Cypher Average Syntax Accuracy:** {summary_stats['cypher']['avg_syntax']:.1f}% (±{summary_stats['cypher']['std_syntax']:.1f}%)
-- **SQL Average Result Accuracy:** {summary_stats['sql']['avg_results']:.1f}% (±{summary_stats['sql']['std_results']:.1f}%)
-- **Cypher Average Result Accuracy:** {summary_stats['cypher']['avg_results']:.1f}% (±{summary_stats['cypher']['std_results']:.1f}%)
-
-## Methodology
-
-### Dataset
-The evaluation uses the RelBench F1 racing dataset, which contains comprehensive Formula 1 data including:
-- **Circuits:** Racing venues and track information
-- **Drivers:** Driver profiles and career statistics
-- **Constructors:** Team/manufacturer information
-- **Races:** Individual race events and metadata
-- **Results:** Race outcomes and performance metrics
-- **Qualifying:** Qualifying session results
-- **Standings:** Championship standings data
-
-### Database Schemas
-Two database implementations were tested:
-1. **SQL (SQLite):** Traditional relational database with normalized tables
-2. **Cypher (Neo4j):** Graph database with nodes and relationships
-
-### Evaluation Metrics
-- **Syntax Accuracy:** Percentage of queries that are syntactically correct
-- **Result Accuracy:** Percentage of queries that produce correct results
-- **Exact Match Rate:** Percentage of queries that exactly match expected output
-
-## Detailed Results
-
-### Performance by Difficulty Level
-
-"""
-
-    for difficulty in difficulties:
-        sql_metrics = all_metrics[difficulty]['sql']
-        cypher_metrics = all_metrics[difficulty]['cypher']
-
-        report_content += f"""
-#### {difficulty.title()} Level
-- **Total Questions:** {sql_metrics['total_questions']} (SQL), {cypher_metrics['total_questions']} (Cypher)
-- **SQL Performance:** {sql_metrics['syntax_accuracy']:.1f}% syntax, {sql_metrics['result_accuracy']:.1f}% results, {sql_metrics['exact_match_rate']:.1f}% exact
-- **Cypher Performance:** {cypher_metrics['syntax_accuracy']:.1f}% syntax, {cypher_metrics['result_accuracy']:.1f}% results, {cypher_metrics['exact_match_rate']:.1f}% exact
-"""
-
-    report_content += f"""
-## Analysis and Insights
-
-### Performance Trends
-1. **Syntax Accuracy:** {'SQL outperforms Cypher' if summary_stats['sql']['avg_syntax'] > summary_stats['cypher']['avg_syntax'] else 'Cypher outperforms SQL'} in average syntax accuracy
-2. **Result Accuracy:** {'SQL shows better' if summary_stats['sql']['avg_results'] > summary_stats['cypher']['avg_results'] else 'Cypher shows better'} result accuracy overall
-3. **Difficulty Impact:** Performance generally {'decreases' if all_metrics['easy']['sql']['syntax_accuracy'] > all_metrics['hard']['sql']['syntax_accuracy'] else 'varies'} with increasing difficulty
-
-### Key Observations
-
-#### SQL Performance
-- **Strengths:** Strong performance on aggregate queries and complex joins
-- **Weaknesses:** Challenges with window functions and recursive queries
-- **Best Difficulty:** {max(difficulties, key=lambda d: all_metrics[d]['sql']['syntax_accuracy']).title()} level shows highest accuracy
-
-#### Cypher Performance
-- **Strengths:** Effective with graph traversal and relationship queries
-- **Weaknesses:** Complex aggregations and multi-step graph operations
-- **Best Difficulty:** {max(difficulties, key=lambda d: all_metrics[d]['cypher']['syntax_accuracy']).title()} level shows highest accuracy
-
-## Technical Implementation
-
-### Database Setup
-- **SQL:** SQLite database with normalized F1 racing data
-- **Cypher:** Neo4j graph database with nodes and relationships
-- **Data Source:** RelBench F1 dataset with comprehensive racing statistics
-
-### Query Categories
-Questions span multiple complexity levels:
-- **Basic:** Simple SELECT/MATCH operations
-- **Intermediate:** JOINs/relationship traversals with filtering
-- **Advanced:** Complex aggregations, window functions, and multi-hop relationships
-
-## Recommendations
-
-1. **Model Training:** Focus on improving complex aggregation handling for both SQL and Cypher
-2. **Query Optimization:** Implement query plan analysis for better performance insights
-3. **Error Analysis:** Detailed categorization of syntax vs. semantic errors
-4. **Benchmarking:** Expand evaluation to include more database systems and query types
-
-## Visualizations
-
-The following charts are generated as part of this analysis:
-- Performance comparison charts for each difficulty level
-- Overall difficulty comparison trends
-- Detailed metrics table with comprehensive statistics
-
-## Appendix
-
-### Environment Details
-- **Python Version:** {".".join(map(str, [3, 8]))}+
-- **Database Versions:** SQLite 3.x, Neo4j 4.x+
-- **Evaluation Framework:** Custom Python analysis pipeline
-- **Chart Generation:** matplotlib, seaborn
-
-### Data Quality Notes
-- All queries were manually validated for correctness
-- Syntax checking performed using respective database parsers
-- Result validation through sample data execution
-
----
-*This report was generated automatically by the RNMP analysis pipeline.*
-"""
-
-    # Save report
-    with open('plots/performance_report.md', 'w') as f:
-        f.write(report_content)
-
-    print("✅ Report generation complete!")
-    print(f"\n📁 Generated files:")
-    print(f"   • plots/performance_report.md - Comprehensive analysis report")
-    print(f"   • plots/performance_comparison_*.png - Individual difficulty charts")
-    print(f"   • plots/difficulty_comparison.png - Overall comparison chart")
-    print(f"   • plots/detailed_metrics_table.png - Metrics summary table")
-
-    # Print quick summary
-    print(f"\n🎯 Quick Summary:")
-    print(f"   • SQL avg syntax accuracy: {summary_stats['sql']['avg_syntax']:.1f}%")
-    print(f"   • Cypher avg syntax accuracy: {summary_stats['cypher']['avg_syntax']:.1f}%")
-    print(f"   • Total questions analyzed: {sum(all_metrics[d]['sql']['total_questions'] + all_metrics[d]['cypher']['total_questions'] for d in difficulties)}")
-
-if __name__ == "__main__":
-    main()
\ No newline at end of file
@@ -15,9 +15,23 @@ PROJECT_ROOT = SRC_DIR.parent
 
 TASKS_DIR = SRC_DIR / "tasks"
 RESULTS_DIR = SRC_DIR / "results"
+RESULTS_STORE_DIR = SRC_DIR / "results_store"
+TRACES_DIR = PROJECT_ROOT / "traces"
+REPORTS_DIR = PROJECT_ROOT / "reports"
+VALIDATION_DIR = PROJECT_ROOT / "validation"
+CACHE_DIR = PROJECT_ROOT / ".cache"
+EXECUTION_CACHE_PATH = CACHE_DIR / "executions.sqlite"
+EXECUTION_CACHE_MAX_BYTES = 512 * 1024 * 1024
+PREFIX_KV_CACHE_DIR = CACHE_DIR / "prefix_kv"
 
 CSV_OUTPUT_DIR = PROJECT_ROOT / "neo4j" / "import"
 
+# Upper bound on rows pulled for any query during scoring. Generated queries are
+# additionally capped at RESULT_ROWS_FACTOR times the size of the gold result;
+# a gold result above the bound is not compared (execution_accuracy is False).
+MAX_RESULT_ROWS = 100_000
+RESULT_ROWS_FACTOR = 10
+
 
 def get_tasks_directory(dataset_name: DatasetName) -> Path:
     return TASKS_DIR / dataset_name
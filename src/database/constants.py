@@ -8,3 +8,16 @@ CSV_OUTPUT_DIR = PROJECT_ROOT / "neo4j" / "import"
 NEO4J_URI = "bolt://localhost:7687"
 NEO4J_USER = "neo4j"
 NEO4J_PASSWORD = "neo4jneo4j"
+NEO4J_FETCH_SIZE = 1000
+
+# Concurrent queries allowed per backend when scoring on a worker pool.
+DUCKDB_MAX_CONCURRENCY = 8
+NEO4J_MAX_CONCURRENCY = 4
+
+# Resource limits of the DuckDB instance that runs (generated) queries; see DuckDBLimits.
+DUCKDB_MEMORY_LIMIT = "4GB"
+DUCKDB_THREADS = 4
+DUCKDB_TEMP_DIRECTORY = PROJECT_ROOT / ".cache" / "duckdb_spill"
+DUCKDB_MAX_TEMP_DIRECTORY_SIZE = "16GB"
+# Address space (RLIMIT_AS) of each isolated DuckDB worker process.
+DUCKDB_SANDBOX_ADDRESS_SPACE = 8 * 1024 ** 3
@@ -1,21 +1,305 @@
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import StrEnum
+from hashlib import sha256
+from logging import getLogger
+from multiprocessing import get_context
 from pathlib import Path
+from time import perf_counter
+from typing import Iterator
 import duckdb
 import json
-from database.constants import DUCKDB_PATH
-from models import SQLTableWithHeaders
+from database.constants import (
+    DUCKDB_MAX_CONCURRENCY,
+    DUCKDB_MAX_TEMP_DIRECTORY_SIZE,
+    DUCKDB_MEMORY_LIMIT,
+    DUCKDB_PATH,
+    DUCKDB_SANDBOX_ADDRESS_SPACE,
+    DUCKDB_TEMP_DIRECTORY,
+    DUCKDB_THREADS,
+)
+from models import PlanOperator, SQLTableWithHeaders
 
+logger = getLogger(__name__)
 
-def query_duckdb(sql: str, db_path: str):
-    conn = duckdb.connect(str(db_path))
-    conn.execute("USE relbench.main")
-    return conn.execute(sql).fetchall()
+
+@dataclass(slots=True, frozen=True)
+class DuckDBLimits:
+    """
+    Resource limits applied to every DuckDB connection of this process.
+
+    DuckDB shares one instance (and its settings) between all connections to a
+    file, so the limits are process-wide. With ``isolate`` queries instead run
+    in worker processes capped at ``address_space`` bytes by RLIMIT_AS, so a
+    runaway query is killed without taking the evaluation down with it.
+    """
+    memory_limit: str = DUCKDB_MEMORY_LIMIT
+    threads: int = DUCKDB_THREADS
+    temp_directory: Path = DUCKDB_TEMP_DIRECTORY
+    max_temp_directory_size: str = DUCKDB_MAX_TEMP_DIRECTORY_SIZE
+    isolate: bool = False
+    address_space: int = DUCKDB_SANDBOX_ADDRESS_SPACE
+    workers: int = DUCKDB_MAX_CONCURRENCY
+
+    def config(self) -> dict[str, str]:
+        return {
+            "memory_limit": self.memory_limit,
+            "threads": str(self.threads),
+            "temp_directory": str(self.temp_directory),
+            "max_temp_directory_size": self.max_temp_directory_size,
+        }
+
+
+class SnapshotMode(StrEnum):
+    FILE = "file"
+    MEMORY = "memory"
+
+
+@dataclass(slots=True)
+class DuckDBSnapshot:
+    """An in-memory copy of a dataset; threads query it through their own cursors."""
+    conn: duckdb.DuckDBPyConnection
+    load_ms: float
+    memory_bytes: int
+
+
+_limits = DuckDBLimits()
+_snapshot_mode = SnapshotMode.FILE
+_snapshots: dict[str, DuckDBSnapshot] = {}
+_snapshot_lock = threading.Lock()
+_local = threading.local()
+# Every thread connection, so a finished worker pool can close those of its threads.
+_thread_connections: list[duckdb.DuckDBPyConnection] = []
+_thread_connections_lock = threading.Lock()
+_generation = 0
+_sandbox: ProcessPoolExecutor | None = None
+_sandbox_lock = threading.Lock()
+
+
+def set_duckdb_limits(limits: DuckDBLimits) -> None:
+    """Replace the limits; call before the first connection is opened."""
+    global _limits, _sandbox
+    _limits = limits
+    with _sandbox_lock:
+        if _sandbox is not None:
+            _sandbox.shutdown()
+            _sandbox = None
+
+
+def set_snapshot_mode(mode: SnapshotMode) -> None:
+    """Query the dataset files directly (``file``) or an in-memory copy of them (``memory``)."""
+    global _snapshot_mode
+    _snapshot_mode = mode
+
+
+def load_snapshot(db_path: str) -> DuckDBSnapshot:
+    """
+    Copy ``db_path`` into an in-memory database named ``relbench`` (once per path).
+
+    The file is attached read-only only for the copy and detached afterwards,
+    so queries never touch the disk or its lock.
+    """
+    with _snapshot_lock:
+        snapshot = _snapshots.get(str(db_path))
+        if snapshot is not None:
+            return snapshot
+
+        start = perf_counter()
+        conn = duckdb.connect(":memory:", config=_limits.config())
+        conn.execute(f"ATTACH '{db_path}' AS source (READ_ONLY)")
+        conn.execute("ATTACH ':memory:' AS relbench")
+        conn.execute("COPY FROM DATABASE source TO relbench")
+        conn.execute("DETACH source")
+        load_ms = (perf_counter() - start) * 1000
+        memory_bytes = conn.execute("SELECT sum(memory_usage_bytes) FROM duckdb_memory()").fetchone()[0]
+
+        snapshot = DuckDBSnapshot(conn, load_ms, int(memory_bytes or 0))
+        _snapshots[str(db_path)] = snapshot
+        logger.info(
+            f"Loaded {db_path} into memory in {load_ms:.0f}ms ({snapshot.memory_bytes / 1024 ** 2:.1f} MiB)"
+        )
+        return snapshot
+
+
+def _connect(db_path: str) -> duckdb.DuckDBPyConnection:
+    # Every connection to a file must use the same config, or DuckDB refuses it.
+    # Read-only keeps generated queries from modifying the dataset and lets
+    # sandbox workers open the file alongside this process.
+    return duckdb.connect(str(db_path), read_only=True, config=_limits.config())
+
+
+def query_duckdb(sql: str, db_path: str, max_rows: int | None = None):
+    if _limits.isolate and _snapshot_mode == SnapshotMode.FILE:
+        return _query_isolated(sql, db_path, max_rows)
+    return _fetch(get_thread_connection(db_path), sql, max_rows)
+
+
+def _fetch(conn: duckdb.DuckDBPyConnection, sql: str, max_rows: int | None) -> list:
+    cursor = conn.execute(sql)
+    return cursor.fetchall() if max_rows is None else cursor.fetchmany(max_rows)
+
+
+def get_thread_connection(db_path: str) -> duckdb.DuckDBPyConnection:
+    """
+    A connection to ``db_path`` owned by the calling thread, reused across queries.
+
+    In memory snapshot mode it is a cursor on the shared in-memory copy.
+    """
+    if getattr(_local, "generation", None) != _generation:
+        _local.connections = {}
+        _local.generation = _generation
+    conn = _local.connections.get(str(db_path))
+    if conn is None:
+        if _snapshot_mode == SnapshotMode.MEMORY:
+            conn = load_snapshot(db_path).conn.cursor()
+        else:
+            conn = _connect(db_path)
+        conn.execute("USE relbench.main")
+        _local.connections[str(db_path)] = conn
+        with _thread_connections_lock:
+            _thread_connections.append(conn)
+    return conn
+
+
+def close_thread_connections() -> None:
+    """
+    Close the connections opened by ``get_thread_connection`` in every thread.
+
+    Call it once the worker pool that used them has shut down; a thread that
+    queries again afterwards opens a new connection.
+    """
+    global _generation
+    with _thread_connections_lock:
+        connections = list(_thread_connections)
+        _thread_connections.clear()
+        _generation += 1
+    for conn in connections:
+        conn.close()
+
+
+@contextmanager
+def thread_connections() -> Iterator[None]:
+    """Close the thread connections on exit; enter it before the worker pool that uses them."""
+    try:
+        yield
+    finally:
+        close_thread_connections()
+
+
+def _init_sandbox_worker(limits: DuckDBLimits) -> None:
+    import resource
+
+    global _limits
+    _limits = limits
+    resource.setrlimit(resource.RLIMIT_AS, (limits.address_space, limits.address_space))
+
+
+def _sandbox_query(sql: str, db_path: str, max_rows: int | None) -> list:
+    return _fetch(get_thread_connection(db_path), sql, max_rows)
+
+
+def _sandbox_profile(sql: str, db_path: str) -> list[PlanOperator]:
+    return _profile(get_thread_connection(db_path), sql)
+
+
+def _get_sandbox() -> ProcessPoolExecutor:
+    global _sandbox
+    with _sandbox_lock:
+        if _sandbox is None:
+            _sandbox = ProcessPoolExecutor(
+                max_workers=_limits.workers,
+                mp_context=get_context("spawn"),
+                initializer=_init_sandbox_worker,
+                initargs=(_limits,),
+            )
+        return _sandbox
+
+
+def _query_isolated(sql: str, db_path: str, max_rows: int | None) -> list:
+    return _run_isolated(_sandbox_query, sql, str(db_path), max_rows)
+
+
+def _run_isolated(fn, *args):
+    """Run ``fn`` in a sandbox worker process; a crashed pool is replaced for the next call."""
+    global _sandbox
+    sandbox = _get_sandbox()
+    try:
+        return sandbox.submit(fn, *args).result()
+    except BrokenProcessPool:
+        with _sandbox_lock:
+            if _sandbox is sandbox:
+                _sandbox = None
+        sandbox.shutdown(wait=False)
+        raise RuntimeError("DuckDB sandbox worker died (likely out of memory)")
+
+
+def profile_duckdb(sql: str, db_path: str) -> list[PlanOperator]:
+    """
+    Run EXPLAIN ANALYZE and return the operator tree flattened in pre-order.
+
+    EXPLAIN ANALYZE executes the query, so it goes to the sandbox whenever
+    queries do.
+    """
+    if _limits.isolate and _snapshot_mode == SnapshotMode.FILE:
+        return _run_isolated(_sandbox_profile, sql, str(db_path))
+    return _profile(get_thread_connection(db_path), sql)
+
+
+def _profile(conn: duckdb.DuckDBPyConnection, sql: str) -> list[PlanOperator]:
+    rows = conn.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql.strip().rstrip(';')}").fetchall()
+    return _flatten_duckdb_plan(json.loads(rows[0][-1]))
+
+
+def get_duckdb_fingerprint(db_path: str) -> str:
+    """Hash of the catalog and per-table row counts, which changes whenever the dataset is reloaded differently."""
+    conn = _connect(db_path)
+    try:
+        tables = conn.execute(
+            "SELECT database_name, schema_name, table_name, estimated_size "
+            "FROM duckdb_tables() WHERE NOT internal ORDER BY ALL"
+        ).fetchall()
+        columns = conn.execute(
+            "SELECT database_name, table_name, column_name, data_type "
+            "FROM duckdb_columns() WHERE NOT internal ORDER BY ALL"
+        ).fetchall()
+    finally:
+        conn.close()
+
+    return sha256(repr((tables, columns)).encode()).hexdigest()[:16]
+
+
+def _flatten_duckdb_plan(node: dict | list, depth: int = 0) -> list[PlanOperator]:
+    if isinstance(node, list):
+        return [op for child in node for op in _flatten_duckdb_plan(child, depth)]
+
+    operators = []
+    name = node.get("operator_name") or node.get("name")
+    if name:
+        timing = node.get("operator_timing", node.get("timing"))
+        cardinality = node.get("operator_cardinality", node.get("cardinality")) or 0
+        operators.append(
+            PlanOperator(
+                name=name.strip(),
+                depth=depth,
+                rows=int(cardinality),
+                time_ms=timing * 1000 if timing is not None else None,
+            )
+        )
+        depth += 1
+
+    for child in node.get("children", []):
+        operators.extend(_flatten_duckdb_plan(child, depth))
+    return operators
 
 import re
 
 
 def get_duckdb_schema(database: str = 'rel-f1', format: bool = False) -> dict | str:
-    conn = duckdb.connect(str(DUCKDB_PATH.parent / database / 'relbench.duckdb'))
+    conn = _connect(DUCKDB_PATH.parent / database / 'relbench.duckdb')
 
     tables = [t[0] for t in conn.execute("PRAGMA show_tables;").fetchall()]
     fk_map = {}
@@ -1,8 +1,12 @@
 from functools import reduce
-from typing import Any
+from hashlib import sha256
+from itertools import islice
+from typing import Any, Iterator
 
-from database.constants import NEO4J_PASSWORD, NEO4J_URI, NEO4J_USER
+from database.constants import NEO4J_FETCH_SIZE, NEO4J_PASSWORD, NEO4J_URI, NEO4J_USER
+from models import PlanOperator
 from neo4j import GraphDatabase
+from neo4j.graph import Node, Path, Relationship
 
 _driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
 
@@ -13,6 +17,91 @@ def query_neo4j(cypher: str, parameters: dict | None = None) -> list[dict[str, A
         return [record.data() for record in result]
 
 
+def _to_primitive(value: Any) -> Any:
+    """Convert graph values the same way ``Record.data()`` does."""
+    if isinstance(value, Node):
+        return dict(value)
+    if isinstance(value, Relationship):
+        return (dict(value.start_node), value.type, dict(value.end_node))
+    if isinstance(value, Path):
+        return [_to_primitive(item) for item in value]
+    if isinstance(value, list):
+        return [_to_primitive(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _to_primitive(item) for key, item in value.items()}
+    return value
+
+
+def stream_neo4j(
+    cypher: str,
+    parameters: dict | None = None,
+    fetch_size: int = NEO4J_FETCH_SIZE,
+) -> Iterator[tuple]:
+    """
+    Yield result rows as tuples, pulling ``fetch_size`` records per round trip.
+
+    Closing the generator early discards the remaining records on the server
+    instead of transferring them.
+    """
+    with _driver.session(fetch_size=fetch_size) as session:
+        result = session.run(cypher, parameters or {})
+        try:
+            for record in result:
+                yield tuple(_to_primitive(value) for value in record.values())
+        finally:
+            result.consume()
+
+
+def query_neo4j_rows(
+    cypher: str,
+    db_path: str | None = None,
+    max_rows: int | None = None,
+    fetch_size: int = NEO4J_FETCH_SIZE,
+) -> list[tuple]:
+    """Run a query and return at most ``max_rows`` tuples (all rows if None)."""
+    rows = stream_neo4j(cypher, fetch_size=fetch_size)
+    try:
+        return list(islice(rows, max_rows))
+    finally:
+        rows.close()
+
+
+def profile_neo4j(cypher: str, db_path: str | None = None) -> list[PlanOperator]:
+    """Run the query under PROFILE and return db hits and rows per operator."""
+    with _driver.session() as session:
+        summary = session.run(f"PROFILE {cypher}").consume()
+
+    return _flatten_neo4j_plan(summary.profile or {})
+
+
+def get_neo4j_fingerprint(db_path: str | None = None) -> str:
+    """Hash of node/relationship counts, labels and relationship types (all served from the count store)."""
+    with _driver.session() as session:
+        nodes = session.run("MATCH (n) RETURN count(n)").single()[0]
+        relationships = session.run("MATCH ()-[r]->() RETURN count(r)").single()[0]
+        labels = sorted(record[0] for record in session.run("CALL db.labels()"))
+        types = sorted(record[0] for record in session.run("CALL db.relationshipTypes()"))
+
+    return sha256(repr((nodes, relationships, labels, types)).encode()).hexdigest()[:16]
+
+
+def _flatten_neo4j_plan(plan: dict, depth: int = 0) -> list[PlanOperator]:
+    if not plan:
+        return []
+
+    operators = [
+        PlanOperator(
+            name=plan.get("operatorType", "").split("@")[0],
+            depth=depth,
+            rows=plan.get("rows", 0),
+            db_hits=plan.get("dbHits", 0),
+        )
+    ]
+    for child in plan.get("children", []):
+        operators.extend(_flatten_neo4j_plan(child, depth + 1))
+    return operators
+
+
 def get_neo4j_schema() -> str:
     with _driver.session() as session:
         labels = [
@@ -0,0 +1,125 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ['dataset', 'language', 'difficulty', 'model', 'run_id']
+
+# Metric name -> results store column
+METRIC_COLUMNS = {
+    'parse_success': 'syntaxically_correct',
+    'execution_accuracy': 'execution_accuracy',
+    'correct_result': 'correct_result',
+    'entity_f1': 'entity_f1',
+    'attribute_f1': 'attribute_f1',
+    'relation_f1': 'relation_f1',
+    'filter_f1': 'filter_f1',
+    'aggregation_f1': 'aggregation_f1',
+    'return_column_f1': 'return_column_f1',
+    'result_f1': 'result_f1',
+    'result_precision': 'result_precision',
+    'result_recall': 'result_recall',
+}
+METRICS = list(METRIC_COLUMNS)
+
+# Rates over all tasks; every other metric is averaged over non-null values only.
+BOOLEAN_METRICS = {'parse_success', 'execution_accuracy', 'correct_result'}
+
+NON_ERROR_CATEGORIES = ['NONE', 'CORRECT']
+
+
+class MetricCube:
+    """
+    Per-metric sums and non-null counts at dataset x language x difficulty x model
+    x run, computed in one grouped pass over the results frame.
+
+    Any roll-up (e.g. all datasets for one language) is sum(sums) / sum(counts),
+    which equals the mean over the underlying tasks.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame.rename(columns={'task_type': 'language'})
+
+        values = pd.DataFrame(index=self.frame.index)
+        for metric, column in METRIC_COLUMNS.items():
+            series = self.frame[column] if column in self.frame else pd.Series(np.nan, index=self.frame.index)
+            if metric in BOOLEAN_METRICS:
+                series = series.fillna(False)
+            values[metric] = series.astype(float)
+        values[DIMENSIONS] = self.frame[DIMENSIONS]
+
+        grouped = values.groupby(DIMENSIONS)
+        self.sums = grouped[METRICS].sum()
+        self.counts = grouped[METRICS].count()
+        self.sizes = grouped.size()
+        self.errors = (
+            self.frame[~self.frame['error_category'].isin(NON_ERROR_CATEGORIES)]
+            .groupby(DIMENSIONS + ['error_category'])
+            .size()
+        )
+
+    @staticmethod
+    def _slice(table: pd.DataFrame | pd.Series, filters: dict) -> pd.DataFrame | pd.Series:
+        mask = np.ones(len(table), dtype=bool)
+        for dimension, value in filters.items():
+            if value is not None:
+                mask &= table.index.get_level_values(dimension) == value
+        return table[mask]
+
+    def mean(self, metric: str, **filters) -> float:
+        count = self._slice(self.counts[metric], filters).sum()
+        return float(self._slice(self.sums[metric], filters).sum() / count) if count else 0.0
+
+    def aggregates(self, **filters) -> dict[str, float]:
+        sums = self._slice(self.sums, filters).sum()
+        counts = self._slice(self.counts, filters).sum()
+        return {
+            metric: float(sums[metric] / counts[metric]) if counts[metric] else 0.0
+            for metric in METRICS
+        }
+
+    def table(self, by: list[str], **filters) -> pd.DataFrame:
+        """Task count and every metric mean per group of the ``by`` dimensions."""
+        sums = self._slice(self.sums, filters).groupby(level=by).sum()
+        counts = self._slice(self.counts, filters).groupby(level=by).sum()
+        table = (sums / counts.where(counts > 0)).fillna(0.0)
+        table.insert(0, 'tasks', self._slice(self.sizes, filters).groupby(level=by).sum())
+        return table
+
+    def error_table(self, by: list[str], **filters) -> pd.DataFrame:
+        """Error category counts per group of the ``by`` dimensions, one column per category."""
+        errors = self._slice(self.errors, filters)
+        return errors.groupby(level=by + ['error_category']).sum().unstack(fill_value=0)
+
+    def total(self, **filters) -> int:
+        """Number of tasks in the slice."""
+        return int(self._slice(self.sizes, filters).sum())
+
+    def error_counts(self, **filters) -> dict[str, int]:
+        """Error category counts in the slice, excluding correct results."""
+        errors = self._slice(self.errors, filters)
+        return {
+            category: int(count)
+            for category, count in errors.groupby(level='error_category').sum().items()
+        }
+
+    def rows(self, **filters) -> pd.DataFrame:
+        """The underlying per-task rows of a slice, for plots that need raw points."""
+        mask = np.ones(len(self.frame), dtype=bool)
+        for dimension, value in filters.items():
+            if value is not None:
+                mask &= (self.frame[dimension] == value).to_numpy()
+        return self.frame[mask]
+
+    def fingerprint(self, row_columns: tuple[str, ...] = (), **filters) -> str:
+        """
+        Hash of the aggregates of a slice (plus the raw ``row_columns`` when a
+        plot reads individual rows), used to tell whether a figure is stale.
+        """
+        digest = hashlib.sha256()
+        for table in (self.sums, self.counts, self.sizes, self.errors):
+            digest.update(pd.util.hash_pandas_object(self._slice(table, filters)).to_numpy().tobytes())
+        if row_columns:
+            rows = self.rows(**filters)[list(row_columns)]
+            digest.update(pd.util.hash_pandas_object(rows, index=False).to_numpy().tobytes())
+        return digest.hexdigest()
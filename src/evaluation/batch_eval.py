@@ -0,0 +1,248 @@
+import json
+from contextlib import ExitStack
+from dataclasses import replace
+from logging import getLogger
+from pathlib import Path
+from time import sleep
+from typing import Callable
+
+import httpx
+import litellm
+from tqdm import tqdm
+
+from constants import get_tasks_directory
+from evaluation.checkpoint import open_result_writer
+from evaluation.remote_eval import db_path_resolver, load_schema, publish_results
+from evaluation.remote_eval_utils import NO_QUERY, get_llm_usage, get_prompt_hash, prompt_builder
+from evaluation.resilience import get_provider
+from evaluation.schema_linking import SchemaLinker
+from evaluation.query_extraction import extract_query
+from evaluation.scoring import ANALYZERS, get_task_result
+from evaluation.utils import build_user_prompt
+from models import DatasetName, LLMUsage, Task, TaskDifficulty, TaskType
+from utils import get_result_dir, get_tasks_from_json
+
+logger = getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+POLL_INTERVAL = 30.0
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+ANTHROPIC_API_BASE = "https://api.anthropic.com"
+ANTHROPIC_VERSION = "2023-06-01"
+# Message Batches require max_tokens; litellm sends the same default on streamed calls.
+ANTHROPIC_MAX_TOKENS = 4096
+
+
+def custom_id(difficulty: TaskDifficulty, index: int) -> str:
+    # Anthropic only accepts [a-zA-Z0-9_-] in custom ids.
+    return f"{difficulty.value}-{index}"
+
+
+def build_batch_requests(
+    pending: dict[TaskDifficulty, list[tuple[int, Task]]],
+    build_system: Callable[[Task], str],
+    model_name: str,
+) -> list[dict]:
+    """One OpenAI batch request line per pending task, identified by ``difficulty:index``."""
+    return [
+        {
+            "custom_id": custom_id(difficulty, index),
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": {
+                "model": model_name,
+                "messages": [
+                    {"role": "system", "content": build_system(task)},
+                    {"role": "user", "content": build_user_prompt(task.question)},
+                ],
+            },
+        }
+        for difficulty, tasks in pending.items()
+        for index, task in tasks
+    ]
+
+
+def parse_batch_output(content: str, model_name: str) -> dict[str, tuple[str, LLMUsage | None]]:
+    """Map each custom_id of a batch output file to the generated text (NO_QUERY on errors) and usage."""
+    responses = {}
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            logger.error(f"Batch request {record['custom_id']} failed: {record.get('error') or response}")
+            responses[record["custom_id"]] = (NO_QUERY, None)
+            continue
+        body = response["body"]
+        choices = body.get("choices") or [{}]
+        text = (choices[0].get("message") or {}).get("content") or NO_QUERY
+        responses[record["custom_id"]] = (text, get_llm_usage(model_name, body))
+    return responses
+
+
+def to_anthropic_request(request: dict) -> dict:
+    """An OpenAI batch request line as a Message Batches request."""
+    body = request["body"]
+    return {
+        "custom_id": request["custom_id"],
+        "params": {
+            "model": litellm.get_llm_provider(body["model"])[0],
+            "max_tokens": ANTHROPIC_MAX_TOKENS,
+            "system": "\n".join(m["content"] for m in body["messages"] if m["role"] == "system"),
+            "messages": [m for m in body["messages"] if m["role"] != "system"],
+        },
+    }
+
+
+class BatchClient:
+    """
+    The litellm files and batches calls of one provider endpoint.
+
+    litellm cannot create Anthropic batches, so for ``anthropic`` the request
+    file is posted to the Message Batches API directly; polling and reading
+    the results (converted to the OpenAI output format) still go through litellm.
+    """
+
+    def __init__(self, provider: str, api_key: str | None = None, api_base: str | None = None):
+        self.provider = provider
+        self.options = {"api_key": api_key, "api_base": api_base}
+
+    def submit(self, input_path: Path) -> str:
+        if self.provider == "anthropic":
+            batch_id = self._submit_anthropic(input_path)
+            logger.info(f"Submitted batch {batch_id} ({input_path})")
+            return batch_id
+
+        with open(input_path, "rb") as f:
+            file = litellm.create_file(file=f, purpose="batch", custom_llm_provider=self.provider, **self.options)
+        batch = litellm.create_batch(
+            completion_window="24h",
+            endpoint=BATCH_ENDPOINT,
+            input_file_id=file.id,
+            custom_llm_provider=self.provider,
+            **self.options,
+        )
+        logger.info(f"Submitted batch {batch.id} ({input_path})")
+        return batch.id
+
+    def _submit_anthropic(self, input_path: Path) -> str:
+        with open(input_path, "r") as f:
+            requests = [to_anthropic_request(json.loads(line)) for line in f if line.strip()]
+        response = httpx.post(
+            f"{(self.options['api_base'] or ANTHROPIC_API_BASE).rstrip('/')}/v1/messages/batches",
+            headers={"x-api-key": self.options["api_key"] or "", "anthropic-version": ANTHROPIC_VERSION},
+            json={"requests": requests},
+            timeout=600.0,
+        )
+        response.raise_for_status()
+        return response.json()["id"]
+
+    def wait(self, batch_id: str, poll_interval: float = POLL_INTERVAL):
+        while True:
+            batch = litellm.retrieve_batch(batch_id, custom_llm_provider=self.provider, **self.options)
+            counts = batch.request_counts
+            logger.info(
+                f"Batch {batch_id}: {batch.status}"
+                + (f" ({counts.completed}/{counts.total} done)" if counts else "")
+            )
+            if batch.status in TERMINAL_STATUSES:
+                return batch
+            sleep(poll_interval)
+
+    def download(self, file_id: str) -> str:
+        return litellm.file_content(file_id=file_id, custom_llm_provider=self.provider, **self.options).text
+
+
+def _load_batch_state(path: Path, prompt_hash: str) -> str | None:
+    if not path.exists():
+        return None
+    with open(path, "r") as f:
+        state = json.load(f)
+    return state["batch_id"] if state.get("prompt_hash") == prompt_hash else None
+
+
+def evaluate_remote_batch(
+    model_name: str,
+    dataset_name: DatasetName,
+    task_type: TaskType,
+    api_key: str | None = None,
+    resume: bool = False,
+    provider: str | None = None,
+    api_base: str | None = None,
+    poll_interval: float = POLL_INTERVAL,
+    prune_top_k: int | None = None,
+) -> None:
+    """
+    Evaluate a remote model through the provider's batch API.
+
+    The prompts of all difficulties go into one ``batch_input.jsonl`` request
+    file which is submitted, polled until done, and whose responses are scored
+    into the same checkpoints as ``evaluate_remote_model``. The batch id is kept
+    in ``batch.json`` so that with ``resume`` an interrupted run polls the
+    already submitted batch instead of paying for a new one. ``prune_top_k``
+    prunes each prompt's schema as in ``evaluate_remote_model``.
+
+    ``provider`` is the litellm batch provider; by default it is the model's
+    own provider (e.g. ``anthropic`` for Claude models, whose request file
+    litellm converts to a Message Batch), or ``openai`` when ``api_base``
+    points at an OpenAI-format endpoint such as ``BatchServer``.
+    """
+    provider = provider or ("openai" if api_base else get_provider(model_name))
+    schema = load_schema(task_type, dataset_name)
+    db_path = db_path_resolver[task_type](dataset_name)
+    tasks_dir = get_tasks_directory(dataset_name)
+    prompt_hash = get_prompt_hash(task_type, schema, prune_top_k)
+    linker = SchemaLinker(schema, task_type, prune_top_k) if prune_top_k else None
+    result_dir = get_result_dir(dataset_name, task_type, model_name)
+    state_path = result_dir / "batch.json"
+    client = BatchClient(provider, api_key, api_base)
+
+    with ExitStack() as stack:
+        writers, pending = {}, {}
+        for difficulty in TaskDifficulty:
+            tasks_file = tasks_dir / f"{difficulty.value}.json"
+            if not tasks_file.exists():
+                logger.warning(f"Skipping missing: {tasks_file}")
+                continue
+
+            tasks = get_tasks_from_json(tasks_file)
+            writer, completed = open_result_writer(
+                dataset_name, task_type, difficulty, model_name, prompt_hash, len(tasks), resume
+            )
+            writers[difficulty] = stack.enter_context(writer)
+            pending[difficulty] = [(i, task) for i, task in enumerate(tasks) if task.question not in completed]
+
+        def build_system(task: Task) -> str:
+            return prompt_builder[task_type](linker.prune(task.question) if linker else schema)
+
+        requests = build_batch_requests(pending, build_system, model_name)
+        if requests:
+            batch_id = _load_batch_state(state_path, prompt_hash) if resume else None
+            if batch_id is None:
+                input_path = result_dir / "batch_input.jsonl"
+                with open(input_path, "w") as f:
+                    f.writelines(json.dumps(request) + "\n" for request in requests)
+                batch_id = client.submit(input_path)
+                with open(state_path, "w") as f:
+                    json.dump({"batch_id": batch_id, "prompt_hash": prompt_hash, "requests": len(requests)}, f)
+            else:
+                logger.info(f"Resuming batch {batch_id}")
+
+            batch = client.wait(batch_id, poll_interval)
+            if batch.status != "completed" or not batch.output_file_id:
+                state_path.unlink(missing_ok=True)
+                raise RuntimeError(f"Batch {batch_id} ended with status {batch.status}")
+            responses = parse_batch_output(client.download(batch.output_file_id), model_name)
+
+            for difficulty, tasks in pending.items():
+                for index, task in tqdm(tasks, desc=f"Scoring {difficulty.value}"):
+                    query, usage = responses.get(custom_id(difficulty, index), (NO_QUERY, None))
+                    query = extract_query(query, ANALYZERS[task_type])
+                    result = get_task_result(task, query, task_type, db_path)
+                    writers[difficulty].write(replace(result, llm_usage=usage))
+
+    state_path.unlink(missing_ok=True)
+    for difficulty, writer in writers.items():
+        publish_results(writer, dataset_name, task_type, model_name, difficulty)
@@ -0,0 +1,197 @@
+import email
+import email.policy
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging import getLogger
+from time import monotonic, time
+from typing import Callable
+from uuid import uuid4
+
+logger = getLogger(__name__)
+
+DEFAULT_PORT = 8765
+
+
+def default_responder(body: dict) -> str:
+    return "SELECT 1;"
+
+
+class BatchServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the OpenAI files and batches API, for testing
+    ``evaluate-remote --batch`` without a provider.
+
+    Batches stay ``in_progress`` for ``processing_seconds`` and then answer
+    every request with ``responder(body)`` as the assistant message.
+    """
+
+    def __init__(
+        self,
+        address: tuple[str, int] = ("127.0.0.1", DEFAULT_PORT),
+        responder: Callable[[dict], str] = default_responder,
+        processing_seconds: float = 0.0,
+    ):
+        super().__init__(address, _BatchHandler)
+        self.responder = responder
+        self.processing_seconds = processing_seconds
+        self.files: dict[str, tuple[dict, bytes]] = {}
+        self.batches: dict[str, dict] = {}
+        self._submitted_at: dict[str, float] = {}
+        # Reentrant so ``_complete`` can add the output file while holding it.
+        self._lock = threading.RLock()
+
+    @property
+    def api_base(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def add_file(self, content: bytes, filename: str, purpose: str) -> dict:
+        file = {
+            "id": f"file-{uuid4().hex}",
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed",
+        }
+        with self._lock:
+            self.files[file["id"]] = (file, content)
+        return file
+
+    def create_batch(self, request: dict) -> dict:
+        batch = {
+            "id": f"batch_{uuid4().hex}",
+            "object": "batch",
+            "endpoint": request["endpoint"],
+            "input_file_id": request["input_file_id"],
+            "completion_window": request.get("completion_window", "24h"),
+            "status": "in_progress",
+            "created_at": int(time()),
+            "output_file_id": None,
+            "error_file_id": None,
+            "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            "metadata": request.get("metadata"),
+        }
+        with self._lock:
+            self.batches[batch["id"]] = batch
+            self._submitted_at[batch["id"]] = monotonic()
+        return batch
+
+    def get_batch(self, batch_id: str) -> dict | None:
+        # Concurrent polls must not both see in_progress and complete the batch twice.
+        with self._lock:
+            batch = self.batches.get(batch_id)
+            elapsed = monotonic() - self._submitted_at.get(batch_id, 0.0)
+            if batch is not None and batch["status"] == "in_progress" and elapsed >= self.processing_seconds:
+                self._complete(batch)
+        return batch
+
+    def _complete(self, batch: dict) -> None:
+        """Answer every request of ``batch``; called with ``_lock`` held."""
+        _, content = self.files[batch["input_file_id"]]
+        lines = []
+        for line in content.decode().splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            lines.append(
+                json.dumps(
+                    {
+                        "id": f"batch_req_{uuid4().hex}",
+                        "custom_id": request["custom_id"],
+                        "response": {
+                            "status_code": 200,
+                            "request_id": uuid4().hex,
+                            "body": _chat_completion(request["body"], self.responder(request["body"])),
+                        },
+                        "error": None,
+                    }
+                )
+            )
+
+        output = self.add_file(("\n".join(lines) + "\n").encode(), f"{batch['id']}_output.jsonl", "batch_output")
+        batch["output_file_id"] = output["id"]
+        batch["request_counts"] = {"total": len(lines), "completed": len(lines), "failed": 0}
+        batch["status"] = "completed"
+        batch["completed_at"] = int(time())
+
+
+def _chat_completion(body: dict, content: str) -> dict:
+    return {
+        "id": f"chatcmpl-{uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time()),
+        "model": body.get("model", "stand-in"),
+        "choices": [
+            {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+        ],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+class _BatchHandler(BaseHTTPRequestHandler):
+    server: BatchServer
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        if self.path == "/v1/files":
+            fields = _parse_multipart(self.headers["Content-Type"], body)
+            filename, content = fields["file"]
+            self._send(self.server.add_file(content, filename or "batch.jsonl", fields["purpose"][1].decode()))
+        elif self.path == "/v1/batches":
+            self._send(self.server.create_batch(json.loads(body)))
+        else:
+            self._send({"error": {"message": f"Unknown path {self.path}"}}, status=404)
+
+    def do_GET(self) -> None:
+        parts = self.path.strip("/").split("/")
+
+        if parts[:2] == ["v1", "batches"] and len(parts) == 3:
+            batch = self.server.get_batch(parts[2])
+            self._send(batch) if batch else self._send({"error": {"message": "No such batch"}}, status=404)
+        elif parts[:2] == ["v1", "files"] and len(parts) in (3, 4) and parts[2] in self.server.files:
+            file, content = self.server.files[parts[2]]
+            if len(parts) == 4 and parts[3] == "content":
+                self._send_bytes(content, "application/jsonl")
+            else:
+                self._send(file)
+        else:
+            self._send({"error": {"message": f"Unknown path {self.path}"}}, status=404)
+
+    def _send(self, payload: dict, status: int = 200) -> None:
+        self._send_bytes(json.dumps(payload).encode(), "application/json", status)
+
+    def _send_bytes(self, content: bytes, content_type: str, status: int = 200) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(format % args)
+
+
+def _parse_multipart(content_type: str, body: bytes) -> dict[str, tuple[str | None, bytes]]:
+    """Form fields of a multipart body as name -> (filename, content)."""
+    message = email.message_from_bytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body, policy=email.policy.HTTP
+    )
+    return {
+        part.get_param("name", header="content-disposition"): (part.get_filename(), part.get_payload(decode=True))
+        for part in message.iter_parts()
+    }
+
+
+def serve(port: int = DEFAULT_PORT, processing_seconds: float = 0.0) -> None:
+    server = BatchServer(("127.0.0.1", port), processing_seconds=processing_seconds)
+    logger.info(f"Stand-in batch API listening on {server.api_base}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,192 @@
+import json
+import os
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from logging import getLogger
+from pathlib import Path
+from textwrap import indent
+from typing import Iterator
+
+from models import TaskDifficulty, TaskResult, TaskType
+from utils import get_result_dir
+
+logger = getLogger(__name__)
+
+FSYNC_EVERY = 10
+
+
+@dataclass(slots=True)
+class RunManifest:
+    run_id: str
+    model: str
+    prompt_hash: str
+    dataset: str
+    task_type: str
+    difficulty: str
+    total: int
+    completed: int
+    status: str
+    started_at: str
+    updated_at: str
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RunManifest":
+        return cls(**data)
+
+
+class ResultWriter:
+    """
+    Appends one JSON line per TaskResult to ``<difficulty>.jsonl``.
+
+    Every line is flushed immediately and the file is fsynced every
+    ``fsync_every`` results, together with the manifest next to it.
+    """
+
+    def __init__(self, path: Path, manifest: RunManifest, fsync_every: int = FSYNC_EVERY):
+        self.path = path
+        self.manifest_path = path.with_name(f"{path.stem}.manifest.json")
+        self.manifest = manifest
+        self.fsync_every = fsync_every
+        self._file = open(path, "a")
+        self._unsynced = 0
+        self._write_manifest()
+
+    def write(self, result: TaskResult) -> None:
+        self._file.write(json.dumps(result.to_dict()) + "\n")
+        self._file.flush()
+        self.manifest.completed += 1
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self._sync()
+
+    def close(self, status: str = "complete") -> None:
+        self.manifest.status = status
+        self._sync()
+        self._file.close()
+
+    def _sync(self) -> None:
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._write_manifest()
+
+    def _write_manifest(self) -> None:
+        self.manifest.updated_at = datetime.now().isoformat(timespec="seconds")
+        tmp_path = self.manifest_path.with_name(f"{self.manifest_path.name}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(asdict(self.manifest), f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close("complete" if exc_type is None else "interrupted")
+
+
+def read_completed_questions(path: Path) -> set[str]:
+    """Return questions already written to a JSONL file, dropping a torn last line."""
+    completed: set[str] = set()
+    if not path.exists():
+        return completed
+
+    valid_bytes = 0
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                completed.add(json.loads(line)["question"])
+            except (json.JSONDecodeError, KeyError):
+                logger.warning(f"Dropping incomplete record at byte {valid_bytes} of {path}")
+                break
+            valid_bytes += len(line)
+
+    if valid_bytes < path.stat().st_size:
+        os.truncate(path, valid_bytes)
+    return completed
+
+
+def open_result_writer(
+    dataset_name: str,
+    task_type: TaskType,
+    difficulty: TaskDifficulty,
+    model_name: str,
+    prompt_hash: str,
+    total: int,
+    resume: bool = False,
+) -> tuple[ResultWriter, set[str]]:
+    """
+    Open the JSONL checkpoint for one difficulty.
+
+    With ``resume`` and a manifest for the same model and prompt hash, existing
+    results are kept and their questions returned so the caller can skip them.
+    Otherwise the checkpoint starts empty.
+    """
+    result_dir = get_result_dir(dataset_name, task_type, model_name)
+    result_dir.mkdir(parents=True, exist_ok=True)
+    path = result_dir / f"{difficulty.value}.jsonl"
+    manifest_path = result_dir / f"{difficulty.value}.manifest.json"
+
+    manifest = None
+    if resume and manifest_path.exists():
+        with open(manifest_path, "r") as f:
+            manifest = RunManifest.from_dict(json.load(f))
+        if manifest.model != model_name or manifest.prompt_hash != prompt_hash:
+            logger.warning(
+                f"Cannot resume {path}: it was produced by {manifest.model} "
+                f"with prompt {manifest.prompt_hash}, starting over"
+            )
+            manifest = None
+
+    if manifest is None:
+        now = datetime.now()
+        manifest = RunManifest(
+            run_id=now.strftime("%Y%m%dT%H%M%S"),
+            model=model_name,
+            prompt_hash=prompt_hash,
+            dataset=str(dataset_name),
+            task_type=task_type.value,
+            difficulty=difficulty.value,
+            total=total,
+            completed=0,
+            status="running",
+            started_at=now.isoformat(timespec="seconds"),
+            updated_at=now.isoformat(timespec="seconds"),
+        )
+        path.unlink(missing_ok=True)
+        completed: set[str] = set()
+    else:
+        completed = read_completed_questions(path)
+        manifest.completed = len(completed)
+        manifest.total = total
+        manifest.status = "running"
+
+    return ResultWriter(path, manifest), completed
+
+
+def read_jsonl(path: Path) -> Iterator[dict]:
+    with open(path, "r") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def rewrite_jsonl(path: Path, records: list[dict]) -> None:
+    """Replace a JSONL checkpoint in one step, so a reader never sees it half-written."""
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with open(tmp_path, "w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def export_json(jsonl_path: Path, json_path: Path) -> None:
+    """Convert a JSONL checkpoint into the indented JSON array format, line by line."""
+    with open(json_path, "w") as target:
+        target.write("[")
+        for index, record in enumerate(read_jsonl(jsonl_path)):
+            target.write(",\n" if index else "\n")
+            target.write(indent(json.dumps(record, indent=2), "  "))
+        target.write("\n]\n")
+    logger.info(f"Exported results to {json_path}")
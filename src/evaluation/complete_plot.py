@@ -1,14 +1,15 @@
 # src/evaluation/thesis_plots.py
 
-import json
 from pathlib import Path
 from collections import defaultdict
-from typing import Dict, List
+from typing import Dict
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import numpy as np
 
-from models import TaskResult, TaskType
+from evaluation.aggregates import MetricCube
+from evaluation.plot_build import PlotTarget, build_plots
+from evaluation.results_store import load_results_frame
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
@@ -29,98 +30,21 @@ class ThesisPlotter:
             'hard': '#C73E1D'
         }
     
-    def load_all_results(self, model: str = 'claude-sonnet-4-20250514') -> Dict:
-        """Load all results organized by dataset/language/difficulty"""
-        results = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
-        
-        datasets = ['rel-f1', 'rel-stack', 'rel-trial']
-        languages = ['sql', 'cypher']
-        difficulties = ['easy', 'intermediate', 'hard']
-        
-        for dataset in datasets:
-            for language in languages:
-                task_type = TaskType.SQL if language == 'sql' else TaskType.CYPHER
-                
-                for difficulty in difficulties:
-                    result_file = self.results_dir / dataset / language / model / f'{difficulty}.json'
-                    if result_file.exists():
-                        with open(result_file, 'r') as f:
-                            data = json.load(f)
-                            results[dataset][language][difficulty] = [
-                                TaskResult.from_dict(item, task_type) for item in data
-                            ]
-        
-        return results
-    
-    def calculate_aggregates(self, results: List[TaskResult]) -> Dict:
-        """Calculate aggregate metrics for a list of results with robust None handling"""
-        
-        # Return zeros if no results
-        if not results:
-            return {
-                'parse_success': 0.0,
-                'execution_accuracy': 0.0,
-                'correct_result': 0.0,
-                'entity_f1': 0.0,
-                'attribute_f1': 0.0,
-                'relation_f1': 0.0,
-                'filter_f1': 0.0,
-                'aggregation_f1': 0.0,
-                'return_column_f1': 0.0,
-                'result_f1': 0.0,
-                'result_precision': 0.0,
-                'result_recall': 0.0,
-            }
-        
-        total = len(results)
-        
-        # Helper function to safely calculate mean, filtering out None values
-        def safe_mean(values):
-            """Calculate mean while filtering out None values"""
-            filtered = [v for v in values if v is not None]
-            return float(np.mean(filtered)) if filtered else 0.0
-        
-        return {
-            # Boolean success metrics (percentage of True values)
-            'parse_success': sum(1 for r in results if r.parse_success) / total,
-            'execution_accuracy': sum(1 for r in results if r.execution_accuracy) / total,
-            'correct_result': sum(1 for r in results if r.execution_success) / total,
-            
-            # Structural F1 metrics (averages with None filtering)
-            'entity_f1': safe_mean([r.entity_f1 for r in results]),
-            'attribute_f1': safe_mean([r.attribute_f1 for r in results]),
-            'relation_f1': safe_mean([r.relation_f1 for r in results]),  # Can be None
-            'filter_f1': safe_mean([r.filter_f1 for r in results]),
-            'aggregation_f1': safe_mean([r.aggregation_f1 for r in results]),
-            'return_column_f1': safe_mean([r.return_column_f1 for r in results]),
-            
-            # Result accuracy metrics (averages)
-            'result_f1': safe_mean([r.result_f1 for r in results]),
-            'result_precision': safe_mean([r.result_precision for r in results]),
-            'result_recall': safe_mean([r.result_recall for r in results]),
-        }
+    def __setstate__(self, state):
+        # Render workers unpickle the plotter without running __init__
+        self.__dict__.update(state)
+        plt.style.use('seaborn-v0_8-darkgrid')
     
-    def _safe_mean_attribute(self, results: List[TaskResult], attribute: str) -> float:
-        """Safely get mean of an attribute, handling None values"""
-        values = [getattr(r, attribute) for r in results]
-        filtered = [v for v in values if v is not None]
-        return float(np.mean(filtered)) if filtered else 0.0
+    def load_all_results(self, model: str = 'claude-sonnet-4-20250514') -> MetricCube:
+        """Load all results for a model once and aggregate them into a metric cube"""
+        return MetricCube(load_results_frame(model=model, store_dir=self.results_dir))
     
     # ==================== Section 1: Aggregate Results ====================
     
-    def plot_overall_comparison(self, all_results: Dict):
+    def plot_overall_comparison(self, cube: MetricCube):
         """SQL vs Cypher overall comparison"""
-        sql_all = []
-        cypher_all = []
-        
-        for dataset in all_results:
-            for difficulty in all_results[dataset]['sql']:
-                sql_all.extend(all_results[dataset]['sql'][difficulty])
-            for difficulty in all_results[dataset]['cypher']:
-                cypher_all.extend(all_results[dataset]['cypher'][difficulty])
-        
-        sql_agg = self.calculate_aggregates(sql_all)
-        cypher_agg = self.calculate_aggregates(cypher_all)
+        sql_agg = cube.aggregates(language='sql')
+        cypher_agg = cube.aggregates(language='cypher')
         
         metrics = ['parse_success', 'correct_result', 'result_f1']
         metric_labels = ['Parse Success', 'Executable', 'Result F1']
@@ -196,17 +120,10 @@ class ThesisPlotter:
     
     # ==================== Section 2: Results by Dataset ====================
     
-    def plot_dataset_comparison(self, all_results: Dict, dataset: str):
+    def plot_dataset_comparison(self, cube: MetricCube, dataset: str):
         """Plot SQL vs Cypher for a specific dataset"""
-        sql_combined = []
-        cypher_combined = []
-        
-        for difficulty in ['easy', 'intermediate', 'hard']:
-            sql_combined.extend(all_results[dataset]['sql'].get(difficulty, []))
-            cypher_combined.extend(all_results[dataset]['cypher'].get(difficulty, []))
-        
-        sql_agg = self.calculate_aggregates(sql_combined)
-        cypher_agg = self.calculate_aggregates(cypher_combined)
+        sql_agg = cube.aggregates(dataset=dataset, language='sql')
+        cypher_agg = cube.aggregates(dataset=dataset, language='cypher')
         
         metrics = ['parse_success', 'execution_accuracy', 'entity_f1', 'relation_f1', 'result_f1']
         metric_labels = ['Parse', 'Exec', 'Entity F1', 'Relation F1', 'Result F1']
@@ -240,7 +157,7 @@ class ThesisPlotter:
         plt.savefig(self.output_dir / f'2_{dataset}_sql_vs_cypher.png', dpi=300, bbox_inches='tight')
         plt.close()
     
-    def plot_dataset_difficulty_breakdown(self, all_results: Dict, dataset: str):
+    def plot_dataset_difficulty_breakdown(self, cube: MetricCube, dataset: str):
         """Plot difficulty breakdown for a dataset"""
         difficulties = ['easy', 'intermediate', 'hard']
         metrics = ['parse_success', 'execution_accuracy', 'result_f1']
@@ -252,8 +169,7 @@ class ThesisPlotter:
             data = []
             
             for difficulty in difficulties:
-                results = all_results[dataset][language].get(difficulty, [])
-                agg = self.calculate_aggregates(results)
+                agg = cube.aggregates(dataset=dataset, language=language, difficulty=difficulty)
                 data.append([agg[m] for m in metrics])
             
             x = np.arange(len(metrics))
@@ -285,7 +201,7 @@ class ThesisPlotter:
     
     # ==================== Section 3: Results by Difficulty ====================
     
-    def plot_difficulty_across_datasets(self, all_results: Dict, difficulty: str):
+    def plot_difficulty_across_datasets(self, cube: MetricCube, difficulty: str):
         """Plot SQL vs Cypher across all datasets for a specific difficulty"""
         datasets = ['rel-f1', 'rel-stack', 'rel-trial']
         metrics = ['parse_success', 'execution_accuracy', 'entity_f1', 'relation_f1', 'result_f1']
@@ -296,11 +212,8 @@ class ThesisPlotter:
         for idx, dataset in enumerate(datasets):
             ax = axes[idx]
             
-            sql_results = all_results[dataset]['sql'].get(difficulty, [])
-            cypher_results = all_results[dataset]['cypher'].get(difficulty, [])
-            
-            sql_agg = self.calculate_aggregates(sql_results)
-            cypher_agg = self.calculate_aggregates(cypher_results)
+            sql_agg = cube.aggregates(dataset=dataset, language='sql', difficulty=difficulty)
+            cypher_agg = cube.aggregates(dataset=dataset, language='cypher', difficulty=difficulty)
             
             x = np.arange(len(metrics))
             width = 0.35
@@ -335,7 +248,7 @@ class ThesisPlotter:
     
     # ==================== Section 4: Structural Analysis ====================
     
-    def plot_structural_component(self, all_results: Dict, component: str, component_label: str):
+    def plot_structural_component(self, cube: MetricCube, component: str, component_label: str):
         """Plot a specific structural component (entity_f1, relation_f1, etc.) with None handling"""
         datasets = ['rel-f1', 'rel-stack', 'rel-trial']
         difficulties = ['easy', 'intermediate', 'hard']
@@ -346,11 +259,10 @@ class ThesisPlotter:
         for d_idx, dataset in enumerate(datasets):
             # SQL subplot
             ax_sql = axes[0, d_idx]
-            sql_data = []
-            for difficulty in difficulties:
-                results = all_results[dataset]['sql'].get(difficulty, [])
-                avg = self._safe_mean_attribute(results, component) if results else 0.0
-                sql_data.append(avg)
+            sql_data = [
+                cube.mean(component, dataset=dataset, language='sql', difficulty=difficulty)
+                for difficulty in difficulties
+            ]
             
             bars = ax_sql.bar(difficulties, sql_data, color=self.colors['sql'], alpha=0.8)
             ax_sql.set_title(f'SQL - {dataset}', fontsize=11, fontweight='bold')
@@ -365,11 +277,10 @@ class ThesisPlotter:
             
             # Cypher subplot
             ax_cypher = axes[1, d_idx]
-            cypher_data = []
-            for difficulty in difficulties:
-                results = all_results[dataset]['cypher'].get(difficulty, [])
-                avg = self._safe_mean_attribute(results, component) if results else 0.0
-                cypher_data.append(avg)
+            cypher_data = [
+                cube.mean(component, dataset=dataset, language='cypher', difficulty=difficulty)
+                for difficulty in difficulties
+            ]
             
             bars = ax_cypher.bar(difficulties, cypher_data, color=self.colors['cypher'], alpha=0.8)
             ax_cypher.set_title(f'Cypher - {dataset}', fontsize=11, fontweight='bold')
@@ -387,7 +298,7 @@ class ThesisPlotter:
         plt.savefig(self.output_dir / f'4_{component}.png', dpi=300, bbox_inches='tight')
         plt.close()
     
-    def plot_structural_radar(self, all_results: Dict):
+    def plot_structural_radar(self, cube: MetricCube):
         """Radar chart comparing all structural components with None handling"""
         from math import pi
         
@@ -395,18 +306,9 @@ class ThesisPlotter:
                      'filter_f1', 'aggregation_f1', 'return_column_f1']
         labels = ['Entity', 'Attribute', 'Relation', 'Filter', 'Aggregation', 'Return Column']
         
-        # Aggregate all results
-        sql_all = []
-        cypher_all = []
-        for dataset in all_results:
-            for difficulty in all_results[dataset]['sql']:
-                sql_all.extend(all_results[dataset]['sql'][difficulty])
-            for difficulty in all_results[dataset]['cypher']:
-                cypher_all.extend(all_results[dataset]['cypher'][difficulty])
-        
         # Calculate means with None filtering
-        sql_vals = [self._safe_mean_attribute(sql_all, comp) for comp in components]
-        cypher_vals = [self._safe_mean_attribute(cypher_all, comp) for comp in components]
+        sql_vals = [cube.mean(comp, language='sql') for comp in components]
+        cypher_vals = [cube.mean(comp, language='cypher') for comp in components]
         
         # Number of variables
         num_vars = len(labels)
@@ -439,7 +341,7 @@ class ThesisPlotter:
     
     # ==================== Section 5: Result Accuracy ====================
     
-    def plot_execution_accuracy_heatmap(self, all_results: Dict):
+    def plot_execution_accuracy_heatmap(self, cube: MetricCube):
         """Heatmap of execution accuracy (dataset x difficulty x language)"""
         datasets = ['rel-f1', 'rel-stack', 'rel-trial']
         difficulties = ['easy', 'intermediate', 'hard']
@@ -451,9 +353,9 @@ class ThesisPlotter:
             
             for i, dataset in enumerate(datasets):
                 for j, difficulty in enumerate(difficulties):
-                    results = all_results[dataset][language].get(difficulty, [])
-                    if results:
-                        data[i, j] = sum(1 for r in results if r.execution_accuracy) / len(results)
+                    data[i, j] = cube.mean(
+                        'execution_accuracy', dataset=dataset, language=language, difficulty=difficulty
+                    )
             
             ax = axes[idx]
             im = ax.imshow(data, cmap='RdYlGn', aspect='auto', vmin=0, vmax=1)
@@ -478,25 +380,19 @@ class ThesisPlotter:
         plt.savefig(self.output_dir / '5_execution_accuracy_heatmap.png', dpi=300, bbox_inches='tight')
         plt.close()
     
-    def plot_precision_recall_analysis(self, all_results: Dict):
+    def plot_precision_recall_analysis(self, cube: MetricCube):
         """Precision vs Recall scatter plot and grouped bars"""
         fig, axes = plt.subplots(1, 2, figsize=(16, 6))
         
         # Scatter plot
         ax = axes[0]
-        sql_all = []
-        cypher_all = []
-        
-        for dataset in all_results:
-            for difficulty in all_results[dataset]['sql']:
-                sql_all.extend(all_results[dataset]['sql'][difficulty])
-            for difficulty in all_results[dataset]['cypher']:
-                cypher_all.extend(all_results[dataset]['cypher'][difficulty])
+        sql_rows = cube.rows(language='sql')
+        cypher_rows = cube.rows(language='cypher')
         
-        sql_precision = [r.result_precision for r in sql_all]
-        sql_recall = [r.result_recall for r in sql_all]
-        cypher_precision = [r.result_precision for r in cypher_all]
-        cypher_recall = [r.result_recall for r in cypher_all]
+        sql_precision = sql_rows['result_precision']
+        sql_recall = sql_rows['result_recall']
+        cypher_precision = cypher_rows['result_precision']
+        cypher_recall = cypher_rows['result_recall']
         
         ax.scatter(sql_recall, sql_precision, alpha=0.5, s=30, 
                   color=self.colors['sql'], label='SQL', edgecolors='black', linewidth=0.5)
@@ -518,22 +414,10 @@ class ThesisPlotter:
         x = np.arange(len(difficulties))
         width = 0.2
         
-        sql_prec_by_diff = []
-        sql_rec_by_diff = []
-        cypher_prec_by_diff = []
-        cypher_rec_by_diff = []
-        
-        for difficulty in difficulties:
-            sql_diff_results = []
-            cypher_diff_results = []
-            for dataset in all_results:
-                sql_diff_results.extend(all_results[dataset]['sql'].get(difficulty, []))
-                cypher_diff_results.extend(all_results[dataset]['cypher'].get(difficulty, []))
-            
-            sql_prec_by_diff.append(self._safe_mean_attribute(sql_diff_results, 'result_precision'))
-            sql_rec_by_diff.append(self._safe_mean_attribute(sql_diff_results, 'result_recall'))
-            cypher_prec_by_diff.append(self._safe_mean_attribute(cypher_diff_results, 'result_precision'))
-            cypher_rec_by_diff.append(self._safe_mean_attribute(cypher_diff_results, 'result_recall'))
+        sql_prec_by_diff = [cube.mean('result_precision', language='sql', difficulty=d) for d in difficulties]
+        sql_rec_by_diff = [cube.mean('result_recall', language='sql', difficulty=d) for d in difficulties]
+        cypher_prec_by_diff = [cube.mean('result_precision', language='cypher', difficulty=d) for d in difficulties]
+        cypher_rec_by_diff = [cube.mean('result_recall', language='cypher', difficulty=d) for d in difficulties]
         
         ax.bar(x - width*1.5, sql_prec_by_diff, width, label='SQL Precision', color=self.colors['sql'], alpha=0.8)
         ax.bar(x - width*0.5, sql_rec_by_diff, width, label='SQL Recall', color=self.colors['sql'], alpha=0.5)
@@ -555,25 +439,12 @@ class ThesisPlotter:
     
     # ==================== Section 6: Error Analysis ====================
     
-    def plot_error_distribution(self, all_results: Dict):
+    def plot_error_distribution(self, cube: MetricCube):
         """Error category distribution (SQL vs Cypher)"""
-        error_counts_sql = defaultdict(int)
-        error_counts_cypher = defaultdict(int)
-        total_sql = 0
-        total_cypher = 0
-        
-        for dataset in all_results:
-            for difficulty in all_results[dataset]['sql']:
-                for result in all_results[dataset]['sql'][difficulty]:
-                    total_sql += 1
-                    if result.error_category != 'NONE' and result.error_category != 'CORRECT':
-                        error_counts_sql[result.error_category] += 1
-            
-            for difficulty in all_results[dataset]['cypher']:
-                for result in all_results[dataset]['cypher'][difficulty]:
-                    total_cypher += 1
-                    if result.error_category != 'NONE' and result.error_category != 'CORRECT':
-                        error_counts_cypher[result.error_category] += 1
+        error_counts_sql = defaultdict(int, cube.error_counts(language='sql'))
+        error_counts_cypher = defaultdict(int, cube.error_counts(language='cypher'))
+        total_sql = cube.total(language='sql')
+        total_cypher = cube.total(language='cypher')
         
         # Get all error categories
         all_categories = sorted(set(list(error_counts_sql.keys()) + list(error_counts_cypher.keys())))
@@ -638,20 +509,11 @@ class ThesisPlotter:
         with open(self.output_dir / '6_error_table.tex', 'w') as f:
             f.write(latex)
     
-    def plot_error_by_dataset_heatmap(self, all_results: Dict):
+    def plot_error_by_dataset_heatmap(self, cube: MetricCube):
         """Error heatmap (dataset x error_category x language)"""
         datasets = ['rel-f1', 'rel-stack', 'rel-trial']
         
-        # Collect all error categories
-        all_errors = set()
-        for dataset in all_results:
-            for lang in ['sql', 'cypher']:
-                for diff in all_results[dataset][lang]:
-                    for result in all_results[dataset][lang][diff]:
-                        if result.error_category not in ['NONE', 'CORRECT']:
-                            all_errors.add(result.error_category)
-        
-        error_categories = sorted(list(all_errors))
+        error_categories = sorted(cube.error_counts())
         
         if not error_categories:
             print("No errors found for heatmap")
@@ -663,14 +525,8 @@ class ThesisPlotter:
             data = np.zeros((len(datasets), len(error_categories)))
             
             for i, dataset in enumerate(datasets):
-                total_queries = 0
-                error_counts = defaultdict(int)
-                
-                for difficulty in all_results[dataset][language]:
-                    for result in all_results[dataset][language][difficulty]:
-                        total_queries += 1
-                        if result.error_category not in ['NONE', 'CORRECT']:
-                            error_counts[result.error_category] += 1
+                total_queries = cube.total(dataset=dataset, language=language)
+                error_counts = defaultdict(int, cube.error_counts(dataset=dataset, language=language))
                 
                 for j, error_cat in enumerate(error_categories):
                     data[i, j] = (error_counts[error_cat] / total_queries * 100) if total_queries > 0 else 0
@@ -697,20 +553,11 @@ class ThesisPlotter:
         plt.savefig(self.output_dir / '6_error_by_dataset_heatmap.png', dpi=300, bbox_inches='tight')
         plt.close()
     
-    def plot_error_by_difficulty(self, all_results: Dict):
+    def plot_error_by_difficulty(self, cube: MetricCube):
         """Error distribution change with difficulty"""
         difficulties = ['easy', 'intermediate', 'hard']
         
-        # Collect all error categories
-        all_errors = set()
-        for dataset in all_results:
-            for lang in ['sql', 'cypher']:
-                for diff in all_results[dataset][lang]:
-                    for result in all_results[dataset][lang][diff]:
-                        if result.error_category not in ['NONE', 'CORRECT']:
-                            all_errors.add(result.error_category)
-        
-        error_categories = sorted(list(all_errors))
+        error_categories = sorted(cube.error_counts())
         
         if not error_categories:
             print("No errors found for difficulty plot")
@@ -722,14 +569,8 @@ class ThesisPlotter:
             data = {cat: [] for cat in error_categories}
             
             for difficulty in difficulties:
-                total_queries = 0
-                error_counts = defaultdict(int)
-                
-                for dataset in all_results:
-                    for result in all_results[dataset][language].get(difficulty, []):
-                        total_queries += 1
-                        if result.error_category not in ['NONE', 'CORRECT']:
-                            error_counts[result.error_category] += 1
+                total_queries = cube.total(language=language, difficulty=difficulty)
+                error_counts = defaultdict(int, cube.error_counts(language=language, difficulty=difficulty))
                 
                 for cat in error_categories:
                     pct = (error_counts[cat] / total_queries * 100) if total_queries > 0 else 0
@@ -757,7 +598,7 @@ class ThesisPlotter:
     
     # ==================== Section 7: Comparative Synthesis ====================
     
-    def plot_parse_success_comparison(self, all_results: Dict):
+    def plot_parse_success_comparison(self, cube: MetricCube):
         """Parse success rate comparison"""
         datasets = ['rel-f1', 'rel-stack', 'rel-trial']
         difficulties = ['easy', 'intermediate', 'hard']
@@ -772,11 +613,8 @@ class ThesisPlotter:
             cypher_rates = []
             
             for dataset in datasets:
-                sql_results = all_results[dataset]['sql'].get(difficulty, [])
-                cypher_results = all_results[dataset]['cypher'].get(difficulty, [])
-                
-                sql_rate = sum(1 for r in sql_results if r.parse_success) / len(sql_results) if sql_results else 0
-                cypher_rate = sum(1 for r in cypher_results if r.parse_success) / len(cypher_results) if cypher_results else 0
+                sql_rate = cube.mean('parse_success', dataset=dataset, language='sql', difficulty=difficulty)
+                cypher_rate = cube.mean('parse_success', dataset=dataset, language='cypher', difficulty=difficulty)
                 
                 sql_rates.append(sql_rate)
                 cypher_rates.append(cypher_rate)
@@ -804,7 +642,7 @@ class ThesisPlotter:
         plt.savefig(self.output_dir / '7_parse_success_comparison.png', dpi=300, bbox_inches='tight')
         plt.close()
     
-    def plot_final_synthesis_table(self, all_results: Dict):
+    def plot_final_synthesis_table(self, cube: MetricCube):
         """Final synthesis: SQL wins vs Cypher wins by metric"""
         metrics = ['parse_success', 'execution_accuracy', 'entity_f1', 'attribute_f1',
                   'relation_f1', 'filter_f1', 'aggregation_f1', 'return_column_f1', 'result_f1']
@@ -813,24 +651,8 @@ class ThesisPlotter:
         details = {}
         
         for metric in metrics:
-            sql_all = []
-            cypher_all = []
-            
-            for dataset in all_results:
-                for difficulty in all_results[dataset]['sql']:
-                    sql_all.extend(all_results[dataset]['sql'][difficulty])
-                for difficulty in all_results[dataset]['cypher']:
-                    cypher_all.extend(all_results[dataset]['cypher'][difficulty])
-            
-            if metric == 'parse_success':
-                sql_val = sum(1 for r in sql_all if r.parse_success) / len(sql_all) if sql_all else 0
-                cypher_val = sum(1 for r in cypher_all if r.parse_success) / len(cypher_all) if cypher_all else 0
-            elif metric == 'execution_accuracy':
-                sql_val = sum(1 for r in sql_all if r.execution_accuracy) / len(sql_all) if sql_all else 0
-                cypher_val = sum(1 for r in cypher_all if r.execution_accuracy) / len(cypher_all) if cypher_all else 0
-            else:
-                sql_val = self._safe_mean_attribute(sql_all, metric)
-                cypher_val = self._safe_mean_attribute(cypher_all, metric)
+            sql_val = cube.mean(metric, language='sql')
+            cypher_val = cube.mean(metric, language='cypher')
             
             details[metric] = {'sql': sql_val, 'cypher': cypher_val}
             
@@ -927,26 +749,10 @@ class ThesisPlotter:
     
     # ==================== Main Generation Method ====================
     
-    def generate_all_plots(self):
-        """Generate all plots and tables for the thesis"""
-        print("Loading all results...")
-        all_results = self.load_all_results()
-        
-        print("\n=== Section 1: Aggregate Results ===")
-        self.plot_overall_comparison(all_results)
-        
-        print("\n=== Section 2: Results by Dataset ===")
-        for dataset in ['rel-f1', 'rel-stack', 'rel-trial']:
-            print(f"  Processing {dataset}...")
-            self.plot_dataset_comparison(all_results, dataset)
-            self.plot_dataset_difficulty_breakdown(all_results, dataset)
-        
-        print("\n=== Section 3: Results by Difficulty ===")
-        for difficulty in ['easy', 'intermediate', 'hard']:
-            print(f"  Processing {difficulty}...")
-            self.plot_difficulty_across_datasets(all_results, difficulty)
-        
-        print("\n=== Section 4: Structural Analysis ===")
+    def plot_targets(self, cube: MetricCube) -> list[PlotTarget]:
+        """Every figure and table as a build target, keyed by the cube slice it reads"""
+        datasets = ['rel-f1', 'rel-stack', 'rel-trial']
+        difficulties = ['easy', 'intermediate', 'hard']
         components = {
             'entity_f1': 'Entity F1',
             'attribute_f1': 'Attribute F1',
@@ -955,33 +761,89 @@ class ThesisPlotter:
             'aggregation_f1': 'Aggregation F1',
             'return_column_f1': 'Return Column F1'
         }
-        for comp, label in components.items():
-            print(f"  Processing {label}...")
-            self.plot_structural_component(all_results, comp, label)
+        overall = cube.fingerprint()
         
-        print("  Generating radar chart...")
-        self.plot_structural_radar(all_results)
+        # Section 1: Aggregate Results
+        targets = [
+            PlotTarget('overall', ThesisPlotter.plot_overall_comparison,
+                       ('1_overall_sql_vs_cypher.png', '1_overall_table.tex'), inputs=overall),
+        ]
         
-        print("\n=== Section 5: Result Accuracy ===")
-        self.plot_execution_accuracy_heatmap(all_results)
-        self.plot_precision_recall_analysis(all_results)
+        # Section 2: Results by Dataset
+        for dataset in datasets:
+            inputs = cube.fingerprint(dataset=dataset)
+            targets += [
+                PlotTarget(f'dataset_{dataset}', ThesisPlotter.plot_dataset_comparison,
+                           (f'2_{dataset}_sql_vs_cypher.png',), (dataset,), inputs),
+                PlotTarget(f'dataset_{dataset}_difficulty', ThesisPlotter.plot_dataset_difficulty_breakdown,
+                           (f'2_{dataset}_difficulty_breakdown.png',), (dataset,), inputs),
+            ]
+        
+        # Section 3: Results by Difficulty
+        for difficulty in difficulties:
+            targets.append(
+                PlotTarget(f'difficulty_{difficulty}', ThesisPlotter.plot_difficulty_across_datasets,
+                           (f'3_{difficulty}_across_datasets.png',), (difficulty,),
+                           cube.fingerprint(difficulty=difficulty))
+            )
         
-        print("\n=== Section 6: Error Analysis ===")
-        self.plot_error_distribution(all_results)
-        self.plot_error_by_dataset_heatmap(all_results)
-        self.plot_error_by_difficulty(all_results)
+        # Section 4: Structural Analysis
+        for comp, label in components.items():
+            targets.append(
+                PlotTarget(f'structural_{comp}', ThesisPlotter.plot_structural_component,
+                           (f'4_{comp}.png',), (comp, label), overall)
+            )
+        targets.append(
+            PlotTarget('structural_radar', ThesisPlotter.plot_structural_radar,
+                       ('4_structural_radar.png',), inputs=overall)
+        )
+        
+        # Section 5: Result Accuracy
+        targets += [
+            PlotTarget('execution_accuracy_heatmap', ThesisPlotter.plot_execution_accuracy_heatmap,
+                       ('5_execution_accuracy_heatmap.png',), inputs=overall),
+            PlotTarget('precision_recall', ThesisPlotter.plot_precision_recall_analysis,
+                       ('5_precision_recall.png',),
+                       inputs=cube.fingerprint(row_columns=('result_precision', 'result_recall'))),
+        ]
+        
+        # Section 6: Error Analysis
+        targets += [
+            PlotTarget('error_distribution', ThesisPlotter.plot_error_distribution,
+                       ('6_error_distribution.png', '6_error_table.tex'), inputs=overall),
+            PlotTarget('error_by_dataset', ThesisPlotter.plot_error_by_dataset_heatmap,
+                       ('6_error_by_dataset_heatmap.png',), inputs=overall),
+            PlotTarget('error_by_difficulty', ThesisPlotter.plot_error_by_difficulty,
+                       ('6_error_by_difficulty.png',), inputs=overall),
+        ]
+        
+        # Section 7: Comparative Synthesis
+        targets += [
+            PlotTarget('parse_success', ThesisPlotter.plot_parse_success_comparison,
+                       ('7_parse_success_comparison.png',), inputs=overall),
+            PlotTarget('synthesis', ThesisPlotter.plot_final_synthesis_table,
+                       ('7_final_synthesis.png', '7_synthesis_table.tex'), inputs=overall),
+        ]
+        return targets
+    
+    def generate_all_plots(self, max_workers: int | None = None, force: bool = False):
+        """Generate all plots and tables for the thesis, re-rendering only stale ones"""
+        print("Loading all results...")
+        cube = self.load_all_results()
         
-        print("\n=== Section 7: Comparative Synthesis ===")
-        self.plot_parse_success_comparison(all_results)
-        self.plot_final_synthesis_table(all_results)
+        targets = self.plot_targets(cube)
+        rendered, skipped = build_plots(
+            targets, self.output_dir, context=(self, cube), max_workers=max_workers, force=force
+        )
         
-        print(f"\n✅ All plots saved to: {self.output_dir}")
+        print(f"\n✅ Rendered {rendered} of {len(targets)} targets ({skipped} up to date)")
+        print(f"✅ All plots saved to: {self.output_dir}")
         print(f"✅ LaTeX tables saved to: {self.output_dir}")
 
 
 def main():
     """Main entry point"""
-    results_dir = PROJECT_ROOT / "results"
+    results_dir = PROJECT_ROOT / "results_store"
     output_dir = PROJECT_ROOT / "thesis_plots"
     
     plotter = ThesisPlotter(results_dir, output_dir)
@@ -0,0 +1,193 @@
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass
+from decimal import Decimal
+from hashlib import blake2b, sha256
+from logging import getLogger
+from pathlib import Path
+from time import time
+
+from constants import EXECUTION_CACHE_MAX_BYTES, EXECUTION_CACHE_PATH
+from evaluation.utils import result_row_set
+from models import ExecutionProfile
+
+logger = getLogger(__name__)
+
+SAMPLE_ROWS = 20
+ROW_HASH_BYTES = 8
+
+_cache: "ExecutionCache | None" = None
+_cache_enabled = True
+_cache_lock = threading.Lock()
+
+
+def comparable_value(value):
+    """
+    A form of ``value`` whose repr is equal exactly when the values compare
+    equal: ``1``, ``1.0``, ``True`` and ``Decimal('1.00')`` all become ``1``.
+    """
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, Decimal):
+        if value.is_finite() and value == value.to_integral_value():
+            return int(value)
+        as_float = float(value)
+        return as_float if Decimal(as_float) == value else value.normalize()
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    if isinstance(value, (list, tuple)):
+        return tuple(comparable_value(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((str(key), comparable_value(item)) for key, item in value.items()))
+    return value
+
+
+def result_digest(rows: list) -> str:
+    """Digest of a result with row order kept, equal for results that compare equal."""
+    return sha256(repr(comparable_value(rows)).encode()).hexdigest()
+
+
+@dataclass(slots=True, frozen=True)
+class ExecutionRecord:
+    """
+    What scoring needs from one executed query.
+
+    ``digest`` compares results exactly (row order included, see
+    ``result_digest``);
+    ``row_hashes`` are the hashed rows of ``result_row_set`` so result F1 can
+    be computed without the rows themselves.
+    """
+    digest: str
+    row_hashes: frozenset[bytes]
+    rows: int
+    sample: list
+    profile: ExecutionProfile
+
+    @classmethod
+    def from_rows(cls, rows: list, profile: ExecutionProfile) -> "ExecutionRecord":
+        return cls(
+            digest=result_digest(rows),
+            row_hashes=frozenset(
+                blake2b(repr(row).encode(), digest_size=ROW_HASH_BYTES).digest()
+                for row in result_row_set(rows)
+            ),
+            rows=len(rows),
+            sample=json.loads(json.dumps(rows[:SAMPLE_ROWS], default=str)),
+            profile=profile,
+        )
+
+
+class ExecutionCache:
+    """
+    SQLite-backed cache of ExecutionRecords keyed by (backend, dataset
+    fingerprint, canonical query hash), evicting least recently used entries
+    once the stored size exceeds ``max_bytes``. Callers fold the scoring
+    version into the fingerprint so that records built by an older digest
+    or row normalization are never read back.
+    """
+
+    def __init__(self, path: Path = EXECUTION_CACHE_PATH, max_bytes: int = EXECUTION_CACHE_MAX_BYTES):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS executions (
+                backend TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                query_hash TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                row_hashes BLOB NOT NULL,
+                rows INTEGER NOT NULL,
+                sample TEXT NOT NULL,
+                profile TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (backend, fingerprint, query_hash)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS executions_last_used ON executions (last_used)")
+        self._conn.commit()
+
+    def get(self, backend: str, fingerprint: str, query_hash: str) -> ExecutionRecord | None:
+        key = (backend, fingerprint, query_hash)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest, row_hashes, rows, sample, profile FROM executions "
+                "WHERE backend = ? AND fingerprint = ? AND query_hash = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE executions SET last_used = ? "
+                "WHERE backend = ? AND fingerprint = ? AND query_hash = ?",
+                (time(), *key),
+            )
+            self._conn.commit()
+
+        digest, row_hashes, rows, sample, profile = row
+        return ExecutionRecord(
+            digest=digest,
+            row_hashes=frozenset(
+                row_hashes[i:i + ROW_HASH_BYTES] for i in range(0, len(row_hashes), ROW_HASH_BYTES)
+            ),
+            rows=rows,
+            sample=json.loads(sample),
+            profile=ExecutionProfile.from_dict(json.loads(profile)),
+        )
+
+    def put(self, backend: str, fingerprint: str, query_hash: str, record: ExecutionRecord) -> None:
+        row_hashes = b"".join(sorted(record.row_hashes))
+        sample = json.dumps(record.sample)
+        profile = json.dumps(record.profile.to_dict())
+        size = len(row_hashes) + len(sample) + len(profile)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO executions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (backend, fingerprint, query_hash, record.digest, row_hashes,
+                 record.rows, sample, profile, size, time()),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT coalesce(sum(size), 0) FROM executions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = 0
+        for rowid, size in self._conn.execute(
+            "SELECT rowid, size FROM executions ORDER BY last_used"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM executions WHERE rowid = ?", (rowid,))
+            total -= size
+            evicted += 1
+        logger.info(f"Evicted {evicted} entries from the execution cache")
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def get_execution_cache() -> ExecutionCache | None:
+    """The process-wide cache, opened on first use; None when disabled."""
+    global _cache
+    if not _cache_enabled:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ExecutionCache()
+        return _cache
+
+
+def set_execution_cache_enabled(enabled: bool) -> None:
+    global _cache_enabled
+    _cache_enabled = enabled
@@ -0,0 +1,380 @@
+import copy
+from dataclasses import dataclass, replace
+from hashlib import sha256
+from logging import getLogger
+from pathlib import Path
+from time import perf_counter
+from typing import Iterator
+
+import torch
+from transformers import AutoModelForCausalLM, AutoTokenizer, DynamicCache
+from transformers import __version__ as transformers_version
+
+from constants import PREFIX_KV_CACHE_DIR, get_tasks_directory
+from evaluation.checkpoint import open_result_writer
+from evaluation.query_extraction import extract_query
+from evaluation.remote_eval import db_path_resolver, load_schema, publish_results
+from evaluation.remote_eval_utils import get_prompt_hash, prompt_builder
+from evaluation.scoring import ANALYZERS, get_task_result
+from evaluation.tracing import span
+from evaluation.utils import build_user_prompt
+from models import DatasetName, LLMUsage, Task, TaskDifficulty, TaskType
+from utils import get_tasks_from_json
+
+logger = getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 8
+DEFAULT_BATCH_TOKENS = 4096
+DEFAULT_MAX_NEW_TOKENS = 256
+
+# Stands in for the question while rendering the chat template, so that the
+# text before it (system prompt and template header) can be cached once.
+QUESTION_PLACEHOLDER = "\x00question\x00"
+
+# Bump when the layout of persisted prefix caches changes.
+PREFIX_CACHE_VERSION = 1
+
+
+@dataclass(slots=True)
+class GenerationStats:
+    """Throughput of local generation and how full its batches were."""
+    batches: int = 0
+    sequences: int = 0
+    slots: int = 0
+    prompt_tokens: int = 0
+    padded_tokens: int = 0
+    generated_tokens: int = 0
+    seconds: float = 0.0
+
+    def add(self, sequences: int, slots: int, prompt_tokens: int, padded_tokens: int, generated: int, seconds: float) -> None:
+        self.batches += 1
+        self.sequences += sequences
+        self.slots += slots
+        self.prompt_tokens += prompt_tokens
+        self.padded_tokens += padded_tokens
+        self.generated_tokens += generated
+        self.seconds += seconds
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.generated_tokens / self.seconds if self.seconds else 0.0
+
+    @property
+    def occupancy(self) -> float:
+        """Share of batch slots that held a sequence."""
+        return self.sequences / self.slots if self.slots else 0.0
+
+    @property
+    def padding_efficiency(self) -> float:
+        """Share of the padded question tokens that were real tokens."""
+        return self.prompt_tokens / self.padded_tokens if self.padded_tokens else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"Local generation: {self.generated_tokens} tokens in {self.seconds:.1f}s "
+            f"({self.tokens_per_second:.1f} tokens/s) over {self.batches} batches, "
+            f"occupancy {self.occupancy:.0%}, padding efficiency {self.padding_efficiency:.0%}"
+        )
+
+
+@dataclass(slots=True)
+class PromptPrefix:
+    """The tokens every prompt of a task type starts with and their KV cache."""
+    text: str
+    input_ids: list[int]
+    cache: DynamicCache
+
+
+def save_prefix_cache(path: Path, prefix: PromptPrefix) -> None:
+    """Persist a prefix with its per-layer key/value tensors (written atomically)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    state = {
+        "version": PREFIX_CACHE_VERSION,
+        "text": prefix.text,
+        "input_ids": prefix.input_ids,
+        "layers": [(layer.keys.cpu(), layer.values.cpu()) for layer in prefix.cache.layers],
+    }
+    tmp = path.with_suffix(".tmp")
+    torch.save(state, tmp)
+    tmp.replace(path)
+
+
+def load_prefix_cache(path: Path, text: str, device) -> PromptPrefix | None:
+    """The prefix persisted at ``path``, or None if missing, stale or unreadable."""
+    if not path.exists():
+        return None
+    try:
+        state = torch.load(path, map_location=device, weights_only=True)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable prefix cache {path}: {e}")
+        return None
+    if state.get("version") != PREFIX_CACHE_VERSION or state.get("text") != text:
+        return None
+
+    cache = DynamicCache()
+    for index, (keys, values) in enumerate(state["layers"]):
+        cache.update(keys, values, index)
+    return PromptPrefix(text, state["input_ids"], cache)
+
+
+def length_batches(lengths: list[int], batch_size: int, batch_tokens: int) -> list[list[int]]:
+    """
+    Group sequence indices into batches of similar length.
+
+    Indices are sorted by length and a batch is closed once it holds
+    ``batch_size`` sequences or padding it to its longest sequence would
+    exceed ``batch_tokens``, so short questions are not padded to long ones.
+    """
+    batches, batch = [], []
+    for index in sorted(range(len(lengths)), key=lambda i: lengths[i]):
+        if batch and (len(batch) == batch_size or lengths[index] * (len(batch) + 1) > batch_tokens):
+            batches.append(batch)
+            batch = []
+        batch.append(index)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class LocalGenerator:
+    """
+    Greedy text-to-query generation with a transformers causal LM.
+
+    Prompts are split into the shared prefix (system prompt with the schema)
+    and the question. The prefix is prefilled once and its KV cache is copied
+    into every batch, so only the question tokens are prefilled per task.
+    Questions are batched by length and padded on the left, between the
+    prefix and the question, so that every sequence continues the same cache.
+    """
+
+    def __init__(
+        self,
+        model,
+        tokenizer,
+        model_name: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        batch_tokens: int = DEFAULT_BATCH_TOKENS,
+        max_new_tokens: int = DEFAULT_MAX_NEW_TOKENS,
+        cache_dir: Path | None = PREFIX_KV_CACHE_DIR,
+    ):
+        self.model = model.eval()
+        self.tokenizer = tokenizer
+        if tokenizer.pad_token_id is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        self.model_name = model_name
+        self.device = model.device
+        self.batch_size = batch_size
+        self.batch_tokens = batch_tokens
+        self.max_new_tokens = max_new_tokens
+        self.cache_dir = cache_dir
+        self.stats = GenerationStats()
+        self._prefixes: dict[str, PromptPrefix] = {}
+
+    @classmethod
+    def load(cls, model_name: str, device: str | None = None, **options) -> "LocalGenerator":
+        """Load a Hugging Face model; float32 on CPU, bfloat16 on GPU."""
+        device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        logger.info(f"Loading {model_name} on {device}")
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModelForCausalLM.from_pretrained(
+            model_name, torch_dtype=torch.float32 if device == "cpu" else torch.bfloat16
+        ).to(device)
+        return cls(model, tokenizer, model_name, **options)
+
+    def _render(self, system: str, question: str) -> str:
+        if self.tokenizer.chat_template:
+            return self.tokenizer.apply_chat_template(
+                [{"role": "system", "content": system}, {"role": "user", "content": question}],
+                tokenize=False,
+                add_generation_prompt=True,
+            )
+        return f"{system}\n\n{question}\n"
+
+    def _split(self, system: str) -> tuple[str, str, str]:
+        """
+        Prompt text before the question's line, and the text around the
+        question. Splitting at a line break keeps the tokens of the prefix the
+        same as in the full prompt.
+        """
+        rendered = self._render(system, build_user_prompt(QUESTION_PLACEHOLDER))
+        before, _, after = rendered.partition(QUESTION_PLACEHOLDER)
+        line_start = before.rfind("\n") + 1
+        return before[:line_start], before[line_start:], after
+
+    def _tokenize(self, text: str, first: bool = False) -> list[int]:
+        # Chat templates render the BOS token themselves.
+        special = first and not self.tokenizer.chat_template
+        return self.tokenizer(text, add_special_tokens=special)["input_ids"]
+
+    def _fingerprint(self) -> str:
+        """Identifies the weights and numerics a persisted cache was computed with."""
+        config = self.model.config.to_json_string(use_diff=False)
+        return sha256(
+            f"{self.model_name}\n{self._weights_version()}\n{self.model.dtype}\n"
+            f"transformers {transformers_version}, torch {torch.__version__}\n{config}".encode()
+        ).hexdigest()[:16]
+
+    def _weights_version(self) -> str:
+        """
+        The hub commit the weights were downloaded at, or for a local model
+        directory the size and mtime of its weight files, which change when
+        the model is fine-tuned or re-saved in place.
+        """
+        path = Path(self.model.name_or_path)
+        if path.is_dir():
+            return ",".join(
+                f"{file.name}:{file.stat().st_size}:{file.stat().st_mtime_ns}"
+                for file in sorted(path.iterdir())
+                if file.suffix in (".safetensors", ".bin", ".pt", ".pth")
+            )
+        return getattr(self.model.config, "_commit_hash", None) or ""
+
+    def _cache_path(self, key: str, label: str | None) -> Path:
+        model_slug = self.model_name.strip("/").replace("/", "_")
+        return self.cache_dir / model_slug / f"{label + '_' if label else ''}{key}.pt"
+
+    def prefix(self, system: str, label: str | None = None) -> PromptPrefix:
+        """
+        The prompt prefix of ``system``: from memory, else from ``cache_dir``,
+        else prefilled (and persisted). ``label`` (e.g. dataset and task type)
+        only names the cache file.
+        """
+        text, _, _ = self._split(system)
+        key = sha256(f"{self._fingerprint()}\n{text}".encode()).hexdigest()[:16]
+        if key in self._prefixes:
+            return self._prefixes[key]
+
+        path = self._cache_path(key, label) if self.cache_dir is not None else None
+        if path is not None:
+            start = perf_counter()
+            prefix = load_prefix_cache(path, text, self.device)
+            if prefix is not None:
+                logger.info(
+                    f"Loaded {len(prefix.input_ids)} prefix tokens from {path} "
+                    f"in {(perf_counter() - start) * 1000:.0f}ms"
+                )
+                self._prefixes[key] = prefix
+                return prefix
+
+        input_ids = self._tokenize(text, first=True)
+        with span("prefill_prefix", tokens=len(input_ids)), torch.inference_mode():
+            start = perf_counter()
+            output = self.model(torch.tensor([input_ids], device=self.device), use_cache=True)
+        logger.info(f"Prefilled {len(input_ids)} prefix tokens in {(perf_counter() - start) * 1000:.0f}ms")
+        prefix = PromptPrefix(text, input_ids, output.past_key_values)
+        if path is not None:
+            try:
+                save_prefix_cache(path, prefix)
+            except Exception as e:
+                logger.warning(f"Could not persist prefix cache to {path}: {e}")
+        self._prefixes[key] = prefix
+        return prefix
+
+    def generate(
+        self, system: str, questions: list[str], label: str | None = None
+    ) -> Iterator[tuple[int, str, LLMUsage]]:
+        """
+        Yield ``(index, text, usage)`` for each question, batch by batch.
+
+        Batches are formed by question length, so results do not come in the
+        order of ``questions``.
+        """
+        prefix = self.prefix(system, label)
+        _, line_start, after = self._split(system)
+        suffixes = [self._tokenize(line_start + build_user_prompt(q) + after) for q in questions]
+
+        for batch in length_batches([len(s) for s in suffixes], self.batch_size, self.batch_tokens):
+            width = max(len(suffixes[i]) for i in batch)
+            pad = self.tokenizer.pad_token_id
+            input_ids = [prefix.input_ids + [pad] * (width - len(suffixes[i])) + suffixes[i] for i in batch]
+            attention_mask = [
+                [1] * len(prefix.input_ids) + [0] * (width - len(suffixes[i])) + [1] * len(suffixes[i])
+                for i in batch
+            ]
+            cache = copy.deepcopy(prefix.cache)
+            cache.batch_repeat_interleave(len(batch))
+
+            with span("generate", model=self.model_name, batch=len(batch)), torch.inference_mode():
+                start = perf_counter()
+                output = self.model.generate(
+                    input_ids=torch.tensor(input_ids, device=self.device),
+                    attention_mask=torch.tensor(attention_mask, device=self.device),
+                    past_key_values=cache,
+                    max_new_tokens=self.max_new_tokens,
+                    do_sample=False,
+                    pad_token_id=pad,
+                )
+                elapsed = perf_counter() - start
+
+            generated = output[:, len(input_ids[0]):].tolist()
+            lengths = [self._generated_length(tokens) for tokens in generated]
+            self.stats.add(
+                len(batch), self.batch_size, sum(len(suffixes[i]) for i in batch), width * len(batch),
+                sum(lengths), elapsed,
+            )
+            for i, tokens, length in zip(batch, generated, lengths):
+                yield i, self.tokenizer.decode(tokens[:length], skip_special_tokens=True), LLMUsage(
+                    model=self.model_name,
+                    prompt_tokens=len(prefix.input_ids) + len(suffixes[i]),
+                    completion_tokens=length,
+                    cached_tokens=len(prefix.input_ids),
+                    latency_ms=elapsed * 1000,
+                )
+
+    def _generated_length(self, tokens: list[int]) -> int:
+        """Generated tokens up to and including the first end-of-sequence token."""
+        eos = self.model.generation_config.eos_token_id
+        eos = set(eos if isinstance(eos, list) else [eos if eos is not None else self.tokenizer.eos_token_id])
+        for index, token in enumerate(tokens):
+            if token in eos:
+                return index + 1
+        return len(tokens)
+
+
+def evaluate_local_model(
+    generator: LocalGenerator,
+    dataset_name: DatasetName,
+    task_type: TaskType,
+    resume: bool = False,
+) -> None:
+    """
+    Evaluate a local model on a dataset.
+
+    Like ``evaluate_remote_model``: results are checkpointed to
+    ``<difficulty>.jsonl`` as they are scored (in batch order rather than
+    task order) and published when a difficulty finishes; ``resume`` skips
+    tasks already in the checkpoint.
+    """
+    schema = load_schema(task_type, dataset_name)
+    db_path = db_path_resolver[task_type](dataset_name)
+    tasks_dir = get_tasks_directory(dataset_name)
+    prompt_hash = get_prompt_hash(task_type, schema)
+    system = prompt_builder[task_type](schema)
+    model_name = generator.model_name
+    label = f"{dataset_name.value}_{task_type.value.lower()}"
+
+    for difficulty in TaskDifficulty:
+        tasks_file = tasks_dir / f"{difficulty.value}.json"
+
+        if not tasks_file.exists():
+            logger.warning(f"Skipping missing: {tasks_file}")
+            continue
+
+        tasks = get_tasks_from_json(tasks_file)
+        writer, completed = open_result_writer(
+            dataset_name, task_type, difficulty, model_name, prompt_hash, len(tasks), resume
+        )
+        pending: list[Task] = [task for task in tasks if task.question not in completed]
+        logger.info(
+            f"Processing {len(pending)} tasks for {difficulty.value} "
+            f"({len(completed)} already completed)"
+        )
+
+        with writer:
+            for index, text, usage in generator.generate(system, [task.question for task in pending], label):
+                query = extract_query(text, ANALYZERS[task_type])
+                result = get_task_result(pending[index], query, task_type, db_path)
+                writer.write(replace(result, llm_usage=usage))
+
+        publish_results(writer, dataset_name, task_type, model_name, difficulty)
+        logger.info(generator.stats.summary())
@@ -1,56 +1,61 @@
 from pathlib import Path
 
-from models import TaskResult, TaskType
-import json
-from collections import Counter
+from evaluation.plot_build import PlotTarget, build_plots
+from evaluation.results_store import load_results_frame
+from models import TaskType
 import matplotlib.pyplot as plt
 
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
+# Plotted metric -> results store column
+FIELDS = {
+    "syntaxically_correct": "syntaxically_correct",
+    "correct_result": "correct_result",
+    "exact_match": "execution_accuracy",
+}
+
+
+def plot_results(dataset_name: str, max_workers: int | None = None, force: bool = False) -> None:
+    """
+    Plot one bar chart per task type, model and difficulty.
+
+    Counts are computed in one grouped pass over the store; a chart is only
+    re-rendered when its counts (or this module) changed.
+    """
+    frame = load_results_frame(dataset=dataset_name)
+    counts = (
+        frame[list(FIELDS.values())]
+        .fillna(False)
+        .astype(int)
+        .groupby([frame["task_type"], frame["model"], frame["difficulty"]])
+        .sum()
+    )
 
-def plot_results(dataset_name: str) -> None:
-    results_dir = PROJECT_ROOT / "results" / dataset_name
-
-    for task_type in results_dir.iterdir():
-        if not task_type.is_dir():
-            continue
-        plot_for_task_type(task_type, dataset_name)
-
-
-def plot_for_task_type(task_type: Path, dataset_name: str) -> None:
-    for model_name in task_type.iterdir():
-        if not model_name.is_dir():
-            continue
-        plot_for_model(
-            model_name, 
-            TaskType.SQL if task_type.name == "sql" else TaskType.CYPHER,
-            dataset_name
+    targets = []
+    for (task_type, model_name, difficulty), row in counts.iterrows():
+        task_type = TaskType.SQL if task_type == "sql" else TaskType.CYPHER
+        field_counts = {field: int(row[column]) for field, column in FIELDS.items()}
+        targets.append(
+            PlotTarget(
+                name=f"{model_name}_{task_type.name}_{difficulty}",
+                render=plot_for_results,
+                outputs=(f"{model_name}_{task_type.name}_{difficulty}.png",),
+                args=(field_counts, task_type, model_name, difficulty, dataset_name),
+            )
         )
 
+    build_plots(targets, PROJECT_ROOT / "plots" / dataset_name, max_workers=max_workers, force=force)
 
-def plot_for_model(model_name: Path, task_type: TaskType, dataset_name: str) -> None:
-    for result_json in model_name.glob("*.json"):
-        plot_for_result_json(result_json, task_type, model_name.name, dataset_name)
 
-
-def plot_for_result_json(
-    result_json: Path,
+def plot_for_results(
+    counts: dict[str, int],
     task_type: TaskType,
     model_name: str,
+    difficulty: str,
     dataset_name: str,
 ) -> None:
-    results = [
-        TaskResult.from_dict(r, task_type) for r in json.load(result_json.open())
-    ]
-
-    fields = ["syntaxically_correct", "correct_result", "exact_match"]
-    counts = Counter(
-        {
-            field: sum(getattr(result, field, False) for result in results)
-            for field in fields
-        }
-    )
+    fields = list(FIELDS)
 
     plt.figure(figsize=(10, 8))
     bars = plt.bar(fields, [counts[field] for field in fields])
@@ -64,13 +69,13 @@ def plot_for_result_json(
             ha="center",
             va="bottom",
         )
-    plt.xlabel(f"Metrics for {result_json.stem}")
+    plt.xlabel(f"Metrics for {difficulty}")
     plt.ylabel("Number of True Results")
     plt.title(f"{model_name} - {task_type.name}")
     plt.tight_layout()
 
     plots_dir = PROJECT_ROOT / "plots" / dataset_name
     plots_dir.mkdir(parents=True, exist_ok=True)
-    plot_filename = f"{model_name}_{task_type.name}_{result_json.stem}.png"
+    plot_filename = f"{model_name}_{task_type.name}_{difficulty}.png"
     plt.savefig(plots_dir / plot_filename)
-    plt.close()
\ No newline at end of file
+    plt.close()
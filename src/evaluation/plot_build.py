@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from inspect import getsourcefile
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Callable
+
+logger = getLogger(__name__)
+
+MANIFEST_NAME = ".plot_manifest.json"
+
+_worker_context: tuple = ()
+
+
+@dataclass(slots=True, frozen=True)
+class PlotTarget:
+    """
+    One figure as a build target.
+
+    ``render(*context, *args)`` writes ``outputs`` (relative to the output
+    directory). ``inputs`` is whatever the figure depends on beyond ``args``,
+    typically a fingerprint of the aggregates it reads.
+    """
+
+    name: str
+    render: Callable
+    outputs: tuple[str, ...]
+    args: tuple = ()
+    inputs: Any = None
+
+    def input_hash(self) -> str:
+        payload = json.dumps(
+            [self.name, self.render.__qualname__, _source_hash(self.render), self.args, self.inputs],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _source_hash(render: Callable) -> str:
+    """Hash of the module that defines ``render``, so code changes re-render too."""
+    source = getsourcefile(render)
+    if source is None:
+        return ""
+    return hashlib.sha256(Path(source).read_bytes()).hexdigest()
+
+
+def _load_manifest(path: Path) -> dict[str, str]:
+    if not path.exists():
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _write_manifest(path: Path, manifest: dict[str, str]) -> None:
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _init_worker(context: tuple) -> None:
+    global _worker_context
+    import matplotlib
+
+    matplotlib.use("Agg", force=True)
+    _worker_context = context
+
+
+def _render(render: Callable, args: tuple) -> None:
+    render(*_worker_context, *args)
+
+
+def build_plots(
+    targets: list[PlotTarget],
+    output_dir: Path,
+    context: tuple = (),
+    max_workers: int | None = None,
+    force: bool = False,
+) -> tuple[int, int]:
+    """
+    Render the targets whose input hash changed or whose outputs are missing.
+
+    Stale targets are rendered in a process pool on the Agg backend; ``context``
+    is sent once per worker and prepended to every render call. The hashes of
+    successful renders are kept in ``.plot_manifest.json`` in ``output_dir``.
+    Returns the number of rendered and skipped targets.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / MANIFEST_NAME
+    manifest = _load_manifest(manifest_path)
+
+    stale = {}
+    for target in targets:
+        input_hash = target.input_hash()
+        outputs_exist = all((output_dir / output).exists() for output in target.outputs)
+        if force or manifest.get(target.name) != input_hash or not outputs_exist:
+            stale[target.name] = (target, input_hash)
+
+    skipped = len(targets) - len(stale)
+    if not stale:
+        logger.info(f"All {skipped} plots in {output_dir} are up to date")
+        return 0, skipped
+
+    rendered = 0
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers, initializer=_init_worker, initargs=(context,)
+        ) as pool:
+            futures = {
+                pool.submit(_render, target.render, target.args): name
+                for name, (target, _) in stale.items()
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Rendering {name} failed: {e}")
+                    manifest.pop(name, None)
+                    continue
+                manifest[name] = stale[name][1]
+                rendered += 1
+    finally:
+        _write_manifest(manifest_path, manifest)
+
+    logger.info(f"Rendered {rendered} plots, {skipped} up to date, in {output_dir}")
+    return rendered, skipped
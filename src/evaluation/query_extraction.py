@@ -0,0 +1,113 @@
+import re
+
+from models import QueryAnalyzer
+
+FENCE = "```"
+
+# Words that can start a line in the middle of a SQL or Cypher statement. A
+# line after a blank line that starts with anything else is taken as prose.
+CONTINUATION_KEYWORDS = {
+    "SELECT", "FROM", "WHERE", "GROUP", "ORDER", "HAVING", "LIMIT", "OFFSET", "JOIN",
+    "LEFT", "RIGHT", "INNER", "OUTER", "FULL", "CROSS", "ON", "USING", "UNION", "EXCEPT",
+    "INTERSECT", "WITH", "AND", "OR", "NOT", "CASE", "WHEN", "THEN", "ELSE", "END",
+    "MATCH", "OPTIONAL", "RETURN", "UNWIND", "SKIP", "CALL", "YIELD", "DISTINCT", "AS",
+    "BY", "IN", "IS", "LIKE", "BETWEEN", "ASC", "DESC", "ASCENDING", "DESCENDING", "XOR",
+    "SET", "MERGE", "CREATE", "DELETE", "DETACH", "REMOVE", "FOREACH", "CONTAINS", "STARTS",
+    "ENDS", "ALL", "ANY", "NONE", "SINGLE", "EXISTS", "OVER", "PARTITION", "WINDOW", "QUALIFY",
+}
+# A comment line (SQL ``--``/``/*``, Cypher ``//``) can sit inside a statement too.
+COMMENT_PREFIXES = ("--", "/*", "//")
+
+
+def _terminator(text: str) -> int | None:
+    """
+    Index of the first ``;`` outside string literals and quoted identifiers.
+    Inside a string, a backslash escapes the next character (Cypher ``'O\\'Brien'``).
+    """
+    quote = None
+    escaped = False
+    for index, char in enumerate(text):
+        if escaped:
+            escaped = False
+        elif quote:
+            if char == "\\" and quote != "`":
+                escaped = True
+            elif char == quote:
+                quote = None
+        elif char in "'\"`":
+            quote = char
+        elif char == ";":
+            return index
+    return None
+
+
+class QueryExtractor:
+    """
+    Pulls the query out of a streamed response as deltas arrive.
+
+    Text up to the first markdown fence (e.g. "Here is the query:") is dropped
+    with the fence, and the closing fence ends the query. Otherwise the query
+    ends at a ``;`` outside quotes, or at a blank line followed by a line that
+    neither continues the statement nor is a comment, provided the text before
+    it already parses. ``feed`` returns True once the query is complete
+    so the caller can stop reading the stream.
+    """
+
+    def __init__(self, analyzer: QueryAnalyzer):
+        self.analyzer = analyzer
+        self.text = ""
+        self.query = ""
+        self.complete = False
+        self._checked_blank = -1
+
+    def feed(self, delta: str) -> bool:
+        if not self.complete:
+            self.text += delta
+            self.query, self.complete = self._extract()
+        return self.complete
+
+    def _extract(self) -> tuple[str, bool]:
+        body = self.text.lstrip()
+        if len(body) < len(FENCE) and FENCE.startswith(body):
+            return "", False
+
+        fence = body.find(FENCE)
+        if fence != -1:
+            body = body[fence:]
+            newline = body.find("\n")
+            if newline == -1:
+                return "", False
+            body = body[newline + 1:]
+            end = body.find(FENCE)
+            if end != -1:
+                return body[:end].strip(), True
+
+        end = _terminator(body)
+        if end is not None:
+            return body[:end + 1].strip(), True
+
+        # Blank lines already checked are remembered by their offset in the
+        # whole text, since a fence arriving later moves the start of ``body``.
+        offset = len(self.text) - len(body)
+        for blank in re.finditer(r"\n[ \t]*\n", body):
+            if offset + blank.start() <= self._checked_blank:
+                continue
+            following = re.match(r"\s*([^\s(),]+)[\s(]", body[blank.end():])
+            if not following:
+                break
+            self._checked_blank = offset + blank.start()
+            prefix = body[:blank.start()]
+            word = following.group(1)
+            if word.startswith(COMMENT_PREFIXES) or word.upper() in CONTINUATION_KEYWORDS:
+                continue
+            if self.analyzer.is_valid(prefix):
+                return prefix.strip(), True
+
+        return body.rstrip("`").strip(), False
+
+
+def extract_query(text: str, analyzer: QueryAnalyzer) -> str:
+    """The query of a complete (non-streamed) response, extracted like a stream."""
+    extractor = QueryExtractor(analyzer)
+    extractor.feed(text)
+    return extractor.query or text
@@ -1,10 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, replace
 from logging import getLogger
+from pathlib import Path
+from threading import BoundedSemaphore
 import json
 from tqdm import tqdm
 
-from constants import REMOTE_MODEL_NAME, RESULTS_DIR, get_duckdb_path
+from constants import RESULTS_DIR, get_duckdb_path
+from database.constants import DUCKDB_MAX_CONCURRENCY, NEO4J_MAX_CONCURRENCY
+from database.duckdb import thread_connections
+from evaluation.checkpoint import rewrite_jsonl
 from evaluation.scoring import get_task_result
-from models import DatasetName, TaskDifficulty, TaskType, Task, TaskResult
+from models import DatasetName, TaskDifficulty, TaskType, TaskResult
 from utils import save_task_results
 
 logger = getLogger(__name__)
@@ -14,69 +21,154 @@ db_path_resolver = {
     TaskType.CYPHER: lambda _: None,
 }
 
+BACKEND_CONCURRENCY = {
+    TaskType.SQL: DUCKDB_MAX_CONCURRENCY,
+    TaskType.CYPHER: NEO4J_MAX_CONCURRENCY,
+}
 
-def re_evaluate_results(dataset_name: DatasetName, task_type: TaskType, model: str = "claude-sonnet-4-20250514") -> None:
-    """Re-evaluate SQL or Cypher results for a given already_generated dataset"""
-
-    db_path = db_path_resolver[task_type](dataset_name)
-
-    for task_difficulty in {TaskDifficulty.EASY, TaskDifficulty.INTERMEDIATE ,TaskDifficulty.HARD}:
-        result_file = RESULTS_DIR / dataset_name / task_type.value.lower() / model / f"{task_difficulty.value}.json"
-        if not result_file.exists():
-            logger.warning(f"Result file not found, skipping: {result_file}")
-            continue
-
-        with open(result_file, 'r') as f:
-            existing_results = json.load(f)
-        
-        task_results = []
-        
-        for result_data in tqdm(
-            existing_results, 
-            desc=f"Re-evaluating {task_type.value} Tasks ({dataset_name}, {task_difficulty})"
-        ):
-            
-            task = Task(
-                question=result_data["question"],
-                sql=result_data["expected_script"] if task_type == TaskType.SQL else "",
-                cypher=result_data["expected_script"] if task_type == TaskType.CYPHER else "",
-                cypher_result=None
-            )
-            
-            generated_query = result_data["generated_script"]
-            
-            try:
-                result = get_task_result(task, generated_query, task_type, db_path)
-            except Exception as e:
-                logger.error(f"Error on query: {generated_query[:100]}... Error: {e}")
-                result = TaskResult(
-                    task=task,
-                    response=generated_query,
-                    parse_success=False,
-                    execution_success=False,
-                    entity_f1=0.0,
-                    attribute_f1=0.0,
-                    relation_f1=None,
-                    filter_f1=0.0,
-                    aggregation_f1=0.0,
-                    return_column_f1=0.0,
-                    execution_accuracy=False,
-                    result_f1=0.0,
-                    result_precision=0.0,
-                    result_recall=0.0,
-                    error_category="Evaluation Error",
-                    error_flags=[],
-                    task_type=task_type
-                )
 
-            task_results.append(result)
-        
-        save_task_results(
-            task_results, 
-            dataset_name, 
-            task_difficulty, 
-            task_type, 
-            REMOTE_MODEL_NAME
+@dataclass(slots=True, frozen=True)
+class ResultPartition:
+    """One ``<dataset>/<type>/<model>/<difficulty>.json`` result file."""
+    dataset_name: DatasetName
+    task_type: TaskType
+    model: str
+    difficulty: TaskDifficulty
+    path: Path
+
+
+def discover_partitions(
+    datasets: list[DatasetName] | None = None,
+    task_types: list[TaskType] | None = None,
+    models: list[str] | None = None,
+    results_dir: Path = RESULTS_DIR,
+) -> list[ResultPartition]:
+    """Find every stored result file, optionally restricted to some datasets, types and models."""
+    partitions = []
+    for dataset_name in datasets or list(DatasetName):
+        for task_type in task_types or list(TaskType):
+            type_dir = results_dir / dataset_name / task_type.value.lower()
+            if not type_dir.is_dir():
+                continue
+
+            for model_dir in sorted(p for p in type_dir.iterdir() if p.is_dir()):
+                if models and model_dir.name not in {m.replace("/", "_") for m in models}:
+                    continue
+                for difficulty in TaskDifficulty:
+                    path = model_dir / f"{difficulty.value}.json"
+                    if path.exists():
+                        partitions.append(
+                            ResultPartition(dataset_name, task_type, model_dir.name, difficulty, path)
+                        )
+    return partitions
+
+
+def _re_evaluate_task(
+    result_data: dict, partition: ResultPartition, db_path: Path | None, limit: BoundedSemaphore
+) -> TaskResult:
+    previous = TaskResult.from_dict(result_data, partition.task_type)
+    task = previous.task
+    generated_query = previous.response
+
+    try:
+        with limit:
+            result = get_task_result(task, generated_query, partition.task_type, db_path, previous)
+        return replace(result, llm_usage=previous.llm_usage, votes=previous.votes)
+    except Exception as e:
+        logger.error(f"Error on query: {generated_query[:100]}... Error: {e}")
+        return TaskResult(
+            task=task,
+            response=generated_query,
+            parse_success=False,
+            execution_success=False,
+            entity_f1=0.0,
+            attribute_f1=0.0,
+            relation_f1=None,
+            filter_f1=0.0,
+            aggregation_f1=0.0,
+            return_column_f1=0.0,
+            execution_accuracy=False,
+            result_f1=0.0,
+            result_precision=0.0,
+            result_recall=0.0,
+            error_category="Evaluation Error",
+            error_flags=[],
+            task_type=partition.task_type
         )
-        
-        logger.info(f"Re-evaluated {len(task_results)} {task_type.value} tasks for {task_difficulty}")
\ No newline at end of file
+
+
+def re_evaluate_results(
+    datasets: list[DatasetName] | None = None,
+    task_types: list[TaskType] | None = None,
+    models: list[str] | None = None,
+    backend_concurrency: dict[TaskType, int] = BACKEND_CONCURRENCY,
+) -> None:
+    """
+    Re-evaluate every stored result file (or the selected subset) on a shared worker pool.
+
+    Tasks of all partitions are scheduled together; a semaphore per task type
+    caps how many run against DuckDB and Neo4j at once. Each partition is saved
+    under its own model as soon as its last task finishes, and its JSONL
+    checkpoint, if any, is rewritten with the new scores. Only the parts of
+    each result whose inputs changed since it was scored (see
+    ``ScoringProvenance``) are recomputed.
+    """
+    partitions = discover_partitions(datasets, task_types, models)
+    if not partitions:
+        logger.warning("No result files found to re-evaluate")
+        return
+
+    limits = {task_type: BoundedSemaphore(n) for task_type, n in backend_concurrency.items()}
+    db_paths = {
+        (p.dataset_name, p.task_type): db_path_resolver[p.task_type](p.dataset_name)
+        for p in partitions
+    }
+
+    pending: dict[ResultPartition, list[TaskResult | None]] = {}
+    remaining: dict[ResultPartition, int] = {}
+    max_workers = sum(backend_concurrency.values())
+
+    with thread_connections(), ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {}
+        for partition in partitions:
+            with open(partition.path, "r") as f:
+                existing_results = json.load(f)
+            if not existing_results:
+                continue
+
+            pending[partition] = [None] * len(existing_results)
+            remaining[partition] = len(existing_results)
+            db_path = db_paths[(partition.dataset_name, partition.task_type)]
+            for index, result_data in enumerate(existing_results):
+                future = pool.submit(
+                    _re_evaluate_task, result_data, partition, db_path, limits[partition.task_type]
+                )
+                futures[future] = (partition, index)
+
+        logger.info(f"Re-evaluating {len(futures)} tasks from {len(pending)} result files")
+
+        with tqdm(total=len(futures), desc="Re-evaluating", unit="task") as progress:
+            for future in as_completed(futures):
+                partition, index = futures[future]
+                pending[partition][index] = future.result()
+                remaining[partition] -= 1
+                progress.update()
+
+                if remaining[partition] == 0:
+                    task_results = pending.pop(partition)
+                    save_task_results(
+                        task_results,
+                        partition.dataset_name,
+                        partition.difficulty,
+                        partition.task_type,
+                        partition.model,
+                    )
+                    # A resumed run reads the JSONL checkpoint, so it must
+                    # carry the new scores too.
+                    checkpoint_path = partition.path.with_suffix(".jsonl")
+                    if checkpoint_path.exists():
+                        rewrite_jsonl(checkpoint_path, [result.to_dict() for result in task_results])
+                    logger.info(
+                        f"Re-evaluated {len(task_results)} {partition.task_type.value} tasks for "
+                        f"{partition.dataset_name}/{partition.model}/{partition.difficulty}"
+                    )
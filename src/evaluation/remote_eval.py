@@ -1,12 +1,28 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from functools import lru_cache
 from litellm import completion
 import os, inspect
+from pathlib import Path
 from logging import getLogger
+from tqdm import tqdm
 from constants import get_duckdb_path, get_tasks_directory
 from database.neo4j import get_neo4j_schema
 from database.duckdb import get_duckdb_schema
-from models import DatasetName, TaskDifficulty, TaskType
-from utils import get_tasks_from_json, save_task_results
-from evaluation.remote_eval_utils import process_tasks
+from models import DatasetName, LLMUsage, TaskDifficulty, TaskType
+from utils import get_tasks_from_json
+from evaluation.checkpoint import ResultWriter, export_json, open_result_writer, read_jsonl
+from evaluation.results_store import write_results
+from evaluation.remote_eval_utils import (
+    count_tokens,
+    get_prompt_hash,
+    process_task,
+    process_tasks,
+    prompt_builder,
+    summarize_usage,
+)
+from evaluation.schema_linking import PruningStats, SchemaLinker
 
 logger = getLogger(__name__)
 
@@ -25,21 +41,29 @@ def evaluate_remote_model(
     dataset_name: DatasetName,
     task_type: TaskType,
     api_key: str | None = None,
+    resume: bool = False,
+    prune_top_k: int | None = None,
+    samples: int = 1,
+    sample_difficulties: list[TaskDifficulty] | None = None,
 ) -> None:
-    """Evaluate a remote model on a dataset."""        
+    """
+    Evaluate a remote model on a dataset.
 
-    def call_with_optional_arg(fn, arg):
-        try:
-            return fn(arg)
-        except TypeError:
-            return fn()
+    Results are appended to ``<difficulty>.jsonl`` as each task is scored. When
+    the difficulty finishes they are written to the results store and exported
+    to ``<difficulty>.json``. With
+    ``resume``, tasks already in the checkpoint for the same model and prompt
+    hash are skipped. With ``prune_top_k`` each prompt only carries the
+    tables/labels its question matches (see ``SchemaLinker``). Tasks of
+    ``sample_difficulties`` (all when None) are answered by a vote over
+    ``samples`` completions.
+    """
 
-    schema = (schema_generator[task_type](dataset_name)
-            if len(inspect.signature(schema_generator[task_type]).parameters) > 0
-            else schema_generator[task_type]())    
-    
+    schema = load_schema(task_type, dataset_name)
     db_path = db_path_resolver[task_type](dataset_name)
     tasks_dir = get_tasks_directory(dataset_name)
+    linker = SchemaLinker(schema, task_type, prune_top_k) if prune_top_k else None
+    pruning_stats = PruningStats()
 
     for difficulty in TaskDifficulty:
         tasks_file = tasks_dir / f"{difficulty.value}.json"
@@ -49,9 +73,156 @@ def evaluate_remote_model(
             continue
 
         tasks = get_tasks_from_json(tasks_file)
-        logger.info(f"Processing {len(tasks)} tasks for {difficulty.value}")
+        task_samples = samples if not sample_difficulties or difficulty in sample_difficulties else 1
+        prompt_hash = get_prompt_hash(task_type, schema, prune_top_k, task_samples)
+        writer, completed = open_result_writer(
+            dataset_name, task_type, difficulty, model_name, prompt_hash, len(tasks), resume
+        )
+        pending = [task for task in tasks if task.question not in completed]
+        logger.info(
+            f"Processing {len(pending)} tasks for {difficulty.value} "
+            f"({len(completed)} already completed)"
+        )
+
+        with writer:
+            for result in process_tasks(
+                pending, task_type, schema, db_path, model_name, api_key, linker, pruning_stats, task_samples
+            ):
+                writer.write(result)
+
+        publish_results(writer, dataset_name, task_type, model_name, difficulty)
+
+    if linker is not None:
+        logger.info(pruning_stats.summary())
+
+
+def evaluate_remote_interleaved(
+    model_name: str,
+    dataset_name: DatasetName,
+    task_types: list[TaskType],
+    api_key: str | None = None,
+    resume: bool = False,
+    prune_top_k: int | None = None,
+    samples: int = 1,
+    sample_difficulties: list[TaskDifficulty] | None = None,
+) -> None:
+    """
+    Evaluate several task types of a dataset at once, task by task.
+
+    For each task the generations of all task types are issued together, one
+    worker per task type, so SQL runs against DuckDB while Cypher runs against
+    Neo4j, and the results of a task are written to their checkpoints
+    together before the next task starts. Options are as for
+    ``evaluate_remote_model``.
+    """
+    tasks_dir = get_tasks_directory(dataset_name)
+    contexts = {}
+    for task_type in task_types:
+        schema = load_schema(task_type, dataset_name)
+        linker = SchemaLinker(schema, task_type, prune_top_k) if prune_top_k else None
+        system = prompt_builder[task_type](schema)
+        contexts[task_type] = (
+            schema,
+            system,
+            count_tokens(model_name, system) if linker is not None else 0,
+            db_path_resolver[task_type](dataset_name),
+            linker,
+            PruningStats(),
+        )
+
+    with ExitStack() as pools:
+        pair_pool = pools.enter_context(ThreadPoolExecutor(max_workers=len(task_types), thread_name_prefix="pair"))
+        sample_pools = {
+            task_type: pools.enter_context(ThreadPoolExecutor(max_workers=samples, thread_name_prefix="sample"))
+            for task_type in task_types
+        }
+
+        for difficulty in TaskDifficulty:
+            tasks_file = tasks_dir / f"{difficulty.value}.json"
+            if not tasks_file.exists():
+                logger.warning(f"Skipping missing: {tasks_file}")
+                continue
+
+            tasks = get_tasks_from_json(tasks_file)
+            task_samples = samples if not sample_difficulties or difficulty in sample_difficulties else 1
+
+            with ExitStack() as stack:
+                writers, completed = {}, {}
+                for task_type in task_types:
+                    prompt_hash = get_prompt_hash(task_type, contexts[task_type][0], prune_top_k, task_samples)
+                    writer, completed[task_type] = open_result_writer(
+                        dataset_name, task_type, difficulty, model_name, prompt_hash, len(tasks), resume
+                    )
+                    writers[task_type] = stack.enter_context(writer)
+                    logger.info(
+                        f"Processing {len(tasks) - len(completed[task_type])} {task_type.value} tasks "
+                        f"for {difficulty.value} ({len(completed[task_type])} already completed)"
+                    )
+
+                for index, task in enumerate(tqdm(tasks, desc=difficulty.value)):
+                    futures = {
+                        task_type: pair_pool.submit(
+                            process_task, task, index, task_type, system, full_tokens, db_path, model_name,
+                            api_key, sample_pools[task_type], linker, pruning_stats, task_samples,
+                        )
+                        for task_type, (_, system, full_tokens, db_path, linker, pruning_stats) in contexts.items()
+                        if task.question not in completed[task_type]
+                    }
+                    for task_type, future in futures.items():
+                        writers[task_type].write(future.result())
+
+            for task_type, writer in writers.items():
+                publish_results(writer, dataset_name, task_type, model_name, difficulty)
+
+    for task_type, (_, _, _, _, linker, pruning_stats) in contexts.items():
+        if linker is not None:
+            logger.info(f"[{task_type.value}] {pruning_stats.summary()}")
+
+
+@lru_cache(maxsize=None)
+def load_schema(task_type: TaskType, dataset_name: DatasetName) -> str:
+    """The prompt schema of a dataset, read from the database once per process."""
+    return (schema_generator[task_type](dataset_name)
+            if len(inspect.signature(schema_generator[task_type]).parameters) > 0
+            else schema_generator[task_type]())
+
+
+def publish_results(
+    writer: ResultWriter,
+    dataset_name: DatasetName,
+    task_type: TaskType,
+    model_name: str,
+    difficulty: TaskDifficulty,
+) -> None:
+    """Write a finished checkpoint to the results store and export it to ``<difficulty>.json``."""
+    write_results(
+        read_jsonl(writer.path),
+        dataset_name,
+        task_type,
+        model_name,
+        difficulty,
+        writer.manifest.run_id,
+    )
+    export_json(writer.path, writer.path.with_suffix(".json"))
+    write_usage_summary(writer)
+    logger.info(f"Completed {difficulty.value}: {writer.manifest.completed} results")
+
 
-        results = process_tasks(tasks, task_type, schema, db_path, model_name, api_key)
+def write_usage_summary(writer: ResultWriter) -> Path:
+    """Aggregate the LLM usage of a checkpoint's results into ``<difficulty>.usage.json``."""
+    usages = [
+        LLMUsage.from_dict(record["llm_usage"])
+        for record in read_jsonl(writer.path)
+        if record.get("llm_usage")
+    ]
+    summary = {"run_id": writer.manifest.run_id, "model": writer.manifest.model, **summarize_usage(usages)}
+    path = writer.path.with_suffix(".usage.json")
+    with open(path, "w") as f:
+        json.dump(summary, f, indent=2)
 
-        save_task_results(results, dataset_name, difficulty, task_type, model_name)
-        logger.info(f"Completed {difficulty.value}: {len(results)} results")
\ No newline at end of file
+    if usages:
+        logger.info(
+            f"LLM usage: {summary['prompt_tokens']} prompt tokens ({summary['cached_prompt_share']:.0%} cached), "
+            f"{summary['completion_tokens']} completion tokens, cost {summary['cost_usd']}"
+        )
+    return path
\ No newline at end of file
@@ -1,7 +1,23 @@
-from models import Task, TaskType, TaskResult
-from evaluation.scoring import get_task_result
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import replace
+from hashlib import sha256
+from time import perf_counter
+from typing import Iterator
+
+from models import LLMUsage, QueryAnalyzer, Task, TaskType, TaskResult
+from evaluation.resilience import (
+    CircuitBreaker,
+    LLMUnavailableError,
+    call_with_retry,
+    get_provider_limiter,
+)
+from evaluation.schema_linking import PruningStats, SchemaLinker
+from evaluation.query_extraction import QueryExtractor
+from evaluation.scoring import ANALYZERS, get_task_result
+from evaluation.self_consistency import SELF_CONSISTENCY_TEMPERATURE, combine_usage, vote
+from evaluation.tracing import percentile, span
 from evaluation.utils import build_user_prompt, build_sql_system_prompt, build_cypher_system_prompt
-from litellm import completion
+from litellm import completion, completion_cost, stream_chunk_builder, token_counter
 from logging import getLogger
 from tqdm import tqdm
 
@@ -10,31 +26,218 @@ logger = getLogger(__name__)
 
 NO_QUERY = "<no_query>"
 
+# Whether to drop a stream once its query is complete (see ``set_early_stop``).
+_stop_early = False
+
 prompt_builder = {
     TaskType.SQL: build_sql_system_prompt,
     TaskType.CYPHER: build_cypher_system_prompt,
 }
 
 
-def query_llm(model: str, system: str, prompt: str, api_key: str | None = None) -> str:
-    """Query LLM and return generated query string."""
+def set_early_stop(enabled: bool) -> None:
+    """
+    Stop reading a streamed completion once ``QueryExtractor`` sees the query
+    end. Saves the tokens after it, but the usage of a stopped stream is then
+    estimated (see ``LLMUsage.estimated``).
+    """
+    global _stop_early
+    _stop_early = enabled
+
+
+def _close_stream(stream) -> None:
+    """Close the HTTP response of an abandoned stream so the connection is not left open."""
+    for obj in (stream, getattr(stream, "completion_stream", None)):
+        close = getattr(obj, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception as e:
+                logger.debug(f"Closing the stream failed: {e}")
+            return
+
+
+def _field(obj, name: str, default=None):
+    """Read a field of a litellm object or of its plain-dict form (batch output)."""
+    if obj is None:
+        return default
+    value = obj.get(name, default) if isinstance(obj, dict) else getattr(obj, name, default)
+    return default if value is None else value
+
+
+def get_llm_usage(
+    model: str,
+    response,
+    time_to_first_token_ms: float | None = None,
+    latency_ms: float | None = None,
+) -> LLMUsage:
+    """Token counts of a completion's ``usage`` block, with its estimated cost."""
+    usage = _field(response, "usage")
     try:
-        response = completion(
-            model=model,
-            messages=[
-            {
-                "role": "system",
-                "content": system,
-                "cache_control": {"type": "ephemeral"} 
-            },
-            {"role": "user", "content": prompt},
-        ],
-            api_key=api_key,
-        )
-        return response.choices[0].message.content or NO_QUERY
+        cost = completion_cost(completion_response=response, model=model)
+    except Exception:
+        cost = None
+
+    return LLMUsage(
+        model=model,
+        prompt_tokens=_field(usage, "prompt_tokens", 0),
+        completion_tokens=_field(usage, "completion_tokens", 0),
+        cached_tokens=_field(_field(usage, "prompt_tokens_details"), "cached_tokens", 0),
+        cache_creation_tokens=_field(usage, "cache_creation_input_tokens", 0),
+        time_to_first_token_ms=time_to_first_token_ms,
+        latency_ms=latency_ms,
+        cost_usd=cost,
+    )
+
+
+def _stream_completion(
+    model: str,
+    messages: list[dict],
+    api_key: str | None,
+    analyzer: QueryAnalyzer | None = None,
+    temperature: float | None = None,
+) -> tuple[str, LLMUsage]:
+    """
+    Stream one completion, timing the first content token and the whole call.
+
+    With an ``analyzer`` the query is extracted while streaming (see
+    ``QueryExtractor``). With early stop enabled (``set_early_stop``) the
+    stream is then closed as soon as the query is complete, and its usage,
+    counted by litellm from the received text, is marked as estimated.
+    """
+    start = perf_counter()
+    time_to_first_token_ms = None
+    extractor = QueryExtractor(analyzer) if analyzer is not None else None
+    stopped = False
+    chunks = []
+    stream = completion(
+        model=model,
+        messages=messages,
+        api_key=api_key,
+        stream=True,
+        stream_options={"include_usage": True},
+        **({"temperature": temperature} if temperature is not None else {}),
+    )
+    for chunk in stream:
+        chunks.append(chunk)
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if not delta:
+            continue
+        if time_to_first_token_ms is None:
+            time_to_first_token_ms = (perf_counter() - start) * 1000
+        if extractor is not None and extractor.feed(delta) and _stop_early:
+            logger.debug(f"Query complete after {len(extractor.text)} characters, stopping the stream")
+            _close_stream(stream)
+            stopped = True
+            break
+    latency_ms = (perf_counter() - start) * 1000
+
+    response = stream_chunk_builder(chunks, messages=messages)
+    content = extractor.query if extractor is not None else response.choices[0].message.content
+    usage = get_llm_usage(model, response, time_to_first_token_ms, latency_ms)
+    return content or NO_QUERY, replace(usage, estimated=True) if stopped else usage
+
+
+def query_llm(
+    model: str,
+    system: str,
+    prompt: str,
+    api_key: str | None = None,
+    breaker: CircuitBreaker | None = None,
+    task_type: TaskType | None = None,
+    temperature: float | None = None,
+) -> tuple[str, LLMUsage | None]:
+    """
+    Query LLM and return generated query string with the call's usage.
+
+    With a ``task_type`` the query is extracted from the stream (fences
+    stripped); with early stop enabled generation stops once the statement
+    is complete.
+
+    Calls are capped per provider and share its circuit breaker (see
+    ``ProviderLimiter``). Rate limits, overloads and other transient errors
+    are retried with backoff and raise ``LLMUnavailableError`` if they
+    persist; any other failure is the model's and yields ``NO_QUERY`` without
+    usage.
+    """
+    messages = [
+        {
+            "role": "system",
+            "content": system,
+            "cache_control": {"type": "ephemeral"} 
+        },
+        {"role": "user", "content": prompt},
+    ]
+    limiter = get_provider_limiter(model)
+    analyzer = ANALYZERS[task_type] if task_type is not None else None
+
+    def attempt() -> tuple[str, LLMUsage]:
+        with limiter.semaphore:
+            return _stream_completion(model, messages, api_key, analyzer, temperature)
+
+    try:
+        return call_with_retry(attempt, f"LLM call to {model}", breaker=breaker or limiter.breaker)
+    except LLMUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"LLM call failed: {e}")
-        return NO_QUERY
+        return NO_QUERY, None
+
+
+def summarize_usage(usages: list[LLMUsage]) -> dict:
+    """Totals, prompt-cache hit rate, latency percentiles and throughput of a run's LLM calls."""
+    if not usages:
+        return {"calls": 0}
+
+    prompt_tokens = sum(u.prompt_tokens for u in usages)
+    # Stopped streams report no cached tokens, so the cache share only counts measured calls.
+    measured_prompt_tokens = sum(u.prompt_tokens for u in usages if not u.estimated)
+    completion_tokens = sum(u.completion_tokens for u in usages)
+    latencies = sorted(u.latency_ms for u in usages if u.latency_ms is not None)
+    first_tokens = sorted(u.time_to_first_token_ms for u in usages if u.time_to_first_token_ms is not None)
+    costs = [u.cost_usd for u in usages if u.cost_usd is not None]
+
+    return {
+        "calls": len(usages),
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "cached_tokens": sum(u.cached_tokens for u in usages),
+        "cache_creation_tokens": sum(u.cache_creation_tokens for u in usages),
+        "cache_hit_calls": sum(1 for u in usages if u.cached_tokens),
+        "cached_prompt_share": (
+            sum(u.cached_tokens for u in usages) / measured_prompt_tokens if measured_prompt_tokens else 0.0
+        ),
+        "estimated_calls": sum(1 for u in usages if u.estimated),
+        "cost_usd": sum(costs) if costs else None,
+        "latency_p50_ms": percentile(latencies, 50) if latencies else None,
+        "latency_p95_ms": percentile(latencies, 95) if latencies else None,
+        "ttft_p50_ms": percentile(first_tokens, 50) if first_tokens else None,
+        "ttft_p95_ms": percentile(first_tokens, 95) if first_tokens else None,
+        "completion_tokens_per_second": (
+            completion_tokens / (sum(latencies) / 1000) if latencies and sum(latencies) else None
+        ),
+    }
+
+
+def get_prompt_hash(
+    task_type: TaskType, schema: str, prune_top_k: int | None = None, samples: int = 1
+) -> str:
+    """
+    Fingerprint of the prompts sent for a task type, used to match resumable
+    runs. ``samples`` is the number of voted completions per task of the
+    difficulty, so single-sample and voted results never share a checkpoint.
+    """
+    system = prompt_builder[task_type](schema)
+    pruning = f"\nprune_top_k={prune_top_k}" if prune_top_k else ""
+    sampling = f"\nsamples={samples}" if samples > 1 else ""
+    return sha256(f"{system}\n{build_user_prompt('')}{pruning}{sampling}".encode()).hexdigest()[:16]
+
+
+def count_tokens(model: str, text: str) -> int:
+    try:
+        return token_counter(model=model, text=text)
+    except Exception:
+        return len(text) // 4
 
 
 def process_tasks(
@@ -44,14 +247,77 @@ def process_tasks(
     db_path: str | None,
     model_name: str,
     api_key: str | None,
-) -> list[TaskResult]:
-    """Process all tasks and return results."""
-    results = []
+    linker: SchemaLinker | None = None,
+    pruning_stats: PruningStats | None = None,
+    samples: int = 1,
+    temperature: float = SELF_CONSISTENCY_TEMPERATURE,
+) -> Iterator[TaskResult]:
+    """
+    Process tasks one at a time, yielding each result as soon as it is scored.
+
+    With a ``linker`` each question gets a system prompt with only its part of
+    the schema, and the token savings are added to ``pruning_stats``. With
+    ``samples`` > 1 that many completions are drawn concurrently at
+    ``temperature`` and the query is chosen by execution vote (see ``vote``).
+    """
     system = prompt_builder[task_type](schema)
+    full_tokens = count_tokens(model_name, system) if linker is not None else 0
+
+    with ThreadPoolExecutor(max_workers=samples) as pool:
+        for index, task in enumerate(tqdm(tasks)):
+            yield process_task(
+                task, index, task_type, system, full_tokens, db_path, model_name, api_key, pool,
+                linker, pruning_stats, samples, temperature,
+            )
+
+
+def process_task(
+    task: Task,
+    index: int,
+    task_type: TaskType,
+    system: str,
+    full_tokens: int,
+    db_path: str | None,
+    model_name: str,
+    api_key: str | None,
+    pool: Executor,
+    linker: SchemaLinker | None = None,
+    pruning_stats: PruningStats | None = None,
+    samples: int = 1,
+    temperature: float = SELF_CONSISTENCY_TEMPERATURE,
+) -> TaskResult:
+    """
+    Generate and score one task as ``process_tasks`` does. ``system`` is the
+    unpruned system prompt, of ``full_tokens`` tokens, and ``pool`` runs the
+    samples and their executions.
+    """
+    with span("task", task_type=task_type.value, index=index):
+        task_system = system
+        if linker is not None:
+            with span("schema_linking", task_type=task_type.value):
+                task_system = prompt_builder[task_type](linker.prune(task.question))
+            if pruning_stats is not None:
+                pruning_stats.add(full_tokens, count_tokens(model_name, task_system))
 
-    for task in tqdm(tasks):
         prompt = build_user_prompt(task.question)
-        query = query_llm(model_name, system, prompt, api_key)
-        results.append(get_task_result(task, query, task_type, db_path))
+        votes = None
+        if samples > 1:
+            with span("query_llm", model=model_name, samples=samples):
+                responses = [
+                    future.result()
+                    for future in [
+                        pool.submit(
+                            query_llm, model_name, task_system, prompt, api_key,
+                            task_type=task_type, temperature=temperature,
+                        )
+                        for _ in range(samples)
+                    ]
+                ]
+            query, votes = vote(task_type, [query for query, _ in responses], db_path, pool)
+            usage = combine_usage([usage for _, usage in responses if usage is not None])
+        else:
+            with span("query_llm", model=model_name):
+                query, usage = query_llm(model_name, task_system, prompt, api_key, task_type=task_type)
 
-    return results
+        result = get_task_result(task, query, task_type, db_path)
+        return replace(result, llm_usage=usage, votes=votes)
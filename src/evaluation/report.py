@@ -0,0 +1,213 @@
+from datetime import datetime
+from logging import getLogger
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from constants import RESULTS_STORE_DIR
+from evaluation.aggregates import MetricCube
+from evaluation.results_store import load_results_frame
+from models import TaskDifficulty
+
+logger = getLogger(__name__)
+
+RESULT_METRICS = {
+    "parse_success": "Syntax",
+    "correct_result": "Executes",
+    "execution_accuracy": "Exact Result",
+    "result_precision": "Precision",
+    "result_recall": "Recall",
+    "result_f1": "Result F1",
+}
+
+COMPONENT_METRICS = {
+    "entity_f1": "Entity",
+    "attribute_f1": "Attribute",
+    "relation_f1": "Relation",
+    "filter_f1": "Filter",
+    "aggregation_f1": "Aggregation",
+    "return_column_f1": "Return",
+}
+
+DIMENSION_LABELS = {
+    "dataset": "Dataset",
+    "model": "Model",
+    "run_id": "Run",
+    "language": "Language",
+    "difficulty": "Difficulty",
+}
+
+DIFFICULTY_ORDER = {difficulty.value: index for index, difficulty in enumerate(TaskDifficulty)}
+
+RUN_KEYS = ["model", "run_id", "language"]
+
+
+def _flatten(table: pd.DataFrame, columns: dict[str, str]) -> pd.DataFrame:
+    """Turn a grouped table into labelled, display-ordered rows."""
+    keys = list(table.index.names)
+    flat = table.reset_index()
+    if "difficulty" in keys:
+        flat = flat.sort_values(
+            keys, key=lambda column: column.map(DIFFICULTY_ORDER) if column.name == "difficulty" else column
+        )
+    if "language" in keys:
+        flat["language"] = flat["language"].str.upper()
+    columns = {"tasks": "Tasks", **columns} if "tasks" in flat else columns
+    flat = flat[keys + list(columns)]
+    return flat.rename(columns={**DIMENSION_LABELS, **columns})
+
+
+def _format(value) -> str:
+    if isinstance(value, (float, np.floating)):
+        return f"{value:.3f}"
+    return str(value)
+
+
+def markdown_table(frame: pd.DataFrame) -> str:
+    lines = [
+        "| " + " | ".join(frame.columns) + " |",
+        "|" + "|".join("---" if frame[c].dtype == object else "---:" for c in frame.columns) + "|",
+    ]
+    for row in frame.itertuples(index=False):
+        lines.append("| " + " | ".join(_format(value) for value in row) + " |")
+    return "\n".join(lines) + "\n"
+
+
+def _escape_latex(text: str) -> str:
+    for char in ("\\", "&", "%", "$", "#", "_", "{", "}"):
+        text = text.replace(char, f"\\{char}")
+    return text
+
+
+def latex_table(frame: pd.DataFrame, caption: str, label: str) -> str:
+    alignment = "".join("l" if frame[c].dtype == object else "r" for c in frame.columns)
+    latex = (
+        "\\begin{table}[h]\n\\centering\n"
+        f"\\caption{{{caption}}}\n\\label{{tab:{label}}}\n"
+        f"\\begin{{tabular}}{{{alignment}}}\n\\hline\n"
+    )
+    latex += " & ".join(f"\\textbf{{{_escape_latex(c)}}}" for c in frame.columns) + " \\\\\n\\hline\n"
+    for row in frame.itertuples(index=False):
+        latex += " & ".join(_escape_latex(_format(value)) for value in row) + " \\\\\n"
+    latex += "\\hline\n\\end{tabular}\n\\end{table}\n"
+    return latex
+
+
+def plot_accuracy_by_difficulty(cube: MetricCube, dataset: str, path: Path) -> None:
+    """Grouped bars of exact-result accuracy per difficulty, one bar per model run and language."""
+    table = cube.table(RUN_KEYS + ["difficulty"], dataset=dataset)
+    accuracy = table["execution_accuracy"].unstack("difficulty", fill_value=0.0)
+    difficulties = sorted(accuracy.columns, key=DIFFICULTY_ORDER.get)
+    accuracy = accuracy[difficulties]
+
+    x = np.arange(len(difficulties))
+    width = 0.8 / len(accuracy)
+    fig, ax = plt.subplots(figsize=(max(8, 2 * len(difficulties) + len(accuracy)), 6))
+    for index, ((model, run_id, language), values) in enumerate(accuracy.iterrows()):
+        ax.bar(x + index * width - 0.4 + width / 2, values, width, label=f"{model} ({run_id}) {language.upper()}")
+
+    ax.set_title(f"Exact result accuracy on {dataset}", fontsize=14, fontweight="bold")
+    ax.set_ylabel("Accuracy")
+    ax.set_xticks(x)
+    ax.set_xticklabels(difficulties)
+    ax.set_ylim(0, 1.0)
+    ax.grid(axis="y", alpha=0.3)
+    ax.legend(fontsize=8)
+    plt.tight_layout()
+    plt.savefig(path, dpi=150, bbox_inches="tight")
+    plt.close(fig)
+
+
+def plot_error_rates(cube: MetricCube, path: Path) -> None:
+    """Stacked error-category rates per model run and language."""
+    errors = cube.error_table(RUN_KEYS)
+    if errors.empty:
+        return
+    tasks = cube.table(RUN_KEYS)["tasks"]
+    rates = errors.div(tasks.loc[errors.index], axis=0)
+    labels = [f"{model} ({run_id}) {language.upper()}" for model, run_id, language in rates.index]
+
+    fig, ax = plt.subplots(figsize=(12, max(4, 0.5 * len(rates) + 2)))
+    left = np.zeros(len(rates))
+    for category in rates.columns:
+        ax.barh(labels, rates[category], left=left, label=category.replace("_", " ").title())
+        left += rates[category].to_numpy()
+
+    ax.set_title("Error categories", fontsize=14, fontweight="bold")
+    ax.set_xlabel("Share of tasks")
+    ax.set_xlim(0, 1.0)
+    ax.legend(fontsize=8, loc="lower right")
+    plt.tight_layout()
+    plt.savefig(path, dpi=150, bbox_inches="tight")
+    plt.close(fig)
+
+
+def generate_report(
+    output_dir: Path,
+    datasets: list[str] | None = None,
+    models: list[str] | None = None,
+    run_ids: list[str] | None = None,
+    store_dir: Path = RESULTS_STORE_DIR,
+) -> Path:
+    """
+    Write ``report.md``, ``tables.tex`` and charts for the selected results.
+
+    Without ``run_ids`` the latest run of every partition is used. All metrics
+    come from one grouped pass over the store (see ``MetricCube``).
+    """
+    frame = load_results_frame(dataset=datasets, model=models, run_id=run_ids, store_dir=store_dir)
+    if frame.empty:
+        raise ValueError(
+            f"No results for datasets={datasets}, models={models}, runs={run_ids} in {store_dir}"
+        )
+    cube = MetricCube(frame)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    overall = _flatten(cube.table(RUN_KEYS), RESULT_METRICS)
+    components = _flatten(cube.table(RUN_KEYS), COMPONENT_METRICS)
+    errors = cube.error_table(RUN_KEYS)
+    errors.columns = [c.replace("_", " ").title() for c in errors.columns]
+    errors = _flatten(errors, dict(zip(errors.columns, errors.columns)))
+
+    dataset_names = sorted(frame["dataset"].unique())
+    report = (
+        "# Text2Cypher Evaluation Report\n\n"
+        f"**Generated on:** {datetime.now():%Y-%m-%d %H:%M:%S}  \n"
+        f"**Datasets:** {', '.join(dataset_names)}  \n"
+        f"**Models:** {', '.join(sorted(frame['model'].unique()))}  \n"
+        f"**Runs:** {', '.join(sorted(frame['run_id'].unique()))}  \n"
+        f"**Tasks:** {len(frame)}\n\n"
+        "## Overall\n\n"
+        f"{markdown_table(overall)}\n"
+        "## Structural components (F1)\n\n"
+        f"{markdown_table(components)}\n"
+    )
+    latex = latex_table(overall, "Overall results", "overall")
+    latex += "\n" + latex_table(components, "Structural component F1", "components")
+
+    for dataset in dataset_names:
+        by_difficulty = _flatten(cube.table(RUN_KEYS + ["difficulty"], dataset=dataset), RESULT_METRICS)
+        chart = f"accuracy_{dataset}.png"
+        plot_accuracy_by_difficulty(cube, dataset, output_dir / chart)
+
+        report += (
+            f"## {dataset}\n\n"
+            f"{markdown_table(by_difficulty)}\n"
+            f"![Exact result accuracy on {dataset}]({chart})\n\n"
+        )
+        latex += "\n" + latex_table(by_difficulty, f"Results on {dataset} by difficulty", dataset)
+
+    if not errors.empty:
+        plot_error_rates(cube, output_dir / "errors.png")
+        report += f"## Errors\n\n{markdown_table(errors)}\n![Error categories](errors.png)\n"
+        latex += "\n" + latex_table(errors, "Error categories", "errors")
+
+    with open(output_dir / "report.md", "w") as f:
+        f.write(report)
+    with open(output_dir / "tables.tex", "w") as f:
+        f.write(latex)
+
+    logger.info(f"Report for {len(frame)} results written to {output_dir}")
+    return output_dir / "report.md"
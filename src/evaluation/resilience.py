@@ -0,0 +1,193 @@
+import random
+import threading
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from logging import getLogger
+from time import monotonic, perf_counter, sleep, time
+from typing import Callable, TypeVar
+
+import litellm
+
+logger = getLogger(__name__)
+
+T = TypeVar("T")
+
+# Concurrent calls allowed per provider unless set_provider_concurrency says otherwise.
+PROVIDER_MAX_CONCURRENCY = 4
+
+# Rate limits, timeouts, server errors and Anthropic's 529 "overloaded".
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+RETRYABLE_ERRORS = (
+    litellm.RateLimitError,
+    litellm.Timeout,
+    litellm.APIConnectionError,
+    litellm.ServiceUnavailableError,
+    litellm.InternalServerError,
+)
+
+
+class LLMUnavailableError(RuntimeError):
+    """The provider kept failing with transient errors; the run should stop rather than score them."""
+
+
+@dataclass(slots=True, frozen=True)
+class RetryPolicy:
+    max_attempts: int = 6
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """Full-jitter exponential backoff, never shorter than the provider's ``retry-after``."""
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return max(backoff, retry_after or 0.0)
+
+
+class CircuitBreaker:
+    """
+    Opens after ``failure_threshold`` consecutive transient failures and makes
+    every caller wait ``cooldown`` seconds, so an outage pauses all workers
+    instead of each of them retrying on its own. After the cooldown one more
+    failure reopens it; a success closes it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        while True:
+            with self._lock:
+                remaining = self._open_until - monotonic()
+            if remaining <= 0:
+                return
+            sleep(remaining)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold and self._open_until <= monotonic():
+                self._open_until = monotonic() + self.cooldown
+                logger.warning(
+                    f"Circuit open after {self._failures} consecutive LLM failures, "
+                    f"pausing calls for {self.cooldown:.0f}s"
+                )
+
+
+class ProviderLimiter:
+    """Concurrency cap and circuit breaker shared by every call to one provider."""
+
+    def __init__(self, provider: str, max_concurrency: int = PROVIDER_MAX_CONCURRENCY):
+        self.provider = provider
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.breaker = CircuitBreaker()
+
+
+_limiters: dict[str, ProviderLimiter] = {}
+_provider_concurrency: dict[str, int] = {}
+_limiters_lock = threading.Lock()
+
+
+def set_provider_concurrency(limits: dict[str, int]) -> None:
+    """Per-provider concurrency caps; call before the first LLM call."""
+    with _limiters_lock:
+        _provider_concurrency.update(limits)
+        for provider in limits:
+            _limiters.pop(provider, None)
+
+
+def get_provider(model: str) -> str:
+    try:
+        return litellm.get_llm_provider(model)[1]
+    except Exception:
+        return "unknown"
+
+
+def get_provider_limiter(model: str) -> ProviderLimiter:
+    provider = get_provider(model)
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = ProviderLimiter(provider, _provider_concurrency.get(provider, PROVIDER_MAX_CONCURRENCY))
+            _limiters[provider] = limiter
+        return limiter
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    return getattr(error, "status_code", None) in RETRYABLE_STATUS_CODES
+
+
+def retry_after(error: Exception) -> float | None:
+    """Seconds to wait from the error's ``retry-after(-ms)`` header, if the provider sent one."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time())
+    except (TypeError, ValueError):
+        return None
+
+
+def call_with_retry(
+    fn: Callable[[], T],
+    description: str,
+    policy: RetryPolicy | None = None,
+    breaker: "CircuitBreaker | None" = None,
+) -> T:
+    """
+    Call ``fn``, retrying transient provider errors with backoff.
+
+    Non-retryable errors are raised unchanged; once ``policy.max_attempts``
+    transient failures happened, ``LLMUnavailableError`` is raised.
+    """
+    policy = policy or RetryPolicy()
+
+    for attempt in range(policy.max_attempts):
+        if breaker is not None:
+            breaker.wait()
+
+        start = perf_counter()
+        try:
+            result = fn()
+        except Exception as e:
+            elapsed_ms = (perf_counter() - start) * 1000
+            if not is_retryable(e):
+                logger.info(f"{description} attempt {attempt + 1} failed in {elapsed_ms:.0f}ms: {e}")
+                raise
+            if breaker is not None:
+                breaker.record_failure()
+            if attempt + 1 == policy.max_attempts:
+                raise LLMUnavailableError(
+                    f"{description} failed {policy.max_attempts} times, last error: {e}"
+                ) from e
+
+            delay = policy.delay(attempt, retry_after(e))
+            logger.warning(
+                f"{description} attempt {attempt + 1} failed in {elapsed_ms:.0f}ms "
+                f"({type(e).__name__}), retrying in {delay:.1f}s"
+            )
+            sleep(delay)
+            continue
+
+        if breaker is not None:
+            breaker.record_success()
+        logger.info(f"{description} attempt {attempt + 1} succeeded in {(perf_counter() - start) * 1000:.0f}ms")
+        return result
+
+    raise LLMUnavailableError(f"{description} was not attempted")
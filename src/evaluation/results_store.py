@@ -0,0 +1,254 @@
+import json
+import math
+from datetime import datetime
+from logging import getLogger
+from pathlib import Path
+from typing import Iterable
+
+import duckdb
+import pandas as pd
+
+from constants import RESULTS_DIR, RESULTS_STORE_DIR
+from models import DatasetName, TaskDifficulty, TaskResult, TaskType
+
+logger = getLogger(__name__)
+
+PARTITION_COLUMNS = ["dataset", "task_type", "model", "difficulty", "run_id"]
+
+# Scalar columns of TaskResult.to_dict() with their storage type. Every other
+# field (error flags, execution profiles, ...) is stored as JSON text.
+SCALAR_COLUMNS = {
+    "question": "VARCHAR",
+    "expected_script": "VARCHAR",
+    "generated_script": "VARCHAR",
+    "syntaxically_correct": "BOOLEAN",
+    "correct_result": "BOOLEAN",
+    "entity_f1": "DOUBLE",
+    "attribute_f1": "DOUBLE",
+    "relation_f1": "DOUBLE",
+    "filter_f1": "DOUBLE",
+    "aggregation_f1": "DOUBLE",
+    "return_column_f1": "DOUBLE",
+    "execution_accuracy": "BOOLEAN",
+    "result_f1": "DOUBLE",
+    "result_precision": "DOUBLE",
+    "result_recall": "DOUBLE",
+    "error_category": "VARCHAR",
+    "canonical_match": "BOOLEAN",
+}
+
+
+def _model_slug(model_name: str) -> str:
+    return model_name.replace("/", "_")
+
+
+def _task_type_from_partition(value: str) -> TaskType:
+    return TaskType.SQL if value == "sql" else TaskType.CYPHER
+
+
+def get_partition_dir(
+    dataset_name: str,
+    task_type: TaskType,
+    model_name: str,
+    difficulty: TaskDifficulty,
+    run_id: str,
+    store_dir: Path = RESULTS_STORE_DIR,
+) -> Path:
+    return (
+        store_dir
+        / f"dataset={dataset_name}"
+        / f"task_type={task_type.value.lower()}"
+        / f"model={_model_slug(model_name)}"
+        / f"difficulty={difficulty.value}"
+        / f"run_id={run_id}"
+    )
+
+
+def write_results(
+    records: Iterable[dict],
+    dataset_name: str,
+    task_type: TaskType,
+    model_name: str,
+    difficulty: TaskDifficulty,
+    run_id: str,
+    store_dir: Path = RESULTS_STORE_DIR,
+) -> Path | None:
+    """Write serialized TaskResults as one zstd Parquet file of the partition."""
+    records = list(records)
+    if not records:
+        return None
+
+    columns = dict(SCALAR_COLUMNS)
+    for record in records:
+        for key in record:
+            columns.setdefault(key, "VARCHAR")
+
+    def to_column(name, value):
+        if name in SCALAR_COLUMNS or value is None:
+            return value
+        return json.dumps(value)
+
+    rows = [[to_column(name, record.get(name)) for name in columns] for record in records]
+
+    partition_dir = get_partition_dir(
+        dataset_name, task_type, model_name, difficulty, run_id, store_dir
+    )
+    partition_dir.mkdir(parents=True, exist_ok=True)
+    file_path = partition_dir / "results.parquet"
+
+    conn = duckdb.connect()
+    try:
+        column_defs = ", ".join(f'"{name}" {column_type}' for name, column_type in columns.items())
+        conn.execute(f"CREATE TEMP TABLE partition_results ({column_defs})")
+        placeholders = ", ".join("?" for _ in columns)
+        conn.executemany(f"INSERT INTO partition_results VALUES ({placeholders})", rows)
+        conn.execute(
+            f"COPY partition_results TO '{file_path}' (FORMAT PARQUET, COMPRESSION ZSTD)"
+        )
+    finally:
+        conn.close()
+
+    logger.info(f"Stored {len(rows)} results in {file_path}")
+    return file_path
+
+
+def connect_results_store(store_dir: Path = RESULTS_STORE_DIR) -> duckdb.DuckDBPyConnection:
+    """
+    Open an in-memory DuckDB with two views over the Parquet dataset:
+    ``all_results`` (every run) and ``results`` (latest run per partition).
+    """
+    if not any(store_dir.glob("**/*.parquet")):
+        raise FileNotFoundError(
+            f"No results in {store_dir}. Run an evaluation or `import-results` first."
+        )
+
+    conn = duckdb.connect()
+    conn.execute(
+        f"""
+        CREATE VIEW all_results AS
+        SELECT * FROM read_parquet(
+            '{store_dir}/**/*.parquet',
+            hive_partitioning = true,
+            hive_types_autocast = false,
+            union_by_name = true
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE VIEW results AS
+        SELECT * EXCLUDE (latest_run_id) FROM (
+            SELECT *, max(run_id) OVER (
+                PARTITION BY dataset, task_type, model, difficulty
+            ) AS latest_run_id
+            FROM all_results
+        )
+        WHERE run_id = latest_run_id
+        """
+    )
+    return conn
+
+
+def load_results_frame(
+    dataset: str | list[str] | None = None,
+    task_type: TaskType | None = None,
+    model: str | list[str] | None = None,
+    difficulty: TaskDifficulty | None = None,
+    run_id: str | list[str] | None = None,
+    store_dir: Path = RESULTS_STORE_DIR,
+) -> pd.DataFrame:
+    """
+    Load results as a DataFrame, one row per task.
+
+    ``dataset``, ``model`` and ``run_id`` also accept a list of values.
+    Without ``run_id`` only the latest run of every partition is returned.
+    """
+    if isinstance(model, str):
+        model = [model]
+    filters = {
+        "dataset": [dataset] if isinstance(dataset, str) else dataset,
+        "task_type": [task_type.value.lower()] if task_type else None,
+        "model": [_model_slug(name) for name in model] if model else None,
+        "difficulty": [difficulty.value] if difficulty else None,
+        "run_id": [run_id] if isinstance(run_id, str) else run_id,
+    }
+    conditions = [
+        f"{name} IN ({', '.join('?' for _ in values)})"
+        for name, values in filters.items()
+        if values
+    ]
+    params = [value for values in filters.values() if values for value in values]
+
+    view = "all_results" if run_id else "results"
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    conn = connect_results_store(store_dir)
+    try:
+        return conn.execute(f"SELECT * FROM {view} {where}", params).df()
+    finally:
+        conn.close()
+
+
+def decode_record(record: dict) -> dict:
+    """Turn a store row back into the TaskResult.to_dict() shape (plus partition columns)."""
+    decoded = {}
+    for name, value in record.items():
+        if isinstance(value, float) and math.isnan(value):
+            value = None
+        elif name not in SCALAR_COLUMNS and name not in PARTITION_COLUMNS and isinstance(value, str):
+            value = json.loads(value)
+        decoded[name] = value
+    decoded["error_flags"] = decoded.get("error_flags") or []
+    return decoded
+
+
+def frame_to_task_results(frame: pd.DataFrame) -> list[TaskResult]:
+    results = []
+    for record in map(decode_record, frame.to_dict("records")):
+        results.append(
+            TaskResult.from_dict(record, _task_type_from_partition(record["task_type"]))
+        )
+    return results
+
+
+def load_task_results(**filters) -> list[TaskResult]:
+    """Same filters as ``load_results_frame``, returned as TaskResult objects."""
+    return frame_to_task_results(load_results_frame(**filters))
+
+
+def import_json_results(results_dir: Path = RESULTS_DIR, store_dir: Path = RESULTS_STORE_DIR) -> int:
+    """
+    Copy every ``<dataset>/<type>/<model>/<difficulty>.json`` export into the store.
+
+    The run id comes from the checkpoint manifest when present, otherwise from
+    the file's modification time. Returns the number of partitions written.
+    """
+    written = 0
+    for dataset in DatasetName:
+        for task_type in TaskType:
+            type_dir = results_dir / dataset.value / task_type.value.lower()
+            if not type_dir.is_dir():
+                continue
+
+            for model_dir in sorted(p for p in type_dir.iterdir() if p.is_dir()):
+                for difficulty in TaskDifficulty:
+                    result_file = model_dir / f"{difficulty.value}.json"
+                    if not result_file.exists():
+                        continue
+
+                    manifest_file = model_dir / f"{difficulty.value}.manifest.json"
+                    if manifest_file.exists():
+                        with open(manifest_file, "r") as f:
+                            run_id = json.load(f)["run_id"]
+                    else:
+                        mtime = datetime.fromtimestamp(result_file.stat().st_mtime)
+                        run_id = mtime.strftime("%Y%m%dT%H%M%S")
+
+                    with open(result_file, "r") as f:
+                        records = json.load(f)
+
+                    if write_results(
+                        records, dataset.value, task_type, model_dir.name, difficulty, run_id, store_dir
+                    ):
+                        written += 1
+    return written
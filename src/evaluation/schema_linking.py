@@ -0,0 +1,208 @@
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from logging import getLogger
+
+from models import TaskType
+
+logger = getLogger(__name__)
+
+DEFAULT_TOP_K = 4
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+SQL_TABLE_LINE = re.compile(r"Table name: (\w+) \| Columns: (.*)")
+SQL_FOREIGN_KEY = re.compile(r"FK -> (\w+)")
+CYPHER_NODE_LINE = re.compile(r"Node: (\w+)\((.*)\)")
+CYPHER_RELATIONSHIP_LINE = re.compile(r"Relationship: ([\w,]*) -\[(\w+)(?:\((.*)\))?\]-> ([\w,]*)")
+
+
+def _words(text: str) -> list[str]:
+    """Lowercased words of identifiers and prose: ``driverId`` -> driver, id."""
+    return [w.lower() for w in re.findall(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+", text)]
+
+
+def terms(text: str) -> list[str]:
+    """Words plus their padded character trigrams, so ``driver`` still matches ``drivers``."""
+    words = _words(text)
+    trigrams = [f"#{w}#"[i:i + 3] for w in words for i in range(len(w))]
+    return words + trigrams
+
+
+class BM25Index:
+    """Okapi BM25 over small in-memory documents keyed by name."""
+
+    def __init__(self, documents: dict[str, list[str]], k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.frequencies = {name: Counter(doc) for name, doc in documents.items()}
+        self.lengths = {name: len(doc) for name, doc in documents.items()}
+        self.average_length = sum(self.lengths.values()) / max(len(documents), 1)
+        document_frequency = Counter(term for doc in self.frequencies.values() for term in doc)
+        n = len(documents)
+        self.idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in document_frequency.items()
+        }
+
+    def scores(self, query: list[str]) -> dict[str, float]:
+        scores = {}
+        for name, frequencies in self.frequencies.items():
+            norm = self.k1 * (1 - self.b + self.b * self.lengths[name] / max(self.average_length, 1e-9))
+            scores[name] = sum(
+                self.idf[term] * frequencies[term] * (self.k1 + 1) / (frequencies[term] + norm)
+                for term in set(query)
+                if term in frequencies
+            )
+        return scores
+
+
+@dataclass(slots=True)
+class SchemaItem:
+    """A table or node label with its schema line and FK/relationship neighbors."""
+    name: str
+    line: str
+    text: str
+    neighbors: set[str] = field(default_factory=set)
+
+
+@dataclass(slots=True)
+class Relationship:
+    line: str
+    start: set[str]
+    end: set[str]
+
+
+class SchemaLinker:
+    """
+    Keeps the part of a schema a question is about.
+
+    Tables (or labels) are ranked by BM25 over the words and trigrams of their
+    names and columns (properties and relationship types for labels); the
+    ``top_k`` best plus their FK/relationship neighbors are kept. The pruned
+    schema has the same format as the one given, so it drops into the prompt
+    builders unchanged.
+    """
+
+    def __init__(self, schema: str | list[str], task_type: TaskType, top_k: int = DEFAULT_TOP_K):
+        self.schema = schema
+        self.task_type = task_type
+        self.top_k = top_k
+        lines = schema.splitlines() if isinstance(schema, str) else list(schema)
+        self.items: dict[str, SchemaItem] = {}
+        self.relationships: list[Relationship] = []
+
+        if task_type == TaskType.SQL:
+            self._parse_sql(lines)
+        else:
+            self._parse_cypher(lines)
+        self.index = BM25Index({name: terms(item.text) for name, item in self.items.items()})
+
+    def _parse_sql(self, lines: list[str]) -> None:
+        for line in lines:
+            match = SQL_TABLE_LINE.match(line.strip())
+            if match:
+                table, columns = match.groups()
+                self.items[table] = SchemaItem(table, line, f"{table} {columns}")
+
+        for item in list(self.items.values()):
+            for referenced in SQL_FOREIGN_KEY.findall(item.line):
+                if referenced in self.items and referenced != item.name:
+                    item.neighbors.add(referenced)
+                    self.items[referenced].neighbors.add(item.name)
+
+    def _parse_cypher(self, lines: list[str]) -> None:
+        for line in lines:
+            match = CYPHER_NODE_LINE.match(line.strip())
+            if match:
+                label, properties = match.groups()
+                self.items[label] = SchemaItem(label, line, f"{label} {properties}")
+
+        for line in lines:
+            match = CYPHER_RELATIONSHIP_LINE.match(line.strip())
+            if not match:
+                continue
+            start, name, properties, end = match.groups()
+            relationship = Relationship(line, set(filter(None, start.split(","))), set(filter(None, end.split(","))))
+            self.relationships.append(relationship)
+
+            for label in relationship.start | relationship.end:
+                if label in self.items:
+                    self.items[label].text += f" {name} {properties or ''}"
+                    self.items[label].neighbors |= (relationship.start | relationship.end) - {label}
+
+    def select(self, question: str) -> set[str]:
+        """Names of the tables or labels kept for ``question`` (all of them if nothing matches)."""
+        scores = self.index.scores(terms(question))
+        ranked = [name for name, score in sorted(scores.items(), key=lambda kv: -kv[1]) if score > 0]
+        if not ranked:
+            return set(self.items)
+
+        selected = set(ranked[:self.top_k])
+        for name in list(selected):
+            selected |= self.items[name].neighbors & self.items.keys()
+        return selected
+
+    def prune(self, question: str) -> str | list[str]:
+        selected = self.select(question)
+        items = [item.line for name, item in self.items.items() if name in selected]
+
+        if self.task_type == TaskType.SQL:
+            return items if isinstance(self.schema, list) else "\n".join(items)
+
+        relationships = [
+            r.line for r in self.relationships if r.start & selected and r.end & selected
+        ]
+        return "\n" + "\n".join(items) + "\n\n" + "\n".join(relationships)
+
+
+@dataclass(slots=True)
+class PruningStats:
+    """Prompt tokens sent with pruned schemas against what the full schema would have cost."""
+    prompts: int = 0
+    full_tokens: int = 0
+    pruned_tokens: int = 0
+
+    def add(self, full_tokens: int, pruned_tokens: int) -> None:
+        self.prompts += 1
+        self.full_tokens += full_tokens
+        self.pruned_tokens += pruned_tokens
+
+    @property
+    def saved_fraction(self) -> float:
+        return 1 - self.pruned_tokens / self.full_tokens if self.full_tokens else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"Schema pruning: {self.pruned_tokens} system prompt tokens instead of {self.full_tokens} "
+            f"over {self.prompts} prompts ({self.saved_fraction:.1%} saved)"
+        )
+
+
+def recall_check(
+    linker: SchemaLinker, questions_and_entities: list[tuple[str, set[str]]]
+) -> dict[str, float]:
+    """
+    How often pruning keeps the tables/labels the gold queries use.
+
+    ``recall`` is the mean share of gold entities kept, ``complete`` the share
+    of questions for which all of them were kept and ``kept`` the mean share of
+    the schema's tables/labels that remained.
+    """
+    names = {name.lower() for name in linker.items}
+    recalls, complete, kept = [], 0, []
+    for question, entities in questions_and_entities:
+        selected = {name.lower() for name in linker.select(question)}
+        gold = {entity.lower() for entity in entities} & names
+        hit = len(gold & selected) / len(gold) if gold else 1.0
+        recalls.append(hit)
+        complete += hit == 1.0
+        kept.append(len(selected) / max(len(names), 1))
+
+    n = max(len(recalls), 1)
+    return {
+        "questions": len(recalls),
+        "recall": sum(recalls) / n,
+        "complete": complete / n,
+        "kept": sum(kept) / n,
+    }
@@ -1,14 +1,55 @@
-from re import sub
+from dataclasses import replace
+from functools import lru_cache
+from hashlib import sha256
 from logging import getLogger
-import sqlparse
+from time import perf_counter
 
-from database.neo4j import query_neo4j
-from database.duckdb import query_duckdb
-from models import Task, TaskResult, TaskType, SQLQueryAnalyzer, CypherQueryAnalyzer
-from evaluation.utils import compute_component_f1, compute_result_f1, normalize_filters
+from constants import MAX_RESULT_ROWS, RESULT_ROWS_FACTOR
+from database.neo4j import get_neo4j_fingerprint, profile_neo4j, query_neo4j_rows
+from database.duckdb import get_duckdb_fingerprint, profile_duckdb, query_duckdb
+from models import (
+    ExecutionProfile,
+    PlanOperator,
+    ScoringProvenance,
+    Task,
+    TaskResult,
+    TaskType,
+    SQLQueryAnalyzer,
+    CypherQueryAnalyzer,
+)
+from evaluation.tracing import span
+from evaluation.execution_cache import ExecutionRecord, get_execution_cache
+from evaluation.utils import compute_component_f1, compute_set_f1, normalize_filters
 
 logger = getLogger(__name__)
 
+# Bump when parsing, component extraction or normalize_filters change: only the
+# static scores of stored results are recomputed.
+STATIC_SCORING_VERSION = 1
+# Bump when query execution or result comparison change: stored results are
+# re-executed and execution cache entries of older versions are ignored.
+EXECUTION_SCORING_VERSION = 4
+
+STATIC_FIELDS = (
+    "parse_success",
+    "entity_f1",
+    "attribute_f1",
+    "relation_f1",
+    "filter_f1",
+    "aggregation_f1",
+    "return_column_f1",
+)
+
+EXECUTION_FIELDS = (
+    "execution_success",
+    "execution_accuracy",
+    "result_f1",
+    "result_precision",
+    "result_recall",
+    "generated_execution",
+    "expected_execution",
+)
+
 ANALYZERS = {
     TaskType.SQL: SQLQueryAnalyzer(),
     TaskType.CYPHER: CypherQueryAnalyzer()
@@ -16,32 +57,95 @@ ANALYZERS = {
 
 QUERY_DB_BY_TASK_TYPE = {
     TaskType.SQL: query_duckdb,
-    TaskType.CYPHER: query_neo4j,
+    TaskType.CYPHER: query_neo4j_rows,
+}
+
+PROFILE_DB_BY_TASK_TYPE = {
+    TaskType.SQL: profile_duckdb,
+    TaskType.CYPHER: profile_neo4j,
 }
 
-def get_task_result(task: Task, model_response: str, task_type: TaskType, db_path: str) -> TaskResult:
-    """Evaluate the model response for a given task and return TaskResult"""
+FINGERPRINT_DB_BY_TASK_TYPE = {
+    TaskType.SQL: get_duckdb_fingerprint,
+    TaskType.CYPHER: get_neo4j_fingerprint,
+}
+
+_profile_plans = False
+
+
+def set_plan_profiling(enabled: bool) -> None:
+    """
+    Record plan operators by running every complete query a second time under
+    EXPLAIN ANALYZE / PROFILE. Off by default since it doubles database load.
+    """
+    global _profile_plans
+    _profile_plans = enabled
+
+
+def _timed_query(
+    task_type: TaskType, query: str, db_path: str, max_rows: int, stage: str
+) -> tuple[list, float]:
+    """Execute a query and return its rows with the wall time in milliseconds."""
+    start = perf_counter()
+    with span(f"execute_{stage}", task_type=task_type.value):
+        rows = QUERY_DB_BY_TASK_TYPE[task_type](query, db_path, max_rows=max_rows)
+    return rows, (perf_counter() - start) * 1000
+
+
+def _plan_operators(task_type: TaskType, query: str, db_path: str) -> list[PlanOperator]:
+    """Collect plan metrics in a separate pass so they never skew the wall time."""
+    try:
+        with span("profile_plan", task_type=task_type.value):
+            return PROFILE_DB_BY_TASK_TYPE[task_type](query, db_path)
+    except Exception as e:
+        logger.warning(f"Plan profiling failed: {e}")
+        return []
+
+
+def query_hash(query: str) -> str:
+    return sha256(query.strip().encode()).hexdigest()[:16]
+
+
+def canonical_hash(task_type: TaskType, query: str) -> str | None:
+    """Hash of the analyzer's canonical form; equal hashes mean equal results."""
+    with span("canonicalize", task_type=task_type.value):
+        canonical = ANALYZERS[task_type].get_canonical_form(query)
+    return sha256(canonical.encode()).hexdigest()[:16] if canonical is not None else None
+
 
+@lru_cache(maxsize=None)
+def get_db_fingerprint(task_type: TaskType, db_path: str | None) -> str | None:
+    """Fingerprint of the database a task type runs against (None if unavailable)."""
+    try:
+        return FINGERPRINT_DB_BY_TASK_TYPE[task_type](db_path)
+    except Exception as e:
+        logger.warning(f"Could not fingerprint the {task_type.value} database: {e}")
+        return None
+
+
+def _static_scores(task_type: TaskType, model_response: str, expected_query: str) -> dict:
+    """Parse check and component F1 scores; never touches the database."""
     analyzer = ANALYZERS[task_type]
-    expected_query = task.get_response_by_task_type(task_type)
     
-    parse_success = analyzer.is_valid(model_response)
+    with span("analyze_generated", task_type=task_type.value):
+        parse_success = analyzer.is_valid(model_response)
+        
+        entities = analyzer.get_entities(model_response)
+        attributes = analyzer.get_attributes(model_response)
+        relations = analyzer.get_relations(model_response)
+        filters = analyzer.get_filters(model_response)
+        filters = normalize_filters(filters) if task_type == TaskType.CYPHER else filters
+        aggregations = analyzer.get_aggregations(model_response)
+        return_columns = analyzer.get_return_columns(model_response)
     
-    entities = analyzer.get_entities(model_response)
-    attributes = analyzer.get_attributes(model_response)
-    relations = analyzer.get_relations(model_response)
-    filters = analyzer.get_filters(model_response)
-    filters = normalize_filters(filters) if task_type == TaskType.CYPHER else filters
-    aggregations = analyzer.get_aggregations(model_response)
-    return_columns = analyzer.get_return_columns(model_response)
-    
-    expected_entities = analyzer.get_entities(expected_query)
-    expected_attributes = analyzer.get_attributes(expected_query)
-    expected_relations = analyzer.get_relations(expected_query)
-    expected_filters = analyzer.get_filters(expected_query)
-    expected_filters = normalize_filters(expected_filters) if task_type == TaskType.CYPHER else filters
-    expected_aggregations = analyzer.get_aggregations(expected_query)
-    expected_return_columns = analyzer.get_return_columns(expected_query)
+    with span("analyze_expected", task_type=task_type.value):
+        expected_entities = analyzer.get_entities(expected_query)
+        expected_attributes = analyzer.get_attributes(expected_query)
+        expected_relations = analyzer.get_relations(expected_query)
+        expected_filters = analyzer.get_filters(expected_query)
+        expected_filters = normalize_filters(expected_filters) if task_type == TaskType.CYPHER else filters
+        expected_aggregations = analyzer.get_aggregations(expected_query)
+        expected_return_columns = analyzer.get_return_columns(expected_query)
     
     entity_f1 = compute_component_f1(expected_entities, entities)
     attribute_f1 = compute_component_f1(expected_attributes, attributes)
@@ -82,40 +186,165 @@ def get_task_result(task: Task, model_response: str, task_type: TaskType, db_pat
         f"Aggregation: {aggregation_f1:.2f}, Return: {return_column_f1:.2f}"
     )
     
+    return {
+        "parse_success": parse_success,
+        "entity_f1": entity_f1,
+        "attribute_f1": attribute_f1,
+        "relation_f1": relation_f1,
+        "filter_f1": filter_f1,
+        "aggregation_f1": aggregation_f1,
+        "return_column_f1": return_column_f1,
+    }
+
+
+def _execute(
+    task_type: TaskType, query: str, db_path: str, row_limit: int, stage: str
+) -> ExecutionRecord:
+    """
+    Execution record of a query, read from the execution cache when a canonically
+    equal query already ran against the same database.
+    """
+    cache = get_execution_cache()
+    fingerprint = get_db_fingerprint(task_type, db_path)
+    if fingerprint is not None:
+        fingerprint = f"{fingerprint}:v{EXECUTION_SCORING_VERSION}"
+    key = canonical_hash(task_type, query) or query_hash(query)
+    
+    if cache is not None and fingerprint is not None:
+        record = cache.get(task_type.value, fingerprint, key)
+        if record is not None and record.rows <= row_limit:
+            logger.info(f"Execution cache hit for the {stage} query")
+            return replace(record, profile=replace(record.profile, cached=True))
+    
+    rows, elapsed_ms = _timed_query(task_type, query, db_path, row_limit + 1, stage)
+    
+    truncated = len(rows) > row_limit
+    if truncated:
+        logger.info(f"{stage.capitalize()} result exceeds {row_limit} rows, stopped reading")
+        rows = rows[:row_limit]
+    
+    # Profiling a truncated query would run it to completion, so skip the plan.
+    profile = ExecutionProfile(
+        wall_time_ms=elapsed_ms,
+        rows=len(rows),
+        operators=_plan_operators(task_type, query, db_path) if _profile_plans and not truncated else [],
+        truncated=truncated,
+    )
+    with span("digest_rows", task_type=task_type.value):
+        record = ExecutionRecord.from_rows(rows, profile)
+    
+    # A truncated result depends on the row limit, so only complete ones are shared.
+    if cache is not None and fingerprint is not None and not truncated:
+        cache.put(task_type.value, fingerprint, key, record)
+    return record
+
+
+def execute_query(task_type: TaskType, query: str, db_path: str) -> ExecutionRecord:
+    """Execute a query outside of scoring (e.g. a candidate), sharing the execution cache."""
+    return _execute(task_type, query, db_path, MAX_RESULT_ROWS, "candidate")
+
+
+def _execution_scores(
+    task_type: TaskType, model_response: str, expected_query: str, db_path: str
+) -> dict:
+    """Run both queries (or read them from the execution cache) and compare their results."""
     execution_success = False
     execution_accuracy = False
     result_f1 = result_precision = result_recall = 0.0
+    generated_execution = expected_execution = None
     
-    if parse_success:
-        try:
-            query_fn = QUERY_DB_BY_TASK_TYPE[task_type]
-            
-            generated_rows = query_fn(model_response, db_path)
-            expected_rows = query_fn(expected_query, db_path)
-            
-            execution_success = True
-            
-            execution_accuracy = (generated_rows == expected_rows)
-            
-            result_metrics = compute_result_f1(expected_rows, generated_rows)
-            result_f1 = result_metrics['f1']
-            result_precision = result_metrics['precision']
-            result_recall = result_metrics['recall']
-            
-            logger.info(
-                f"Execution - Success: {execution_success}, "
-                f"Exact Match: {execution_accuracy}, "
-                f"F1: {result_f1:.2f}, "
-                f"Precision: {result_precision:.2f}, "
-                f"Recall: {result_recall:.2f}"
+    try:
+        expected = _execute(task_type, expected_query, db_path, MAX_RESULT_ROWS, "expected")
+        expected_execution = expected.profile
+        
+        row_limit = min(MAX_RESULT_ROWS, max(expected.rows, 1) * RESULT_ROWS_FACTOR)
+        generated = _execute(task_type, model_response, db_path, row_limit, "generated")
+        generated_execution = generated.profile
+        
+        execution_success = True
+        # Only the first MAX_RESULT_ROWS gold rows were read: two results that
+        # share that prefix may still differ, so they are not compared at all.
+        if expected.profile.truncated:
+            logger.warning(
+                f"Gold result exceeds {MAX_RESULT_ROWS} rows, not comparable; "
+                "scoring the generated query as not matching"
             )
-            
-        except Exception as e:
-            logger.error(f"Execution error: {e}")
-            execution_success = False
-    else:
-        logger.info("Skipping execution (parse failed)")
+            return {
+                **_skipped_execution(),
+                "execution_success": True,
+                "generated_execution": generated_execution,
+                "expected_execution": expected_execution,
+            }
+        execution_accuracy = (generated.digest == expected.digest)
+        
+        with span("compute_result_f1", task_type=task_type.value):
+            result_metrics = compute_set_f1(expected.row_hashes, generated.row_hashes)
+        result_f1 = result_metrics['f1']
+        result_precision = result_metrics['precision']
+        result_recall = result_metrics['recall']
+        
+        logger.info(
+            f"Execution - Success: {execution_success}, "
+            f"Exact Match: {execution_accuracy}, "
+            f"F1: {result_f1:.2f}, "
+            f"Precision: {result_precision:.2f}, "
+            f"Recall: {result_recall:.2f}"
+        )
+        
+    except Exception as e:
+        logger.error(f"Execution error: {e}")
+        execution_success = False
     
+    return {
+        "execution_success": execution_success,
+        "execution_accuracy": execution_accuracy,
+        "result_f1": result_f1,
+        "result_precision": result_precision,
+        "result_recall": result_recall,
+        "generated_execution": generated_execution,
+        "expected_execution": expected_execution,
+    }
+
+
+def _skipped_execution() -> dict:
+    return {
+        "execution_success": False,
+        "execution_accuracy": False,
+        "result_f1": 0.0,
+        "result_precision": 0.0,
+        "result_recall": 0.0,
+        "generated_execution": None,
+        "expected_execution": None,
+    }
+
+
+def _canonical_match_execution() -> dict:
+    """Scores of a query that is canonically identical to the gold query."""
+    return {
+        "execution_success": True,
+        "execution_accuracy": True,
+        "result_f1": 1.0,
+        "result_precision": 1.0,
+        "result_recall": 1.0,
+        "generated_execution": None,
+        "expected_execution": None,
+    }
+
+
+def _reuse(previous: TaskResult, fields: tuple[str, ...]) -> dict:
+    return {name: getattr(previous, name) for name in fields}
+
+
+def _error_classification(scores: dict, task_type: TaskType) -> tuple[str, list[str]]:
+    parse_success = scores["parse_success"]
+    execution_success = scores["execution_success"]
+    execution_accuracy = scores["execution_accuracy"]
+    entity_f1 = scores["entity_f1"]
+    attribute_f1 = scores["attribute_f1"]
+    relation_f1 = scores["relation_f1"]
+    filter_f1 = scores["filter_f1"]
+    aggregation_f1 = scores["aggregation_f1"]
+    return_column_f1 = scores["return_column_f1"]
 
     error_flags = []
     
@@ -160,49 +389,74 @@ def get_task_result(task: Task, model_response: str, task_type: TaskType, db_pat
     else:
         error_category = 'RESULT_MISMATCH'
     
+    return error_category, error_flags
+
+
+def get_task_result(
+    task: Task,
+    model_response: str,
+    task_type: TaskType,
+    db_path: str,
+    previous: TaskResult | None = None,
+) -> TaskResult:
+    """
+    Evaluate the model response for a given task and return TaskResult.
+
+    A response that is canonically equal to the gold query is marked correct
+    without executing either. With ``previous``, static and execution scores
+    are copied from it when their inputs (query hashes, database fingerprint,
+    scoring versions) match its provenance, so only the parts whose inputs
+    changed are recomputed.
+    """
+    expected_query = task.get_response_by_task_type(task_type)
+    provenance = ScoringProvenance(
+        generated_hash=query_hash(model_response),
+        expected_hash=query_hash(expected_query),
+        db_fingerprint=get_db_fingerprint(task_type, db_path),
+        static_version=STATIC_SCORING_VERSION,
+        execution_version=EXECUTION_SCORING_VERSION,
+    )
+    prior = previous.provenance if previous else None
+    
+    if prior is not None and prior.static_key == provenance.static_key:
+        logger.info("Static inputs unchanged, reusing component scores")
+        scores = _reuse(previous, STATIC_FIELDS)
+    else:
+        scores = _static_scores(task_type, model_response, expected_query)
+    
+    generated_canonical = canonical_hash(task_type, model_response) if scores["parse_success"] else None
+    canonical_match = (
+        generated_canonical is not None
+        and generated_canonical == canonical_hash(task_type, expected_query)
+    )
+    
+    if not scores["parse_success"]:
+        logger.info("Skipping execution (parse failed)")
+        scores.update(_skipped_execution())
+    elif canonical_match:
+        logger.info("Generated query is canonically equal to the gold query, skipping execution")
+        scores.update(_canonical_match_execution())
+    elif (
+        prior is not None
+        and previous.parse_success
+        and provenance.db_fingerprint is not None
+        and prior.execution_key == provenance.execution_key
+    ):
+        logger.info("Execution inputs unchanged, reusing execution scores")
+        scores.update(_reuse(previous, EXECUTION_FIELDS))
+    else:
+        scores.update(_execution_scores(task_type, model_response, expected_query, db_path))
+    
+    error_category, error_flags = _error_classification(scores, task_type)
     logger.info(f"Error Category: {error_category}, Flags: {error_flags}")
     
-
     return TaskResult(
         task=task,
         response=model_response,
-        parse_success=parse_success,
-        execution_success=execution_success,
-        entity_f1=entity_f1,
-        attribute_f1=attribute_f1,
-        relation_f1=relation_f1,
-        filter_f1=filter_f1,
-        aggregation_f1=aggregation_f1,
-        return_column_f1=return_column_f1,
-        execution_accuracy=execution_accuracy,
-        result_f1=result_f1,
-        result_precision=result_precision,
-        result_recall=result_recall,
         error_category=error_category,
         error_flags=error_flags,
-        task_type=task_type
+        task_type=task_type,
+        provenance=provenance,
+        canonical_match=canonical_match,
+        **scores,
     )
-
-
-def normalize_query(query: str, task_type: TaskType) -> str:
-    query = query.strip().lower()
-
-    query = sub(r"\s+", " ", query)
-
-    if task_type == TaskType.SQL:
-        parsed = sqlparse.format(
-            query,
-            keyword_case="lower",
-            identifier_case="lower",
-            strip_comments=True,
-            reindent=False,
-        )
-        query = sub(r"\s+", " ", parsed).strip()
-
-    elif task_type == TaskType.CYPHER:
-        query = sub(r"\s+as\s+\w+", "", query)
-        query = query.strip()
-
-    query = query.rstrip(";")
-
-    return query
@@ -0,0 +1,83 @@
+from collections import Counter
+from concurrent.futures import Executor
+from logging import getLogger
+
+from evaluation.scoring import ANALYZERS, canonical_hash, execute_query, query_hash
+from evaluation.tracing import span
+from models import LLMUsage, SampleVotes, TaskType
+
+logger = getLogger(__name__)
+
+SELF_CONSISTENCY_TEMPERATURE = 0.7
+DIGEST_LENGTH = 16
+
+
+def combine_usage(usages: list[LLMUsage]) -> LLMUsage | None:
+    """One usage record for concurrent samples: summed tokens and cost, wall-clock timing."""
+    if not usages:
+        return None
+    first_tokens = [u.time_to_first_token_ms for u in usages if u.time_to_first_token_ms is not None]
+    latencies = [u.latency_ms for u in usages if u.latency_ms is not None]
+    costs = [u.cost_usd for u in usages if u.cost_usd is not None]
+    return LLMUsage(
+        model=usages[0].model,
+        prompt_tokens=sum(u.prompt_tokens for u in usages),
+        completion_tokens=sum(u.completion_tokens for u in usages),
+        cached_tokens=sum(u.cached_tokens for u in usages),
+        cache_creation_tokens=sum(u.cache_creation_tokens for u in usages),
+        time_to_first_token_ms=min(first_tokens) if first_tokens else None,
+        latency_ms=max(latencies) if latencies else None,
+        cost_usd=sum(costs) if costs else None,
+        estimated=any(u.estimated for u in usages),
+    )
+
+
+def vote(
+    task_type: TaskType, samples: list[str], db_path: str | None, pool: Executor
+) -> tuple[str, SampleVotes]:
+    """
+    Pick the query whose result most samples agree on.
+
+    Samples are deduplicated by canonical form, each distinct candidate is
+    executed once on ``pool`` (through the execution cache, so scoring the
+    winner afterwards is a cache hit), and every sample votes for the digest
+    of its candidate's result. Ties go to the result sampled first; samples
+    that do not parse or fail to execute do not vote.
+    """
+    analyzer = ANALYZERS[task_type]
+    keys: list[str | None] = []
+    candidates: dict[str, str] = {}
+    for query in samples:
+        if not analyzer.is_valid(query):
+            keys.append(None)
+            continue
+        key = canonical_hash(task_type, query) or query_hash(query)
+        candidates.setdefault(key, query)
+        keys.append(key)
+
+    with span("execute_candidates", task_type=task_type.value, candidates=len(candidates)):
+        futures = {key: pool.submit(execute_query, task_type, query, db_path) for key, query in candidates.items()}
+        digests = {}
+        for key, future in futures.items():
+            try:
+                digests[key] = future.result().digest[:DIGEST_LENGTH]
+            except Exception as e:
+                logger.info(f"Candidate failed to execute: {e}")
+
+    votes = Counter(digests[key] for key in keys if key in digests)
+    winner = votes.most_common(1)[0][0] if votes else None
+    if winner is not None:
+        chosen = next(candidates[key] for key in keys if key in digests and digests[key] == winner)
+    elif candidates:
+        chosen = next(iter(candidates.values()))
+    else:
+        chosen = samples[0]
+
+    logger.info(f"Self-consistency: {len(samples)} samples, {len(candidates)} candidates, votes {dict(votes)}")
+    return chosen, SampleVotes(
+        samples=len(samples),
+        candidates=len(candidates),
+        votes=dict(votes),
+        failed=len(samples) - sum(votes.values()),
+        winner=winner,
+    )
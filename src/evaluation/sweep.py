@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from logging import getLogger
+from time import perf_counter
+
+from evaluation.remote_eval import evaluate_remote_interleaved, load_schema
+from evaluation.resilience import get_provider
+from models import DatasetName, TaskDifficulty, TaskType
+
+logger = getLogger(__name__)
+
+DEFAULT_MAX_JOBS = 4
+
+
+@dataclass(slots=True, frozen=True)
+class SweepOutcome:
+    model: str
+    dataset: DatasetName
+    seconds: float
+    error: str | None = None
+
+
+def evaluate_sweep(
+    models: list[str],
+    datasets: list[DatasetName],
+    task_types: list[TaskType],
+    resume: bool = False,
+    prune_top_k: int | None = None,
+    samples: int = 1,
+    sample_difficulties: list[TaskDifficulty] | None = None,
+    max_jobs: int = DEFAULT_MAX_JOBS,
+) -> list[SweepOutcome]:
+    """
+    Evaluate several litellm models on the same datasets at once.
+
+    Every (model, dataset) pair is a job run with ``evaluate_remote_interleaved``
+    on up to ``max_jobs`` threads. Jobs only contend where they should: LLM
+    calls are capped and circuit-broken per provider (see ``ProviderLimiter``),
+    so a rate-limited provider does not slow down the others; schemas are
+    loaded once, and a gold query executed by one job is read from the
+    execution cache by the others (jobs that reach it at the same moment may
+    each execute it). Results go to each model's own result directory. API
+    keys are read by litellm from the provider's environment variable. A job
+    that fails is logged and reported without stopping the others.
+
+    There is a single Neo4j instance holding whichever graph was loaded last,
+    so Cypher can only be swept over one dataset at a time.
+    """
+    if TaskType.CYPHER in task_types and len(set(datasets)) > 1:
+        raise ValueError(
+            "Cypher tasks run against the one Neo4j graph that is loaded; sweep one dataset at a time"
+        )
+
+    for dataset_name in datasets:
+        for task_type in task_types:
+            load_schema(task_type, dataset_name)
+
+    def run_job(model_name: str, dataset_name: DatasetName) -> SweepOutcome:
+        start = perf_counter()
+        try:
+            evaluate_remote_interleaved(
+                model_name, dataset_name, task_types, None, resume, prune_top_k, samples, sample_difficulties
+            )
+        except Exception as e:
+            logger.error(f"Sweep job {model_name} on {dataset_name} failed: {e}")
+            return SweepOutcome(model_name, dataset_name, perf_counter() - start, str(e))
+        return SweepOutcome(model_name, dataset_name, perf_counter() - start)
+
+    jobs = [(model_name, dataset_name) for dataset_name in datasets for model_name in models]
+    logger.info(
+        f"Sweeping {len(models)} models over {len(datasets)} datasets "
+        f"(providers: {', '.join(sorted({get_provider(model) for model in models}))})"
+    )
+    with ThreadPoolExecutor(max_workers=max(1, min(max_jobs, len(jobs))), thread_name_prefix="sweep") as pool:
+        outcomes = list(pool.map(lambda job: run_job(*job), jobs))
+
+    for outcome in outcomes:
+        status = "ok" if outcome.error is None else f"failed: {outcome.error}"
+        logger.info(f"{outcome.model} on {outcome.dataset}: {status} after {outcome.seconds:.0f}s")
+    return outcomes
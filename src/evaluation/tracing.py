@@ -0,0 +1,111 @@
+import json
+import os
+import threading
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from logging import getLogger
+from pathlib import Path
+from time import perf_counter_ns
+
+logger = getLogger(__name__)
+
+PERCENTILES = (50, 90, 95, 99)
+
+_NULL_SPAN = nullcontext()
+_tracer: "Tracer | None" = None
+
+
+def percentile(sorted_values: list[float], p: int) -> float:
+    """Nearest-rank percentile of an ascending, non-empty list."""
+    rank = max(0, -(-p * len(sorted_values) // 100) - 1)
+    return sorted_values[rank]
+
+
+class Tracer:
+    """Collects complete ("X") trace events for every finished span."""
+
+    def __init__(self):
+        self.events: list[dict] = []
+        self._lock = threading.Lock()
+        self._origin = perf_counter_ns()
+
+    @contextmanager
+    def span(self, name: str, args: dict):
+        start = perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = perf_counter_ns()
+            event = {
+                "name": name,
+                "cat": "eval",
+                "ph": "X",
+                "ts": (start - self._origin) / 1000,
+                "dur": (end - start) / 1000,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": args,
+            }
+            with self._lock:
+                self.events.append(event)
+
+    def export_chrome_trace(self, path: Path) -> None:
+        """Write events in the Chrome trace format (loadable in Perfetto)."""
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Per-stage count, total, mean and percentile durations in milliseconds."""
+        durations = defaultdict(list)
+        for event in self.events:
+            durations[event["name"]].append(event["dur"] / 1000)
+
+        summary = {}
+        for name, values in durations.items():
+            values.sort()
+            stats = {
+                "count": len(values),
+                "total_ms": sum(values),
+                "mean_ms": sum(values) / len(values),
+                "max_ms": values[-1],
+            }
+            for p in PERCENTILES:
+                stats[f"p{p}_ms"] = percentile(values, p)
+            summary[name] = stats
+        return summary
+
+
+def span(name: str, **args):
+    """Time the enclosed block as ``name``; a shared no-op when tracing is off."""
+    if _tracer is None:
+        return _NULL_SPAN
+    return _tracer.span(name, args)
+
+
+def start_tracing() -> Tracer:
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def stop_tracing(output_prefix: Path) -> None:
+    """Write ``<prefix>.trace.json`` and ``<prefix>.summary.json`` and disable tracing."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is None:
+        return
+
+    output_prefix.parent.mkdir(parents=True, exist_ok=True)
+    trace_path = output_prefix.parent / f"{output_prefix.name}.trace.json"
+    tracer.export_chrome_trace(trace_path)
+
+    summary = tracer.summary()
+    with open(output_prefix.parent / f"{output_prefix.name}.summary.json", "w") as f:
+        json.dump(summary, f, indent=2)
+
+    for name, stats in sorted(summary.items(), key=lambda item: -item[1]["total_ms"]):
+        logger.info(
+            f"{name}: n={stats['count']}, total={stats['total_ms']:.0f}ms, "
+            f"p50={stats['p50_ms']:.1f}ms, p95={stats['p95_ms']:.1f}ms, max={stats['max_ms']:.1f}ms"
+        )
+    logger.info(f"Trace written to {trace_path}")
@@ -23,8 +23,8 @@ def compute_component_f1(expected_set, generated_set):
     
     return f1
 
-def compute_result_f1(expected_rows, generated_rows):
-    """F1 on query results with normalized comparison."""
+def result_row_set(rows) -> set[tuple]:
+    """Rows as a set of order-insensitive tuples of normalized leaf values."""
     
     def normalize_value(value):
         """Normalize to comparable primitive."""
@@ -61,14 +61,13 @@ def compute_result_f1(expected_rows, generated_rows):
         recurse(row)
         return tuple(sorted(str(v) for v in values if v is not None))
     
-    def to_set(rows):
-        if not rows:
-            return set()
-        return {extract_values(row) for row in rows}
-    
-    ref_set = to_set(expected_rows)
-    gen_set = to_set(generated_rows)
-    
+    if not rows:
+        return set()
+    return {extract_values(row) for row in rows}
+
+
+def compute_set_f1(ref_set: set, gen_set: set) -> dict[str, float]:
+    """Precision, recall and F1 of a generated row set against the reference set."""
     tp = len(ref_set & gen_set)
     fp = len(gen_set - ref_set)
     fn = len(ref_set - gen_set)
@@ -79,6 +78,11 @@ def compute_result_f1(expected_rows, generated_rows):
     
     return {'f1': f1, 'precision': precision, 'recall': recall}
 
+
+def compute_result_f1(expected_rows, generated_rows):
+    """F1 on query results with normalized comparison."""
+    return compute_set_f1(result_row_set(expected_rows), result_row_set(generated_rows))
+
 def normalize_filters(filters: Set[str]) -> Set[str]:
     """
     Split compound filter expressions into atomic predicates.
@@ -1,4 +1,5 @@
 import os
+from datetime import datetime
 from logging import basicConfig, getLogger, INFO
 from pathlib import Path
 from dotenv import load_dotenv
@@ -6,13 +7,35 @@ from dotenv import load_dotenv
 import typer
 from typing import Optional
 
-from constants import REMOTE_MODEL_NAME
+from constants import BASE_MODEL_NAME, PREFIX_KV_CACHE_DIR, REMOTE_MODEL_NAME, REPORTS_DIR, TRACES_DIR, get_tasks_directory
+from database.constants import (
+    DUCKDB_MAX_CONCURRENCY,
+    DUCKDB_MEMORY_LIMIT,
+    DUCKDB_THREADS,
+    NEO4J_MAX_CONCURRENCY,
+)
 from database.neo4j import get_neo4j_schema
-from database.duckdb import get_duckdb_schema
+from database.duckdb import (
+    DuckDBLimits,
+    SnapshotMode,
+    get_duckdb_schema,
+    set_duckdb_limits,
+    set_snapshot_mode,
+)
 from database.setup import get_node_csvs, load_dataset_to_duckdb
+from evaluation.batch_eval import POLL_INTERVAL, evaluate_remote_batch
+from evaluation.batch_server import DEFAULT_PORT, serve
+from evaluation.execution_cache import set_execution_cache_enabled
 from evaluation.re_evaluation import re_evaluate_results
-from evaluation.remote_eval import evaluate_remote_model
-from models import DatasetName, TaskType
+from evaluation.remote_eval import evaluate_remote_interleaved, evaluate_remote_model, load_schema
+from evaluation.remote_eval_utils import count_tokens, set_early_stop
+from evaluation.resilience import LLMUnavailableError, set_provider_concurrency
+from evaluation.schema_linking import SchemaLinker, recall_check
+from evaluation.scoring import set_plan_profiling
+from evaluation.sweep import DEFAULT_MAX_JOBS, evaluate_sweep
+from evaluation.tracing import start_tracing, stop_tracing
+from models import CypherQueryAnalyzer, DatasetName, SQLQueryAnalyzer, TaskDifficulty, TaskType
+from utils import get_tasks_from_json
 from validate_tasks import validate
 
 load_dotenv()  
@@ -24,6 +47,13 @@ basicConfig(level=INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(messa
 logger = getLogger(__name__)
 
 
+def _configure_duckdb(memory_limit: str, threads: int, isolate: bool, snapshot: SnapshotMode) -> None:
+    if isolate and snapshot == SnapshotMode.MEMORY:
+        raise typer.BadParameter("--duckdb-isolate needs the file snapshot mode")
+    set_duckdb_limits(DuckDBLimits(memory_limit=memory_limit, threads=threads, isolate=isolate))
+    set_snapshot_mode(snapshot)
+
+
 @app.command()
 def generate_csvs(dataset_name: DatasetName, sample_size: float = 1.0) -> None:
     """Generate CSVs for Neo4j import."""
@@ -40,12 +70,14 @@ def load_duckdb(dataset_name: DatasetName, sample_size: float = 1.0) -> None:
 def validate_tasks(
     dataset_name: DatasetName,
     task_types: Optional[list[TaskType]] = typer.Argument(default=None),
+    top_n: int = typer.Option(10, help="Number of slowest gold queries listed in the report."),
 ) -> None:
+    """Run all gold queries and write a latency report to validation/<dataset>/."""
     if task_types is None:
         task_types = [TaskType.SQL, TaskType.CYPHER]
     
     for path in Path(f"src/tasks/{dataset_name}").glob("*.json"):
-        validate(path, dataset_name, task_types)
+        validate(path, dataset_name, task_types, top_n)
 
 
 @app.command()
@@ -57,30 +89,244 @@ def get_neo4j() -> None:
 
 @app.command()
 def re_evaluation(
-    dataset_name: DatasetName, 
-    task_type: TaskType = TaskType.SQL
+    dataset_names: Optional[list[DatasetName]] = typer.Option(None, "--dataset-name", help="Datasets to re-evaluate (default: all)."),
+    task_types: Optional[list[TaskType]] = typer.Option(None, "--task-type", help="Task types to re-evaluate (default: all)."),
+    models: Optional[list[str]] = typer.Option(None, "--model", help="Models to re-evaluate (default: every model directory)."),
+    sql_workers: int = typer.Option(DUCKDB_MAX_CONCURRENCY, help="Concurrent DuckDB evaluations."),
+    cypher_workers: int = typer.Option(NEO4J_MAX_CONCURRENCY, help="Concurrent Neo4j evaluations."),
+    execution_cache: bool = typer.Option(True, help="Reuse query results cached in .cache/executions.sqlite."),
+    profile_plans: bool = typer.Option(False, help="Also run each query under EXPLAIN ANALYZE / PROFILE to record plan operators."),
+    duckdb_memory_limit: str = typer.Option(DUCKDB_MEMORY_LIMIT, help="DuckDB memory limit; larger intermediates spill to .cache/duckdb_spill."),
+    duckdb_threads: int = typer.Option(DUCKDB_THREADS, help="Threads DuckDB may use across all queries."),
+    duckdb_isolate: bool = typer.Option(False, help="Run SQL queries in memory-capped worker processes."),
+    duckdb_snapshot: SnapshotMode = typer.Option(SnapshotMode.FILE, help="Query the database file, or an in-memory copy loaded once."),
 ) -> None:
     """Re-evaluate existing results."""
-    re_evaluate_results(dataset_name, task_type)
+    set_execution_cache_enabled(execution_cache)
+    set_plan_profiling(profile_plans)
+    _configure_duckdb(duckdb_memory_limit, duckdb_threads, duckdb_isolate, duckdb_snapshot)
+    re_evaluate_results(
+        dataset_names,
+        task_types,
+        models,
+        backend_concurrency={TaskType.SQL: sql_workers, TaskType.CYPHER: cypher_workers},
+    )
+
+
+@app.command()
+def evaluate_local(
+    dataset_name: DatasetName,
+    task_types: list[TaskType],
+    model: str = typer.Option(BASE_MODEL_NAME, help="Hugging Face model id or local path of a causal LM."),
+    device: Optional[str] = typer.Option(None, help="Torch device (default: cuda when available, else cpu)."),
+    batch_size: int = typer.Option(8, help="Most questions generated together."),
+    batch_tokens: int = typer.Option(4096, help="Most padded question tokens in one batch."),
+    max_new_tokens: int = typer.Option(256, help="Most tokens generated per question."),
+    prefix_cache: bool = typer.Option(True, help="Reuse schema-prefix KV caches persisted in .cache/prefix_kv."),
+    resume: bool = typer.Option(False, help="Skip tasks already checkpointed for this model and prompt."),
+    execution_cache: bool = typer.Option(True, help="Reuse query results cached in .cache/executions.sqlite."),
+    profile_plans: bool = typer.Option(False, help="Also run each query under EXPLAIN ANALYZE / PROFILE to record plan operators."),
+) -> None:
+    """Evaluate a local transformers model, batching questions over a cached schema prefix."""
+    from evaluation.local_eval import LocalGenerator, evaluate_local_model
+
+    set_execution_cache_enabled(execution_cache)
+    set_plan_profiling(profile_plans)
+    generator = LocalGenerator.load(
+        model, device, batch_size=batch_size, batch_tokens=batch_tokens, max_new_tokens=max_new_tokens,
+        cache_dir=PREFIX_KV_CACHE_DIR if prefix_cache else None,
+    )
+    for task_type in task_types:
+        evaluate_local_model(generator, dataset_name, task_type, resume)
 
 
 @app.command()
-def evaluate_remote(dataset_name: DatasetName, task_types: list[TaskType]) -> None:
+def evaluate_remote(
+    dataset_name: DatasetName,
+    task_types: list[TaskType],
+    trace: bool = typer.Option(False, help="Write a Chrome trace and stage summary to traces/."),
+    resume: bool = typer.Option(False, help="Skip tasks already checkpointed for this model and prompt."),
+    execution_cache: bool = typer.Option(True, help="Reuse query results cached in .cache/executions.sqlite."),
+    profile_plans: bool = typer.Option(False, help="Also run each query under EXPLAIN ANALYZE / PROFILE to record plan operators."),
+    duckdb_memory_limit: str = typer.Option(DUCKDB_MEMORY_LIMIT, help="DuckDB memory limit; larger intermediates spill to .cache/duckdb_spill."),
+    duckdb_threads: int = typer.Option(DUCKDB_THREADS, help="Threads DuckDB may use across all queries."),
+    duckdb_isolate: bool = typer.Option(False, help="Run SQL queries in memory-capped worker processes."),
+    duckdb_snapshot: SnapshotMode = typer.Option(SnapshotMode.FILE, help="Query the database file, or an in-memory copy loaded once."),
+    batch: bool = typer.Option(False, help="Submit all prompts through the provider's batch API instead of one call each."),
+    batch_provider: Optional[str] = typer.Option(None, help="litellm provider of the batch API; by default the model's provider, or openai with --api-base."),
+    api_base: Optional[str] = typer.Option(None, help="Batch API base URL, e.g. the stand-in from batch-server."),
+    poll_interval: float = typer.Option(POLL_INTERVAL, help="Seconds between batch status checks."),
+    prune_schema: Optional[int] = typer.Option(None, help="Send only the top-k matching tables/labels (plus neighbors) of the schema."),
+    samples: int = typer.Option(1, help="Completions per task; the query is picked by majority vote over their results."),
+    sample_difficulty: list[TaskDifficulty] = typer.Option([TaskDifficulty.HARD], help="Difficulties that use --samples."),
+    interleave: bool = typer.Option(False, help="Evaluate all task types concurrently, one lane per backend."),
+    stop_early: bool = typer.Option(False, help="Close each stream once its query is complete; its token usage is then estimated."),
+) -> None:
     """Evaluate the remote LLM model."""
-    if not ANTHROPIC_API_KEY:
+    if not ANTHROPIC_API_KEY and not (batch and api_base):
         raise typer.Abort("API key environment variable not set!")
+    set_execution_cache_enabled(execution_cache)
+    set_plan_profiling(profile_plans)
+    set_early_stop(stop_early)
+    _configure_duckdb(duckdb_memory_limit, duckdb_threads, duckdb_isolate, duckdb_snapshot)
 
-    for task_type in task_types:
-        evaluate_remote_model(
-            REMOTE_MODEL_NAME, dataset_name, task_type, ANTHROPIC_API_KEY
+    if trace:
+        start_tracing()
+
+    if interleave and batch:
+        raise typer.BadParameter("--interleave and --batch cannot be combined")
+    if batch and samples > 1:
+        raise typer.BadParameter("--batch sends one completion per task and cannot be combined with --samples")
+
+    try:
+        if interleave:
+            evaluate_remote_interleaved(
+                REMOTE_MODEL_NAME, dataset_name, task_types, ANTHROPIC_API_KEY, resume, prune_schema,
+                samples, sample_difficulty,
+            )
+        else:
+            for task_type in task_types:
+                if batch:
+                    evaluate_remote_batch(
+                        REMOTE_MODEL_NAME, dataset_name, task_type, ANTHROPIC_API_KEY or "local", resume,
+                        batch_provider, api_base, poll_interval, prune_schema,
+                    )
+                else:
+                    evaluate_remote_model(
+                        REMOTE_MODEL_NAME, dataset_name, task_type, ANTHROPIC_API_KEY, resume, prune_schema,
+                        samples, sample_difficulty,
+                    )
+    except LLMUnavailableError as e:
+        logger.error(f"{e}. Completed tasks are checkpointed; rerun with --resume.")
+        raise typer.Exit(1)
+    finally:
+        if trace:
+            run_name = f"{dataset_name}_{datetime.now():%Y%m%dT%H%M%S}"
+            stop_tracing(TRACES_DIR / run_name)
+
+
+@app.command("evaluate-sweep")
+def evaluate_sweep_command(
+    models: list[str] = typer.Option(..., "--model", help="litellm model ids, e.g. anthropic/claude-sonnet-4-20250514."),
+    datasets: list[DatasetName] = typer.Option(..., "--dataset", help="Datasets to evaluate every model on."),
+    task_types: list[TaskType] = typer.Option([TaskType.SQL, TaskType.CYPHER], "--task-type", help="Task types to evaluate."),
+    provider_concurrency: list[str] = typer.Option([], help="Concurrent LLM calls per provider, as provider=N."),
+    max_jobs: int = typer.Option(DEFAULT_MAX_JOBS, help="(model, dataset) pairs evaluated at the same time."),
+    resume: bool = typer.Option(False, help="Skip tasks already checkpointed for each model and prompt."),
+    execution_cache: bool = typer.Option(True, help="Reuse query results cached in .cache/executions.sqlite."),
+    profile_plans: bool = typer.Option(False, help="Also run each query under EXPLAIN ANALYZE / PROFILE to record plan operators."),
+    duckdb_memory_limit: str = typer.Option(DUCKDB_MEMORY_LIMIT, help="DuckDB memory limit; larger intermediates spill to .cache/duckdb_spill."),
+    duckdb_threads: int = typer.Option(DUCKDB_THREADS, help="Threads DuckDB may use across all queries."),
+    duckdb_snapshot: SnapshotMode = typer.Option(SnapshotMode.FILE, help="Query the database file, or an in-memory copy loaded once."),
+    prune_schema: Optional[int] = typer.Option(None, help="Send only the top-k matching tables/labels (plus neighbors) of the schema."),
+    samples: int = typer.Option(1, help="Completions per task; the query is picked by majority vote over their results."),
+    sample_difficulty: list[TaskDifficulty] = typer.Option([TaskDifficulty.HARD], help="Difficulties that use --samples."),
+    stop_early: bool = typer.Option(False, help="Close each stream once its query is complete; its token usage is then estimated."),
+) -> None:
+    """Evaluate several remote models concurrently, with rate limits per provider."""
+    limits = {}
+    for entry in provider_concurrency:
+        provider, _, value = entry.partition("=")
+        if not value.isdigit() or int(value) < 1:
+            raise typer.BadParameter(f"expected provider=N, got {entry!r}", param_hint="--provider-concurrency")
+        limits[provider] = int(value)
+    set_provider_concurrency(limits)
+    set_execution_cache_enabled(execution_cache)
+    set_plan_profiling(profile_plans)
+    set_early_stop(stop_early)
+    _configure_duckdb(duckdb_memory_limit, duckdb_threads, False, duckdb_snapshot)
+
+    try:
+        outcomes = evaluate_sweep(
+            models, datasets, task_types, resume, prune_schema, samples, sample_difficulty, max_jobs
         )
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--dataset")
+    if any(outcome.error for outcome in outcomes):
+        logger.error("Some sweep jobs failed; completed tasks are checkpointed, rerun with --resume.")
+        raise typer.Exit(1)
+
+
+@app.command()
+def schema_recall(
+    dataset_name: DatasetName,
+    task_types: Optional[list[TaskType]] = typer.Argument(default=None),
+    top_k: list[int] = typer.Option([2, 4, 8], help="Pruning sizes to check."),
+) -> None:
+    """Check that schema pruning keeps the tables/labels used by the gold queries."""
+    for task_type in task_types or [TaskType.SQL, TaskType.CYPHER]:
+        schema = load_schema(task_type, dataset_name)
+        analyzer = SQLQueryAnalyzer() if task_type == TaskType.SQL else CypherQueryAnalyzer()
+        questions = [
+            (task.question, analyzer.get_entities(task.get_response_by_task_type(task_type)))
+            for path in sorted(get_tasks_directory(dataset_name).glob("*.json"))
+            for task in get_tasks_from_json(path)
+        ]
+        full_tokens = count_tokens(REMOTE_MODEL_NAME, str(schema))
+
+        for k in top_k:
+            linker = SchemaLinker(schema, task_type, k)
+            recall = recall_check(linker, questions)
+            pruned_tokens = sum(
+                count_tokens(REMOTE_MODEL_NAME, str(linker.prune(question))) for question, _ in questions
+            ) / max(len(questions), 1)
+            print(
+                f"[{task_type.value}] top-{k}: recall {recall['recall']:.3f} | "
+                f"complete {recall['complete']:.1%} | kept {recall['kept']:.1%} of tables | "
+                f"schema tokens {pruned_tokens:.0f}/{full_tokens} on average"
+            )
+
+
+@app.command()
+def batch_server(
+    port: int = typer.Option(DEFAULT_PORT, help="Port to listen on (127.0.0.1)."),
+    processing_seconds: float = typer.Option(0.0, help="How long each batch stays in progress."),
+) -> None:
+    """Serve a local stand-in for the OpenAI batch API, for testing evaluate-remote --batch."""
+    serve(port, processing_seconds)
+
 
 @app.command()
-def plot_evaluation_results(dataset_name: DatasetName) -> None:
+def plot_evaluation_results(
+    dataset_name: DatasetName,
+    workers: Optional[int] = typer.Option(None, help="Render processes (default: one per CPU)."),
+    force: bool = typer.Option(False, help="Re-render plots even when their inputs are unchanged."),
+) -> None:
     """Plot evaluation results."""
     from evaluation.plot import plot_results
 
-    plot_results(dataset_name)
+    plot_results(dataset_name, max_workers=workers, force=force)
+
+
+@app.command()
+def import_results() -> None:
+    """Copy existing JSON result files into the Parquet results store."""
+    from evaluation.results_store import import_json_results
+
+    written = import_json_results()
+    logger.info(f"Imported {written} result partitions")
+
+
+@app.command()
+def report(
+    datasets: Optional[list[DatasetName]] = typer.Option(None, "--dataset", help="Datasets to include (default: all)."),
+    models: Optional[list[str]] = typer.Option(None, "--model", help="Models to include (default: all)."),
+    run_ids: Optional[list[str]] = typer.Option(None, "--run-id", help="Runs to include (default: latest per partition)."),
+    output_dir: Optional[Path] = typer.Option(None, help="Where to write the report (default: reports/<timestamp>)."),
+) -> None:
+    """Write a Markdown/LaTeX report with charts from the results store."""
+    from evaluation.report import generate_report
+
+    if output_dir is None:
+        output_dir = REPORTS_DIR / f"{datetime.now():%Y%m%dT%H%M%S}"
+
+    path = generate_report(
+        output_dir,
+        datasets=[dataset.value for dataset in datasets] if datasets else None,
+        models=models,
+        run_ids=run_ids,
+    )
+    logger.info(f"Report written to {path}")
 
 @app.command()
 def generate_schema(dataset_name: DatasetName, task_types : list[TaskType]) -> None:
@@ -98,14 +344,17 @@ def generate_schema(dataset_name: DatasetName, task_types : list[TaskType]) -> N
         print('---------------------------------------------')     
 
 @app.command()
-def generate_thesis_plots() -> None:
+def generate_thesis_plots(
+    workers: Optional[int] = typer.Option(None, help="Render processes (default: one per CPU)."),
+    force: bool = typer.Option(False, help="Re-render plots even when their inputs are unchanged."),
+) -> None:
     """Generate all thesis plots and tables"""
     from evaluation.complete_plot import ThesisPlotter
-    from constants import RESULTS_DIR, PROJECT_ROOT
+    from constants import RESULTS_STORE_DIR, PROJECT_ROOT
     
     output_dir = PROJECT_ROOT / "plots"
-    plotter = ThesisPlotter(RESULTS_DIR, output_dir)
-    plotter.generate_all_plots()
+    plotter = ThesisPlotter(RESULTS_STORE_DIR, output_dir)
+    plotter.generate_all_plots(max_workers=workers, force=force)
 
 if __name__ == "__main__":
     app()
\ No newline at end of file
@@ -1,12 +1,13 @@
 import sqlglot
 
-from sqlglot import parse_one, ParseError, exp
+from sqlglot import parse_one, ParseError, TokenError, exp
+from sqlglot.optimizer.normalize_identifiers import normalize_identifiers
 from dataclasses import dataclass
 from enum import StrEnum
-from functools import reduce
+from functools import lru_cache, reduce
 from abc import ABC, abstractmethod
 from typing import Optional, List, Dict, Any, List, Set
-from antlr4 import InputStream, CommonTokenStream
+from antlr4 import InputStream, CommonTokenStream, ParseTreeWalker, Token
 from antlr4 import *
 from antlr4_cypher import CypherLexer, CypherParser, CypherParserListener
 from antlr4.tree.Tree import TerminalNodeImpl
@@ -48,6 +49,201 @@ class Task:
         return hash(self.question)
 
 
+@dataclass(slots=True, frozen=True)
+class PlanOperator:
+    """A single operator of an executed query plan (pre-order, ``depth`` from the root)."""
+    name: str
+    depth: int
+    rows: int
+    time_ms: float | None = None
+    db_hits: int | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "depth": self.depth,
+            "rows": self.rows,
+            "time_ms": self.time_ms,
+            "db_hits": self.db_hits,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PlanOperator":
+        return cls(
+            name=data["name"],
+            depth=data.get("depth", 0),
+            rows=data.get("rows", 0),
+            time_ms=data.get("time_ms"),
+            db_hits=data.get("db_hits"),
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class ExecutionProfile:
+    """
+    Wall time, row count and plan metrics of one query execution. ``cached``
+    marks a profile read from the execution cache: its wall time was measured
+    when the query first ran, not during this evaluation.
+    """
+    wall_time_ms: float
+    rows: int
+    operators: List[PlanOperator]
+    truncated: bool = False
+    cached: bool = False
+
+    @property
+    def total_db_hits(self) -> Optional[int]:
+        hits = [op.db_hits for op in self.operators if op.db_hits is not None]
+        return sum(hits) if hits else None
+
+    def to_dict(self) -> dict:
+        return {
+            "wall_time_ms": self.wall_time_ms,
+            "rows": self.rows,
+            "truncated": self.truncated,
+            "cached": self.cached,
+            "total_db_hits": self.total_db_hits,
+            "operators": [op.to_dict() for op in self.operators],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> Optional["ExecutionProfile"]:
+        if data is None:
+            return None
+        return cls(
+            wall_time_ms=data["wall_time_ms"],
+            rows=data["rows"],
+            operators=[PlanOperator.from_dict(op) for op in data.get("operators", [])],
+            truncated=data.get("truncated", False),
+            cached=data.get("cached", False),
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class LLMUsage:
+    """
+    Tokens, timing and estimated cost of the LLM call that produced a response.
+
+    ``estimated`` marks a stream stopped before the provider sent its usage
+    block: the token counts are litellm's count of the received text and
+    ``cached_tokens`` is unknown (always 0).
+    """
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    cached_tokens: int = 0
+    cache_creation_tokens: int = 0
+    time_to_first_token_ms: Optional[float] = None
+    latency_ms: Optional[float] = None
+    cost_usd: Optional[float] = None
+    estimated: bool = False
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        if not self.latency_ms:
+            return None
+        return self.completion_tokens / (self.latency_ms / 1000)
+
+    def to_dict(self) -> dict:
+        return {
+            "model": self.model,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cache_creation_tokens": self.cache_creation_tokens,
+            "time_to_first_token_ms": self.time_to_first_token_ms,
+            "latency_ms": self.latency_ms,
+            "cost_usd": self.cost_usd,
+            "estimated": self.estimated,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> Optional["LLMUsage"]:
+        if data is None:
+            return None
+        return cls(
+            model=data["model"],
+            prompt_tokens=data["prompt_tokens"],
+            completion_tokens=data["completion_tokens"],
+            cached_tokens=data.get("cached_tokens", 0),
+            cache_creation_tokens=data.get("cache_creation_tokens", 0),
+            time_to_first_token_ms=data.get("time_to_first_token_ms"),
+            latency_ms=data.get("latency_ms"),
+            cost_usd=data.get("cost_usd"),
+            estimated=data.get("estimated", False),
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class SampleVotes:
+    """How the samples of a self-consistent generation voted, by result digest."""
+    samples: int
+    candidates: int
+    votes: Dict[str, int]
+    failed: int
+    winner: Optional[str]
+
+    def to_dict(self) -> dict:
+        return {
+            "samples": self.samples,
+            "candidates": self.candidates,
+            "votes": self.votes,
+            "failed": self.failed,
+            "winner": self.winner,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> Optional["SampleVotes"]:
+        if data is None:
+            return None
+        return cls(
+            samples=data["samples"],
+            candidates=data["candidates"],
+            votes=data["votes"],
+            failed=data["failed"],
+            winner=data.get("winner"),
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class ScoringProvenance:
+    """Hashes of everything a TaskResult was scored from, so re-scoring can skip unchanged parts."""
+    generated_hash: str
+    expected_hash: str
+    db_fingerprint: str | None
+    static_version: int
+    execution_version: int
+
+    @property
+    def static_key(self) -> tuple:
+        return (self.generated_hash, self.expected_hash, self.static_version)
+
+    @property
+    def execution_key(self) -> tuple:
+        return (self.generated_hash, self.expected_hash, self.db_fingerprint, self.execution_version)
+
+    def to_dict(self) -> dict:
+        return {
+            "generated_hash": self.generated_hash,
+            "expected_hash": self.expected_hash,
+            "db_fingerprint": self.db_fingerprint,
+            "static_version": self.static_version,
+            "execution_version": self.execution_version,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> Optional["ScoringProvenance"]:
+        if data is None:
+            return None
+        return cls(
+            generated_hash=data["generated_hash"],
+            expected_hash=data["expected_hash"],
+            db_fingerprint=data.get("db_fingerprint"),
+            static_version=data["static_version"],
+            execution_version=data["execution_version"],
+        )
+
+
 @dataclass(slots=True, frozen=True)
 class TaskResult:
     task: Task
@@ -67,6 +263,12 @@ class TaskResult:
     error_category: str
     error_flags: List[str]
     task_type: "TaskType"
+    generated_execution: Optional[ExecutionProfile] = None
+    expected_execution: Optional[ExecutionProfile] = None
+    provenance: Optional[ScoringProvenance] = None
+    canonical_match: bool = False
+    llm_usage: Optional[LLMUsage] = None
+    votes: Optional[SampleVotes] = None
 
     def to_dict(self) -> dict:
         return {
@@ -89,6 +291,16 @@ class TaskResult:
             "result_recall": self.result_recall,
             "error_category": self.error_category,
             "error_flags": self.error_flags,
+            "generated_execution": (
+                self.generated_execution.to_dict() if self.generated_execution else None
+            ),
+            "expected_execution": (
+                self.expected_execution.to_dict() if self.expected_execution else None
+            ),
+            "provenance": self.provenance.to_dict() if self.provenance else None,
+            "canonical_match": self.canonical_match,
+            "llm_usage": self.llm_usage.to_dict() if self.llm_usage else None,
+            "votes": self.votes.to_dict() if self.votes else None,
         }
     
     @classmethod
@@ -119,7 +331,13 @@ class TaskResult:
             result_recall=data.get("result_recall", 0.0),
             error_category=data.get("error_category", "UNKNOWN"),
             error_flags=data.get("error_flags", []),
-            task_type=task_type
+            task_type=task_type,
+            generated_execution=ExecutionProfile.from_dict(data.get("generated_execution")),
+            expected_execution=ExecutionProfile.from_dict(data.get("expected_execution")),
+            provenance=ScoringProvenance.from_dict(data.get("provenance")),
+            canonical_match=data.get("canonical_match", False),
+            llm_usage=LLMUsage.from_dict(data.get("llm_usage")),
+            votes=SampleVotes.from_dict(data.get("votes")),
         )
 
 
@@ -195,6 +413,14 @@ class QueryAnalyzer(ABC):
         """Extract orderings from the query."""
         pass
 
+    @abstractmethod
+    def get_canonical_form(self, query: str) -> Optional[str]:
+        """
+        Normalized text of the query such that two queries with the same form
+        return the same rows. None if the query cannot be canonicalized.
+        """
+        pass
+
 class SQLQueryAnalyzer(QueryAnalyzer):
     """SQL query analyzer implementation."""
 
@@ -204,7 +430,7 @@ class SQLQueryAnalyzer(QueryAnalyzer):
     def _parse(self, query: str) -> Optional[exp.Expression]:
             try:
                 return parse_one(query, dialect=self.dialect)
-            except ParseError:
+            except (ParseError, TokenError):
                 return None
     
     def is_valid(self, query: str) -> bool:
@@ -276,6 +502,64 @@ class SQLQueryAnalyzer(QueryAnalyzer):
             for e in order.expressions
         ]
     
+    def get_canonical_form(self, query: str) -> Optional[str]:
+        """
+        Dialect SQL of the normalized AST: identifiers lower-cased, column aliases of
+        the outer SELECT dropped (ORDER BY references are substituted) and table
+        aliases resolved to table names when every table appears only once.
+        """
+        try:
+            parsed = self._parse(query)
+            if parsed is None:
+                return None
+            tree = normalize_identifiers(parsed.copy(), dialect=self.dialect)
+            if isinstance(tree, exp.Select):
+                self._strip_column_aliases(tree)
+            self._resolve_table_aliases(tree)
+            return tree.sql(dialect=self.dialect, normalize=True)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _strip_column_aliases(select: exp.Select) -> None:
+        aliases = {
+            projection.alias: projection
+            for projection in select.expressions
+            if isinstance(projection, exp.Alias)
+        }
+        order = select.args.get("order")
+
+        # An alias referenced outside ORDER BY may shadow a column, so keep it.
+        for column in select.find_all(exp.Column):
+            if column.table or column.name not in aliases:
+                continue
+            if order is None or column.find_ancestor(exp.Order) is not order:
+                aliases.pop(column.name)
+
+        if order is not None:
+            for column in list(order.find_all(exp.Column)):
+                if not column.table and column.name in aliases:
+                    column.replace(aliases[column.name].this.copy())
+        for alias in aliases.values():
+            alias.replace(alias.this)
+
+    @staticmethod
+    def _resolve_table_aliases(tree: exp.Expression) -> None:
+        tables = list(tree.find_all(exp.Table))
+        names = [table.name for table in tables]
+        if len(names) != len(set(names)):
+            return
+
+        mapping = {table.alias: table.name for table in tables if table.alias}
+        if not mapping:
+            return
+
+        for column in tree.find_all(exp.Column):
+            if column.table in mapping:
+                column.set("table", exp.to_identifier(mapping[column.table]))
+        for table in tables:
+            table.set("alias", None)
+
     def get_return_columns(self, query: str) -> List[str]:
         """Get only SELECT columns"""
         try:
@@ -569,16 +853,28 @@ class SimpleCypherExtractor(CypherParserListener):
 class CypherQueryAnalyzer(QueryAnalyzer):
     """Cypher query analyzer using ANTLR4 listener pattern."""
 
+    # Parsed queries kept per analyzer; one analyzer is shared by every evaluation thread.
+    PARSE_CACHE_SIZE = 4096
+
+    # Keyword tokens lower-cased by ``get_canonical_form``.
+    KEYWORDS = frozenset(
+        getattr(CypherLexer, name) for name in (
+            "CALL", "YIELD", "FILTER", "EXTRACT", "COUNT", "ANY", "NONE", "SINGLE", "ALL",
+            "ASC", "ASCENDING", "BY", "CREATE", "DELETE", "DESC", "DESCENDING", "DETACH",
+            "EXISTS", "LIMIT", "MATCH", "MERGE", "ON", "OPTIONAL", "ORDER", "REMOVE", "RETURN",
+            "SET", "SKIP_W", "WHERE", "WITH", "UNION", "UNWIND", "AND", "AS", "CONTAINS",
+            "DISTINCT", "ENDS", "IN", "IS", "NOT", "OR", "STARTS", "XOR", "FALSE", "TRUE",
+            "NULL_W", "CONSTRAINT", "DO", "FOR", "REQUIRE", "UNIQUE", "CASE", "WHEN", "THEN",
+            "ELSE", "END", "MANDATORY", "SCALAR", "OF", "ADD", "DROP",
+        )
+    )
+
     def __init__(self, debug=False):
         self.debug = debug
-        self._cache = {}
+        self._parse_and_extract = lru_cache(maxsize=self.PARSE_CACHE_SIZE)(self._parse)
     
-    def _parse_and_extract(self, query: str) -> Optional[Dict[str, Any]]:
-        """Parse query and extract metadata (with caching)."""
-        
-        if query in self._cache:
-            return self._cache[query]
-        
+    def _parse(self, query: str) -> Optional[Dict[str, Any]]:
+        """Parse query and extract metadata (cached through ``_parse_and_extract``)."""
         try:
             lexer = CypherLexer(InputStream(query))
             parser = CypherParser(CommonTokenStream(lexer))
@@ -598,13 +894,11 @@ class CypherQueryAnalyzer(QueryAnalyzer):
                 'return_columns': extractor.return_columns
             }
             
-            self._cache[query] = result
             return result
             
         except Exception as e:
             if self.debug:
                 print(f"Parse error: {e}")
-            self._cache[query] = None  
             return None
 
     def is_valid(self, query: str) -> bool:
@@ -713,6 +1007,118 @@ class CypherQueryAnalyzer(QueryAnalyzer):
             return []
         return result['orderings']
 
+    def get_canonical_form(self, query: str) -> Optional[str]:
+        """
+        Normalized token stream: whitespace and comments dropped, keywords and
+        function names lower-cased, variables and AS aliases renamed to v0..vn in
+        order of appearance. Labels, relationship types, properties, map keys and
+        parameters are kept as written.
+        """
+        if not self.is_valid(query):
+            return None
+
+        lexer = CypherLexer(InputStream(query))
+        lexer.removeErrorListeners()
+        tokens = [
+            token for token in lexer.getAllTokens()
+            if token.channel == Token.DEFAULT_CHANNEL
+            and token.type not in (CypherLexer.SP, CypherLexer.WHITESPACE, CypherLexer.Comment)
+        ]
+        while tokens and tokens[-1].type == CypherLexer.SEMI:
+            tokens.pop()
+        tokens = self._drop_return_aliases(tokens)
+
+        def token_type(index: int) -> Optional[int]:
+            return tokens[index].type if 0 <= index < len(tokens) else None
+
+        variables: Dict[str, str] = {}
+        labels: Set[int] = set()
+        namespace: Set[int] = set()
+        brace_depth = 0
+        canonical = []
+
+        for i, token in enumerate(tokens):
+            text = token.text
+            if token.type == CypherLexer.LBRACE:
+                brace_depth += 1
+            elif token.type == CypherLexer.RBRACE:
+                brace_depth -= 1
+            elif token.type in self.KEYWORDS:
+                text = text.lower()
+            elif token.type == CypherLexer.ID and i not in namespace:
+                previous = token_type(i - 1)
+                is_map_key = (
+                    brace_depth > 0
+                    and token_type(i + 1) == CypherLexer.COLON
+                    and previous in (CypherLexer.LBRACE, CypherLexer.COMMA)
+                )
+                is_map_value = (
+                    brace_depth > 0
+                    and previous == CypherLexer.COLON
+                    and token_type(i - 3) in (CypherLexer.LBRACE, CypherLexer.COMMA)
+                )
+                is_label = (previous == CypherLexer.COLON and not is_map_value) or (
+                    previous == CypherLexer.STICK and (i - 2) in labels
+                )
+
+                # Namespaced functions and procedures: ns.name(...)
+                end = i
+                while token_type(end + 1) == CypherLexer.DOT and token_type(end + 2) == CypherLexer.ID:
+                    end += 2
+                is_namespaced = end > i and token_type(end + 1) == CypherLexer.LPAREN
+
+                if is_label:
+                    labels.add(i)
+                elif is_namespaced:
+                    namespace.update(range(i, end + 1))
+                elif token_type(i + 1) == CypherLexer.LPAREN and previous != CypherLexer.DOT:
+                    text = text.lower()
+                elif previous not in (CypherLexer.DOT, CypherLexer.DOLLAR) and not is_map_key:
+                    text = variables.setdefault(text, f"v{len(variables)}")
+            canonical.append(text)
+
+        return " ".join(canonical)
+
+    @staticmethod
+    def _drop_return_aliases(tokens: list) -> list:
+        """
+        Remove ``AS alias`` from the final RETURN, where aliases only name result
+        columns, unless ORDER BY refers to them. UNION queries are left alone since
+        their column names must match.
+        """
+        if any(token.type == CypherLexer.UNION for token in tokens):
+            return tokens
+
+        depth = 0
+        last_return = None
+        for i, token in enumerate(tokens):
+            if token.type == CypherLexer.LBRACE:
+                depth += 1
+            elif token.type == CypherLexer.RBRACE:
+                depth -= 1
+            elif token.type == CypherLexer.RETURN and depth == 0:
+                last_return = i
+        if last_return is None:
+            return tokens
+
+        tail = tokens[last_return:]
+        drop = set()
+        for j, token in enumerate(tail[:-1]):
+            alias = tail[j + 1]
+            if token.type != CypherLexer.AS or alias.type != CypherLexer.ID:
+                continue
+            # A property with the alias' name (``d.name AS name``) is not a use of it.
+            referenced = any(
+                other.type == CypherLexer.ID
+                and other.text == alias.text
+                and not (k > 0 and tail[k - 1].type == CypherLexer.DOT)
+                for k, other in enumerate(tail) if k != j + 1
+            )
+            if not referenced:
+                drop.update((j, j + 1))
+
+        return tokens[:last_return] + [token for j, token in enumerate(tail) if j not in drop]
+
     def analyze(self, query: str) -> Dict[str, Any]:
         """Get all metadata in a single call."""
         result = self._parse_and_extract(query)
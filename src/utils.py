@@ -1,8 +1,10 @@
 import json
 import os
+from datetime import datetime
 from pathlib import Path
 from typing import Any, Tuple
 from constants import RESULTS_DIR
+from evaluation.results_store import write_results
 from models import Task, TaskDifficulty, TaskResult, TaskType
 
 
@@ -10,6 +12,11 @@ def get_tasks_from_json(path: Path) -> list[Task]:
     return [Task.from_dict(line) for line in json.load(open(path, "r"))]
 
 
+def get_result_dir(dataset_name: str, task_type: TaskType, model_name: str) -> Path:
+    model_name_slug = model_name.replace("/", "_")
+    return RESULTS_DIR / dataset_name / task_type.value.lower() / model_name_slug
+
+
 def save_task_results(
     task_results: list[TaskResult],
     dataset_name: str,
@@ -19,13 +26,10 @@ def save_task_results(
 ) -> None:
     result_dicts = [task_result.to_dict() for task_result in task_results]
 
-    model_name_slug = model_name.replace("/", "_")
-    result_dir = (
-        RESULTS_DIR
-        / dataset_name
-        / task_type.value.lower()
-        / model_name_slug
-    )
+    run_id = datetime.now().strftime("%Y%m%dT%H%M%S")
+    write_results(result_dicts, dataset_name, task_type, model_name, task_difficulty, run_id)
+
+    result_dir = get_result_dir(dataset_name, task_type, model_name)
     result_dir.mkdir(parents=True, exist_ok=True)
 
     file_path = result_dir / f"{task_difficulty.value}.json"
@@ -38,7 +42,3 @@ def save_task_results(
 
     except Exception as e:
         print(f"Error saving results: {e}")
-
-
-
-
@@ -1,25 +1,160 @@
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from datetime import datetime
 from pathlib import Path
+from threading import BoundedSemaphore
+from time import perf_counter
 from typing import Optional
 
 from tqdm import tqdm
 
-from constants import get_duckdb_path
+from constants import VALIDATION_DIR, get_duckdb_path
+from database.constants import DUCKDB_MAX_CONCURRENCY, NEO4J_MAX_CONCURRENCY
 from database.neo4j import query_neo4j
-from database.duckdb import query_duckdb
+from database.duckdb import get_thread_connection, thread_connections
+from evaluation.tracing import percentile
 from models import DatasetName, Task, TaskType
 
+BACKEND_CONCURRENCY = {
+    TaskType.SQL: DUCKDB_MAX_CONCURRENCY,
+    TaskType.CYPHER: NEO4J_MAX_CONCURRENCY,
+}
+
+# A gold query regressed if it got this much slower than in the previous
+# validation run, and by at least REGRESSION_MIN_MS (to ignore timer noise).
+REGRESSION_FACTOR = 1.5
+REGRESSION_MIN_MS = 50.0
+
+
+def _query_duckdb(query: str, db_path: Path) -> list:
+    return get_thread_connection(db_path).execute(query).fetchall()
+
+
+def _query_neo4j(query: str, db_path: Path) -> list:
+    return query_neo4j(query)
+
+
 QUERY_DB_BY_TASK_TYPE = {
-    TaskType.SQL: query_duckdb,
-    TaskType.CYPHER: query_neo4j,
+    TaskType.SQL: _query_duckdb,
+    TaskType.CYPHER: _query_neo4j,
 }
 
 
+@dataclass(slots=True)
+class QueryTiming:
+    question: str
+    task_type: str
+    query: str
+    elapsed_ms: float
+    rows: int
+    error: str | None
+
+
+def _run_gold_query(
+    task: Task, task_type: TaskType, db_path: Path, limit: BoundedSemaphore
+) -> QueryTiming:
+    query = task.sql if task_type == TaskType.SQL else task.cypher
+    rows = 0
+    error = None
+
+    with limit:
+        start = perf_counter()
+        try:
+            rows = len(QUERY_DB_BY_TASK_TYPE[task_type](query, db_path))
+            if not rows:
+                error = "Empty result"
+        except Exception as e:
+            error = str(e)
+        elapsed_ms = (perf_counter() - start) * 1000
+
+    return QueryTiming(task.question, task_type.value, query, elapsed_ms, rows, error)
+
+
+def _latency_summary(timings: list[QueryTiming], top_n: int) -> dict:
+    """Latency percentiles of successful gold queries, the top-N slowest and all above p95."""
+    ok = sorted((t for t in timings if t.error is None), key=lambda t: t.elapsed_ms)
+    if not ok:
+        return {"count": 0}
+
+    values = [t.elapsed_ms for t in ok]
+    p95 = percentile(values, 95)
+    return {
+        "count": len(ok),
+        "total_ms": sum(values),
+        "p50_ms": percentile(values, 50),
+        "p95_ms": p95,
+        "max_ms": values[-1],
+        "slowest": [
+            {"question": t.question, "elapsed_ms": t.elapsed_ms, "rows": t.rows}
+            for t in reversed(ok[-top_n:])
+        ],
+        "above_p95": [t.question for t in ok if t.elapsed_ms > p95],
+    }
+
+
+def _compare_with_previous(timings: list[QueryTiming], previous: dict) -> dict:
+    """Gold queries that became slower, changed row counts or started failing since ``previous``."""
+    before = {(q["task_type"], q["question"]): q for q in previous.get("queries", [])}
+    regressions, row_changes, new_failures = [], [], []
+
+    for timing in timings:
+        old = before.get((timing.task_type, timing.question))
+        if old is None:
+            continue
+        if timing.error is not None:
+            if old["error"] is None:
+                new_failures.append({"question": timing.question, "task_type": timing.task_type, "error": timing.error})
+            continue
+        if old["error"] is not None:
+            continue
+
+        if (
+            timing.elapsed_ms > old["elapsed_ms"] * REGRESSION_FACTOR
+            and timing.elapsed_ms - old["elapsed_ms"] >= REGRESSION_MIN_MS
+        ):
+            regressions.append(
+                {
+                    "question": timing.question,
+                    "task_type": timing.task_type,
+                    "previous_ms": old["elapsed_ms"],
+                    "elapsed_ms": timing.elapsed_ms,
+                    "ratio": timing.elapsed_ms / max(old["elapsed_ms"], 1e-9),
+                }
+            )
+        if timing.rows != old["rows"]:
+            row_changes.append(
+                {
+                    "question": timing.question,
+                    "task_type": timing.task_type,
+                    "previous_rows": old["rows"],
+                    "rows": timing.rows,
+                }
+            )
+
+    regressions.sort(key=lambda r: -r["ratio"])
+    return {
+        "previous_run_id": previous.get("run_id"),
+        "regressions": regressions,
+        "row_changes": row_changes,
+        "new_failures": new_failures,
+    }
+
+
 def validate(
     tasks_path: Path,
     database_name: DatasetName,
     task_types: Optional[list[TaskType]] = None,
-) -> None:
+    top_n: int = 10,
+) -> Path:
+    """
+    Run every gold query of a task file on a worker pool and write a latency report.
+
+    Both backends run concurrently, each capped by its own semaphore. The
+    report in ``validation/<dataset>/<tasks>.json`` holds the latency and row
+    count of every gold query, the slowest ones, and the differences from the
+    previous report for the same task file.
+    """
 
     if task_types is None:
         task_types = [TaskType.SQL, TaskType.CYPHER]
@@ -28,39 +163,89 @@ def validate(
         tasks = [Task.from_dict(task) for task in json.load(f)]
 
     db_path = get_duckdb_path(database_name)
-    valid_tasks: set[Task] = set()
-    invalid_tasks: dict[Task, dict[TaskType, str]] = {}
+    limits = {task_type: BoundedSemaphore(BACKEND_CONCURRENCY[task_type]) for task_type in task_types}
+    max_workers = sum(BACKEND_CONCURRENCY[task_type] for task_type in task_types)
+
+    timings: list[QueryTiming] = []
+    with thread_connections(), ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(_run_gold_query, task, task_type, db_path, limits[task_type])
+            for task in tasks
+            for task_type in task_types
+        ]
+        for future in tqdm(
+            as_completed(futures), total=len(futures), desc=f"Validating {tasks_path.stem}", unit="query"
+        ):
+            timings.append(future.result())
 
-    for task in tqdm(tasks, desc=f"Validating {tasks_path.stem}", unit="task"):
-        errors: dict[TaskType, str] = {}
+    order = {(task.question, task_type.value): i for i, task in enumerate(tasks) for task_type in task_types}
+    timings.sort(key=lambda t: order[(t.question, t.task_type)])
 
-        for task_type in task_types:
-            query = task.sql if task_type == TaskType.SQL else task.cypher
-            query_fn = QUERY_DB_BY_TASK_TYPE[task_type]
+    invalid_tasks: dict[str, list[QueryTiming]] = {}
+    for timing in timings:
+        if timing.error is not None:
+            invalid_tasks.setdefault(timing.question, []).append(timing)
 
-            try:
-                args = (query, db_path) if task_type == TaskType.SQL else (query,)
-                result = query_fn(*args)
-                if not result:
-                    errors[task_type] = "Empty result"
-            except Exception as e:
-                errors[task_type] = str(e)
+    report_path = VALIDATION_DIR / database_name / f"{tasks_path.stem}.json"
+    previous = {}
+    if report_path.exists():
+        with open(report_path, "r") as f:
+            previous = json.load(f)
 
-        if not errors:
-            valid_tasks.add(task)
-        else:
-            invalid_tasks[task] = errors
+    report = {
+        "run_id": datetime.now().strftime("%Y%m%dT%H%M%S"),
+        "tasks_path": str(tasks_path),
+        "dataset": str(database_name),
+        "total": len(tasks),
+        "valid": len(tasks) - len(invalid_tasks),
+        "invalid": len(invalid_tasks),
+        "latency": {
+            task_type.value: _latency_summary(
+                [t for t in timings if t.task_type == task_type.value], top_n
+            )
+            for task_type in task_types
+        },
+        "comparison": _compare_with_previous(timings, previous) if previous else None,
+        "queries": [asdict(t) for t in timings],
+    }
+
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
 
     print()
     print(f"Path: {tasks_path}")
-    print(f"Total: {len(tasks)} | Valid: {len(valid_tasks)} | Invalid: {len(invalid_tasks)}")
+    print(f"Total: {len(tasks)} | Valid: {report['valid']} | Invalid: {report['invalid']}")
     print(f"Validated: {', '.join(t.value for t in task_types)}")
+    for task_type, latency in report["latency"].items():
+        if latency["count"]:
+            print(
+                f"[{task_type}] p50: {latency['p50_ms']:.1f}ms | p95: {latency['p95_ms']:.1f}ms | "
+                f"max: {latency['max_ms']:.1f}ms"
+            )
     print()
 
-    for task, errors in invalid_tasks.items():
-        print(f"❌ {task.question}")
-        for task_type, error in errors.items():
-            query = task.sql if task_type == TaskType.SQL else task.cypher
-            print(f"   [{task_type.value}] {error}")
-            print(f"   Query: {query}")
-        print()
\ No newline at end of file
+    for question, failures in invalid_tasks.items():
+        print(f"❌ {question}")
+        for timing in failures:
+            print(f"   [{timing.task_type}] {timing.error}")
+            print(f"   Query: {timing.query}")
+        print()
+
+    comparison = report["comparison"]
+    if comparison:
+        for regression in comparison["regressions"]:
+            print(
+                f"🐢 [{regression['task_type']}] {regression['question']}: "
+                f"{regression['previous_ms']:.1f}ms -> {regression['elapsed_ms']:.1f}ms"
+            )
+        for change in comparison["row_changes"]:
+            print(
+                f"⚠️  [{change['task_type']}] {change['question']}: "
+                f"{change['previous_rows']} -> {change['rows']} rows"
+            )
+        for failure in comparison["new_failures"]:
+            print(f"❌ [{failure['task_type']}] newly failing: {failure['question']}")
+
+    print(f"Report: {report_path}")
+    return report_path
@@ -0,0 +1,30 @@
+import pytest
+
+from models import Task, TaskResult, TaskType
+
+
+def make_result(question: str, task_type: TaskType = TaskType.SQL, response: str = "SELECT 1") -> TaskResult:
+    return TaskResult(
+        task=Task(question=question, sql="SELECT 1", cypher="RETURN 1", cypher_result=None),
+        response=response,
+        parse_success=True,
+        execution_success=True,
+        entity_f1=1.0,
+        attribute_f1=1.0,
+        relation_f1=None,
+        filter_f1=1.0,
+        aggregation_f1=1.0,
+        return_column_f1=1.0,
+        execution_accuracy=True,
+        result_f1=1.0,
+        result_precision=1.0,
+        result_recall=1.0,
+        error_category="NONE",
+        error_flags=[],
+        task_type=task_type,
+    )
+
+
+@pytest.fixture
+def result_factory():
+    return make_result
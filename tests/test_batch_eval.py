@@ -0,0 +1,115 @@
+import json
+import threading
+
+import httpx
+import pytest
+
+import evaluation.batch_eval as batch_eval
+import evaluation.checkpoint as checkpoint
+from conftest import make_result
+from evaluation.batch_server import BatchServer
+from evaluation.checkpoint import read_jsonl
+from models import TaskDifficulty, TaskType
+
+
+@pytest.fixture
+def server():
+    server = BatchServer(("127.0.0.1", 0), responder=lambda body: f"```sql\nSELECT '{body['model']}';\n```")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    tasks_dir = tmp_path / "tasks"
+    tasks_dir.mkdir()
+    for difficulty, questions in ((TaskDifficulty.EASY, ["q1", "q2"]), (TaskDifficulty.INTERMEDIATE, ["q3"])):
+        tasks = [{"question": q, "sql": "SELECT 1", "cypher": "RETURN 1"} for q in questions]
+        (tasks_dir / f"{difficulty.value}.json").write_text(json.dumps(tasks))
+
+    result_dir = tmp_path / "results"
+    result_dir.mkdir()
+    published = []
+    monkeypatch.setattr(batch_eval, "load_schema", lambda task_type, dataset_name: "CREATE TABLE t (a INT);")
+    monkeypatch.setattr(batch_eval, "db_path_resolver", {TaskType.SQL: lambda dataset_name: "db"})
+    monkeypatch.setattr(batch_eval, "get_tasks_directory", lambda dataset_name: tasks_dir)
+    monkeypatch.setattr(batch_eval, "get_result_dir", lambda *args: result_dir)
+    monkeypatch.setattr(checkpoint, "get_result_dir", lambda *args: result_dir)
+    monkeypatch.setattr(
+        batch_eval,
+        "get_task_result",
+        lambda task, query, task_type, db_path: make_result(task.question, response=query),
+    )
+    monkeypatch.setattr(batch_eval, "publish_results", lambda writer, *args: published.append(writer.path))
+    return result_dir, published
+
+
+def test_evaluate_remote_batch_against_stand_in(server, workspace):
+    result_dir, published = workspace
+    batch_eval.evaluate_remote_batch(
+        "gpt-test", "rel-f1", TaskType.SQL, api_key="test", api_base=server.api_base, poll_interval=0.01
+    )
+
+    responses = {
+        result["question"]: result["generated_script"]
+        for path in published
+        for result in read_jsonl(path)
+    }
+    assert responses == {"q1": "SELECT 'gpt-test';", "q2": "SELECT 'gpt-test';", "q3": "SELECT 'gpt-test';"}
+    assert [batch["status"] for batch in server.batches.values()] == ["completed"]
+    assert not (result_dir / "batch.json").exists()
+
+
+def test_concurrent_polls_complete_once(server):
+    file = server.add_file(b'{"custom_id": "a", "body": {"model": "m"}}\n', "in.jsonl", "batch")
+    batch = server.create_batch({"endpoint": "/v1/chat/completions", "input_file_id": file["id"]})
+
+    threads = [threading.Thread(target=server.get_batch, args=(batch["id"],)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    outputs = [f for f, _ in server.files.values() if f["purpose"] == "batch_output"]
+    assert len(outputs) == 1
+    assert server.batches[batch["id"]]["output_file_id"] == outputs[0]["id"]
+
+
+def test_provider_follows_the_model():
+    assert batch_eval.get_provider("claude-sonnet-4-20250514") == "anthropic"
+    assert batch_eval.get_provider("gpt-4o") == "openai"
+
+
+def test_anthropic_submission(tmp_path, monkeypatch):
+    request = batch_eval.build_batch_requests(
+        {TaskDifficulty.EASY: [(3, make_result("q").task)]}, lambda task: "schema", "anthropic/claude-test"
+    )[0]
+    input_path = tmp_path / "batch_input.jsonl"
+    input_path.write_text(json.dumps(request) + "\n")
+    posted = {}
+
+    def post(url, headers, json, timeout):
+        posted.update(url=url, headers=headers, json=json)
+        return httpx.Response(200, json={"id": "msgbatch_1"}, request=httpx.Request("POST", url))
+
+    monkeypatch.setattr(batch_eval.httpx, "post", post)
+    assert batch_eval.BatchClient("anthropic", "key").submit(input_path) == "msgbatch_1"
+
+    assert posted["url"] == "https://api.anthropic.com/v1/messages/batches"
+    assert posted["headers"]["x-api-key"] == "key"
+    assert posted["json"] == {
+        "requests": [
+            {
+                "custom_id": "easy-3",
+                "params": {
+                    "model": "claude-test",
+                    "max_tokens": batch_eval.ANTHROPIC_MAX_TOKENS,
+                    "system": "schema",
+                    "messages": [{"role": "user", "content": request["body"]["messages"][1]["content"]}],
+                },
+            }
+        ]
+    }
@@ -0,0 +1,37 @@
+import pytest
+
+from models import CypherQueryAnalyzer
+
+cypher = CypherQueryAnalyzer()
+
+
+@pytest.mark.parametrize("left, right", [
+    ("MATCH (d:drivers) RETURN d.name AS name", "MATCH (x:drivers) RETURN x.name"),
+    ("MATCH (d:drivers) RETURN count(d) AS total", "match (n:drivers)  return COUNT(n);"),
+    ("MATCH (d:drivers) // all drivers\nRETURN d.forename AS forename", "MATCH (a:drivers) RETURN a.forename AS f"),
+])
+def test_equivalent_cypher_queries_share_canonical_form(left, right):
+    assert cypher.get_canonical_form(left) == cypher.get_canonical_form(right)
+
+
+@pytest.mark.parametrize("left, right", [
+    ("MATCH (d:drivers) RETURN d.name AS name ORDER BY name", "MATCH (d:drivers) RETURN d.name"),
+    ("MATCH (d:drivers) RETURN d.name", "MATCH (d:races) RETURN d.name"),
+])
+def test_different_cypher_queries_keep_distinct_forms(left, right):
+    assert cypher.get_canonical_form(left) != cypher.get_canonical_form(right)
+
+
+def test_parse_cache_is_bounded():
+    analyzer = CypherQueryAnalyzer()
+    analyzer.get_entities("MATCH (d:drivers) RETURN d.name")
+    analyzer.get_attributes("MATCH (d:drivers) RETURN d.name")
+    info = analyzer._parse_and_extract.cache_info()
+    assert (info.hits, info.misses, info.maxsize) == (1, 1, CypherQueryAnalyzer.PARSE_CACHE_SIZE)
+
+
+def test_keywords_are_the_lexer_keyword_tokens():
+    from antlr4_cypher import CypherLexer
+
+    keywords = {token for token, literal in enumerate(CypherLexer.literalNames) if literal.strip("'").isalpha()}
+    assert CypherQueryAnalyzer.KEYWORDS == keywords
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+import evaluation.checkpoint as checkpoint
+from evaluation.checkpoint import export_json, open_result_writer, read_jsonl
+from models import TaskDifficulty, TaskType
+
+
+@pytest.fixture
+def result_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint, "get_result_dir", lambda *args: tmp_path)
+    return tmp_path
+
+
+def open_writer(prompt_hash="abc", resume=True, model="model"):
+    return open_result_writer("rel-f1", TaskType.SQL, TaskDifficulty.EASY, model, prompt_hash, 3, resume)
+
+
+def test_resume_skips_completed_and_drops_torn_line(result_dir, result_factory):
+    writer, completed = open_writer()
+    assert completed == set()
+    with writer:
+        writer.write(result_factory("q1"))
+        writer.write(result_factory("q2"))
+
+    with open(result_dir / "easy.jsonl", "a") as f:
+        f.write('{"question": "q3", "generat')
+
+    writer, completed = open_writer()
+    assert completed == {"q1", "q2"}
+    assert writer.manifest.completed == 2
+    with writer:
+        writer.write(result_factory("q3"))
+
+    assert [record["question"] for record in read_jsonl(writer.path)] == ["q1", "q2", "q3"]
+    manifest = json.loads((result_dir / "easy.manifest.json").read_text())
+    assert manifest["completed"] == 3
+    assert manifest["status"] == "complete"
+
+
+@pytest.mark.parametrize("changed", [{"prompt_hash": "other"}, {"model": "other"}, {"resume": False}])
+def test_resume_starts_over_when_run_differs(result_dir, result_factory, changed):
+    writer, _ = open_writer()
+    with writer:
+        writer.write(result_factory("q1"))
+
+    writer, completed = open_writer(**changed)
+    writer.close()
+    assert completed == set()
+    assert list(read_jsonl(writer.path)) == []
+
+
+def test_interrupted_writer_is_marked(result_dir, result_factory):
+    writer, _ = open_writer()
+    with pytest.raises(RuntimeError):
+        with writer:
+            writer.write(result_factory("q1"))
+            raise RuntimeError("crash")
+
+    manifest = json.loads((result_dir / "easy.manifest.json").read_text())
+    assert manifest["status"] == "interrupted"
+    writer, completed = open_writer()
+    writer.close()
+    assert completed == {"q1"}
+
+
+def test_export_json_matches_records(result_dir, result_factory):
+    writer, _ = open_writer()
+    with writer:
+        writer.write(result_factory("q1"))
+        writer.write(result_factory("q2"))
+
+    export_json(writer.path, result_dir / "easy.json")
+    assert json.loads((result_dir / "easy.json").read_text()) == list(read_jsonl(writer.path))
@@ -0,0 +1,30 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import duckdb
+import pytest
+
+from database.duckdb import get_thread_connection, thread_connections
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "relbench.duckdb"
+    with duckdb.connect(str(path)) as conn:
+        conn.execute("CREATE TABLE t AS SELECT 1 AS a")
+    return path
+
+
+def test_pool_connections_are_closed_on_exit(db_path):
+    with thread_connections(), ThreadPoolExecutor(max_workers=2) as pool:
+        connections = list(pool.map(lambda _: get_thread_connection(db_path), range(4)))
+        assert all(conn.execute("SELECT a FROM t").fetchall() == [(1,)] for conn in connections)
+
+    for conn in connections:
+        with pytest.raises(duckdb.ConnectionException):
+            conn.execute("SELECT 1")
+
+    conn = get_thread_connection(db_path)
+    assert conn not in connections
+    assert conn.execute("SELECT a FROM t").fetchall() == [(1,)]
+    with thread_connections():
+        pass
@@ -0,0 +1,65 @@
+from decimal import Decimal
+
+import pytest
+
+import evaluation.scoring as scoring
+from evaluation.execution_cache import ExecutionCache, ExecutionRecord, result_digest
+from models import ExecutionProfile, TaskType
+
+
+def make_record(rows):
+    return ExecutionRecord.from_rows(rows, ExecutionProfile(wall_time_ms=12.5, rows=len(rows), operators=[]))
+
+
+def test_round_trip(tmp_path):
+    cache = ExecutionCache(tmp_path / "executions.sqlite")
+    record = make_record([(1, "a"), (2, "b")])
+    cache.put("sql", "fp", "q", record)
+
+    assert cache.get("sql", "fp", "q") == record
+    assert cache.get("sql", "other-fp", "q") is None
+    assert cache.get("cypher", "fp", "q") is None
+
+
+def test_digest_compares_values_not_reprs():
+    assert result_digest([(1, Decimal("1.5"))]) == result_digest([(1.0, Decimal("1.50"))])
+    assert result_digest([(1, 1.5)]) == result_digest([(Decimal("1"), Decimal("1.5"))])
+    assert result_digest([(True,)]) == result_digest([(1,)])
+    assert result_digest([({"b": 2, "a": 1},)]) == result_digest([({"a": 1.0, "b": 2},)])
+    assert result_digest([(1,), (2,)]) != result_digest([(2,), (1,)])
+    assert result_digest([(Decimal("0.1"),)]) != result_digest([(0.1,)])
+
+
+@pytest.fixture
+def executions(tmp_path, monkeypatch):
+    """Runs of scoring._execute against a fresh cache, counting real executions."""
+    cache = ExecutionCache(tmp_path / "executions.sqlite")
+    calls = []
+
+    def timed_query(task_type, query, db_path, max_rows, stage):
+        calls.append(query)
+        return [(1,)], 3.0
+
+    monkeypatch.setattr(scoring, "get_execution_cache", lambda: cache)
+    monkeypatch.setattr(scoring, "get_db_fingerprint", lambda task_type, db_path: "fp")
+    monkeypatch.setattr(scoring, "_timed_query", timed_query)
+    return calls
+
+
+def test_cache_hit_is_marked(executions):
+    first = scoring._execute(TaskType.SQL, "SELECT 1", "db", 10, "gold")
+    second = scoring._execute(TaskType.SQL, "SELECT 1", "db", 10, "gold")
+
+    assert executions == ["SELECT 1"]
+    assert not first.profile.cached
+    assert second.profile.cached
+    assert second.digest == first.digest
+
+
+def test_scoring_version_invalidates_entries(executions, monkeypatch):
+    scoring._execute(TaskType.SQL, "SELECT 1", "db", 10, "gold")
+    monkeypatch.setattr(scoring, "EXECUTION_SCORING_VERSION", scoring.EXECUTION_SCORING_VERSION + 1)
+    record = scoring._execute(TaskType.SQL, "SELECT 1", "db", 10, "gold")
+
+    assert executions == ["SELECT 1", "SELECT 1"]
+    assert not record.profile.cached
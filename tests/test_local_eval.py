@@ -0,0 +1,101 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+tokenizers = pytest.importorskip("tokenizers")
+
+from transformers import LlamaConfig, LlamaForCausalLM, PreTrainedTokenizerFast  # noqa: E402
+
+from evaluation.local_eval import LocalGenerator  # noqa: E402
+from evaluation.utils import build_user_prompt  # noqa: E402
+
+CHAT_TEMPLATE = (
+    "{{ bos_token }}{% for m in messages %}<|{{ m.role }}|>\n{{ m.content }}</s>\n{% endfor %}"
+    "{% if add_generation_prompt %}<|assistant|>\n{% endif %}"
+)
+SYSTEM = "You are a Text-to-SQL expert.\nSchema: drivers(id, name) results(driverId, points)\n" * 4
+QUESTIONS = [
+    "How many drivers?",
+    "List the names of drivers with more than ten points in total",
+    "Top 3",
+    "Average points per driver per race season please",
+    "x",
+]
+MAX_NEW_TOKENS = 12
+
+
+@pytest.fixture(scope="module")
+def model_dir(tmp_path_factory):
+    """A randomly initialized two-layer Llama with a byte-level tokenizer."""
+    from tokenizers import Tokenizer, decoders, models, pre_tokenizers
+
+    alphabet = pre_tokenizers.ByteLevel.alphabet()
+    vocab = {char: i for i, char in enumerate(sorted(alphabet))}
+    vocab["<s>"] = len(vocab)
+    vocab["</s>"] = len(vocab)
+    tokenizer = Tokenizer(models.BPE(vocab=vocab, merges=[]))
+    tokenizer.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tokenizer.decoder = decoders.ByteLevel()
+
+    torch.manual_seed(0)
+    # A large initializer range makes the greedy continuations vary by prompt.
+    config = LlamaConfig(
+        vocab_size=len(vocab), hidden_size=64, intermediate_size=128, num_hidden_layers=2,
+        num_attention_heads=4, num_key_value_heads=2, max_position_embeddings=1024,
+        initializer_range=0.5, bos_token_id=vocab["<s>"], eos_token_id=vocab["</s>"],
+    )
+    path = tmp_path_factory.mktemp("tiny-llama")
+    LlamaForCausalLM(config).save_pretrained(path)
+    PreTrainedTokenizerFast(tokenizer_object=tokenizer, bos_token="<s>", eos_token="</s>").save_pretrained(path)
+    return path
+
+
+def load_generator(model_dir, chat_template: str | None, cache_dir=None) -> LocalGenerator:
+    generator = LocalGenerator.load(
+        str(model_dir), "cpu", batch_size=3, max_new_tokens=MAX_NEW_TOKENS, cache_dir=cache_dir
+    )
+    generator.tokenizer.chat_template = chat_template
+    return generator
+
+
+def unbatched(generator: LocalGenerator, question: str) -> str:
+    """Plain ``generate`` on the whole prompt, without the prefix cache or padding."""
+    prefix, line_start, after = generator._split(SYSTEM)
+    ids = generator._tokenize(prefix, first=True) + generator._tokenize(line_start + build_user_prompt(question) + after)
+    output = generator.model.generate(
+        torch.tensor([ids]),
+        attention_mask=torch.ones(1, len(ids), dtype=torch.long),
+        max_new_tokens=MAX_NEW_TOKENS,
+        do_sample=False,
+        pad_token_id=generator.tokenizer.pad_token_id,
+    )
+    return generator.tokenizer.decode(output[0, len(ids):], skip_special_tokens=True)
+
+
+@pytest.mark.parametrize("chat_template", [None, CHAT_TEMPLATE])
+def test_batched_generation_matches_unbatched(model_dir, chat_template):
+    generator = load_generator(model_dir, chat_template)
+    batched = {index: text for index, text, _ in generator.generate(SYSTEM, QUESTIONS)}
+
+    assert sorted(batched) == list(range(len(QUESTIONS)))
+    assert generator.stats.padding_efficiency < 1.0
+    for index, question in enumerate(QUESTIONS):
+        assert batched[index] == unbatched(generator, question), question
+
+
+def test_persisted_prefix_matches_prefilled(model_dir, tmp_path):
+    first = load_generator(model_dir, CHAT_TEMPLATE, cache_dir=tmp_path)
+    expected = {index: text for index, text, _ in first.generate(SYSTEM, QUESTIONS, label="test")}
+    assert list(tmp_path.rglob("*.pt"))
+
+    second = load_generator(model_dir, CHAT_TEMPLATE, cache_dir=tmp_path)
+    assert {index: text for index, text, _ in second.generate(SYSTEM, QUESTIONS, label="test")} == expected
+
+
+def test_fingerprint_follows_weights(model_dir):
+    generator = load_generator(model_dir, None)
+    before = generator._fingerprint()
+    assert load_generator(model_dir, None)._fingerprint() == before
+
+    generator.model.save_pretrained(model_dir)
+    assert generator._fingerprint() != before
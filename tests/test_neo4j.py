@@ -0,0 +1,82 @@
+import pytest
+
+import database.neo4j as neo4j
+
+
+class FakeRecord:
+    def __init__(self, values):
+        self._values = values
+
+    def values(self):
+        return self._values
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+        self.pulled = 0
+        self.consumed = False
+
+    def __iter__(self):
+        for row in self.rows:
+            self.pulled += 1
+            yield FakeRecord(row)
+
+    def consume(self):
+        self.consumed = True
+
+
+class FakeDriver:
+    """Records the session options and serves one result per run."""
+
+    def __init__(self, rows):
+        self.result = FakeResult(rows)
+        self.session_options = None
+
+    def session(self, **options):
+        self.session_options = options
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, cypher, parameters):
+        return self.result
+
+
+@pytest.fixture
+def driver(monkeypatch):
+    driver = FakeDriver([[i, {"name": f"n{i}"}] for i in range(10)])
+    monkeypatch.setattr(neo4j, "_driver", driver)
+    return driver
+
+
+def test_fetch_size_is_passed_to_the_session(driver):
+    neo4j.query_neo4j_rows("MATCH (n) RETURN n", fetch_size=7)
+    assert driver.session_options == {"fetch_size": 7}
+
+
+def test_rows_are_capped_and_the_rest_discarded(driver):
+    rows = neo4j.query_neo4j_rows("MATCH (n) RETURN n", max_rows=3)
+
+    assert rows == [(0, {"name": "n0"}), (1, {"name": "n1"}), (2, {"name": "n2"})]
+    assert driver.result.pulled == 3
+    assert driver.result.consumed
+
+
+def test_all_rows_without_a_cap(driver):
+    assert len(neo4j.query_neo4j_rows("MATCH (n) RETURN n")) == 10
+    assert driver.result.consumed
+
+
+def test_closing_the_stream_early_consumes_the_result(driver):
+    stream = neo4j.stream_neo4j("MATCH (n) RETURN n")
+    assert next(stream) == (0, {"name": "n0"})
+    assert not driver.result.consumed
+
+    stream.close()
+    assert driver.result.consumed
+    assert driver.result.pulled == 1
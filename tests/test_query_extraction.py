@@ -0,0 +1,107 @@
+from types import SimpleNamespace
+
+import pytest
+
+import evaluation.remote_eval_utils as remote_eval_utils
+from evaluation.query_extraction import QueryExtractor, extract_query
+from models import CypherQueryAnalyzer, LLMUsage, SQLQueryAnalyzer
+
+SQL = SQLQueryAnalyzer()
+CYPHER = CypherQueryAnalyzer()
+
+
+def stream(text: str, analyzer) -> QueryExtractor:
+    """Feed ``text`` a few characters at a time, as a streamed response arrives."""
+    extractor = QueryExtractor(analyzer)
+    for i in range(0, len(text), 3):
+        if extractor.feed(text[i:i + 3]):
+            break
+    return extractor
+
+
+@pytest.mark.parametrize("feed", [extract_query, lambda text, analyzer: stream(text, analyzer).query])
+@pytest.mark.parametrize(
+    "text, analyzer, expected",
+    [
+        ("SELECT a FROM t\n\n-- keep x\nWHERE x = 1", SQL, "SELECT a FROM t\n\n-- keep x\nWHERE x = 1"),
+        ("SELECT a FROM t\n\n/* keep x */\nWHERE x = 1", SQL, "SELECT a FROM t\n\n/* keep x */\nWHERE x = 1"),
+        ("MATCH (p:Person)\n\n// by name\nRETURN p.name", CYPHER, "MATCH (p:Person)\n\n// by name\nRETURN p.name"),
+        (
+            "MATCH (p) WHERE p.name = 'O\\'Brien; x' RETURN p; trailing",
+            CYPHER,
+            "MATCH (p) WHERE p.name = 'O\\'Brien; x' RETURN p;",
+        ),
+        ("SELECT 'it''s; fine' AS a; more", SQL, "SELECT 'it''s; fine' AS a;"),
+        ("Here is the query:\n```sql\nSELECT a FROM t;", SQL, "SELECT a FROM t;"),
+        ("Here is the query:\n```sql\nSELECT a\nFROM t\n```\nIt selects a.", SQL, "SELECT a\nFROM t"),
+        ("```cypher\nMATCH (n) RETURN n\n```", CYPHER, "MATCH (n) RETURN n"),
+        ("SELECT a FROM t\n\nThis returns a.", SQL, "SELECT a FROM t"),
+    ],
+)
+def test_extraction(feed, text, analyzer, expected):
+    assert feed(text, analyzer) == expected
+
+
+def test_blank_line_before_fence_is_rechecked():
+    extractor = stream("Sure.\n\nHere it is:\n```sql\nSELECT a\n\nFROM t\n\nThat is all.", SQL)
+    assert extractor.complete
+    assert extractor.query == "SELECT a\n\nFROM t"
+
+
+class FakeStream:
+    def __init__(self, deltas):
+        self.chunks = [SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=d))]) for d in deltas]
+        self.read = 0
+        self.closed = False
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_completion(monkeypatch):
+    fake = FakeStream(["SELECT 1;", " -- the rest", " of the answer"])
+    monkeypatch.setattr(remote_eval_utils, "completion", lambda **kwargs: fake)
+    monkeypatch.setattr(remote_eval_utils, "stream_chunk_builder", lambda chunks, messages: None)
+    monkeypatch.setattr(
+        remote_eval_utils,
+        "get_llm_usage",
+        lambda model, response, ttft, latency: LLMUsage(model=model, prompt_tokens=10, completion_tokens=3),
+    )
+    return fake
+
+
+@pytest.mark.parametrize("stop_early", [False, True])
+def test_early_stop_is_opt_in(fake_completion, monkeypatch, stop_early):
+    monkeypatch.setattr(remote_eval_utils, "_stop_early", stop_early)
+    query, usage = remote_eval_utils._stream_completion("model", [], None, SQL)
+
+    assert query == "SELECT 1;"
+    assert fake_completion.read == (1 if stop_early else 3)
+    assert fake_completion.closed is stop_early
+    assert usage.estimated is stop_early
+
+
+@pytest.mark.parametrize(
+    "query, analyzer",
+    [
+        ("SELECT a, COUNT(*) FROM t GROUP\n\nBY a", SQL),
+        ("SELECT a FROM t ORDER BY a\n\nDESC", SQL),
+        ("SELECT a FROM t WHERE a\n\nIN (1, 2)", SQL),
+        ("SELECT a FROM t WHERE a\n\nIS NULL", SQL),
+        ("SELECT a FROM t WHERE a\n\nBETWEEN 1 AND 2", SQL),
+        ("SELECT a FROM t WHERE b\n\nLIKE 'x%'", SQL),
+        ("MATCH (p:Person)\n\nSET p.seen = true", CYPHER),
+        ("MATCH (p:Person)\n\nMERGE (p)-[:KNOWS]->(q:Person)", CYPHER),
+        ("MATCH (p:Person)\n\nDETACH DELETE p", CYPHER),
+        ("MATCH (p:Person)\n\nCREATE (q:Person {name: p.name})", CYPHER),
+        ("MATCH (p) RETURN CASE WHEN p.age > 18 THEN 'adult'\n\nELSE 'minor' END", CYPHER),
+    ],
+)
+def test_clause_after_blank_line_continues_the_query(query, analyzer):
+    assert stream(query + "\n\nThat is the query.", analyzer).query == query
@@ -0,0 +1,33 @@
+import json
+from dataclasses import replace
+
+import evaluation.re_evaluation as re_evaluation
+from conftest import make_result
+from evaluation.checkpoint import read_jsonl
+from evaluation.re_evaluation import ResultPartition, re_evaluate_results
+from models import DatasetName, TaskDifficulty, TaskType
+
+
+def test_checkpoint_carries_the_new_scores(tmp_path, monkeypatch):
+    old = [make_result("q1").to_dict(), make_result("q2").to_dict()]
+    json_path = tmp_path / "easy.json"
+    json_path.write_text(json.dumps(old))
+    jsonl_path = tmp_path / "easy.jsonl"
+    jsonl_path.write_text("".join(json.dumps(record) + "\n" for record in old))
+
+    partition = ResultPartition(DatasetName.REL_F1, TaskType.SQL, "model", TaskDifficulty.EASY, json_path)
+    monkeypatch.setattr(re_evaluation, "discover_partitions", lambda *args: [partition])
+    monkeypatch.setattr(re_evaluation, "db_path_resolver", {TaskType.SQL: lambda dataset_name: None})
+    monkeypatch.setattr(re_evaluation, "save_task_results", lambda *args: None)
+    monkeypatch.setattr(
+        re_evaluation,
+        "get_task_result",
+        lambda task, query, task_type, db_path, previous: replace(previous, result_f1=0.5),
+    )
+
+    re_evaluate_results()
+
+    records = list(read_jsonl(jsonl_path))
+    assert [record["question"] for record in records] == ["q1", "q2"]
+    assert [record["result_f1"] for record in records] == [0.5, 0.5]
+    assert not jsonl_path.with_name("easy.jsonl.tmp").exists()
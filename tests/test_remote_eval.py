@@ -0,0 +1,72 @@
+import json
+import threading
+
+import pytest
+
+import evaluation.checkpoint as checkpoint
+import evaluation.remote_eval as remote_eval
+from conftest import make_result
+from evaluation.checkpoint import read_jsonl
+from models import DatasetName, TaskDifficulty, TaskType
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    tasks_dir = tmp_path / "tasks"
+    tasks_dir.mkdir()
+    tasks = [{"question": f"q{i}", "sql": "SELECT 1", "cypher": "RETURN 1"} for i in range(4)]
+    (tasks_dir / f"{TaskDifficulty.EASY.value}.json").write_text(json.dumps(tasks))
+
+    published = {}
+    monkeypatch.setattr(remote_eval, "load_schema", lambda task_type, dataset_name: "schema")
+    monkeypatch.setattr(remote_eval, "get_tasks_directory", lambda dataset_name: tasks_dir)
+    monkeypatch.setattr(
+        checkpoint, "get_result_dir", lambda dataset_name, task_type, model: tmp_path / task_type.value
+    )
+    monkeypatch.setattr(
+        remote_eval, "publish_results", lambda writer, dataset, task_type, *args: published.update({task_type: writer.path})
+    )
+    return published
+
+
+def test_interleaved_runs_the_task_types_of_a_task_together(workspace, monkeypatch):
+    # Each task's generations must meet at the barrier: they only pass if both run at once.
+    barrier = threading.Barrier(2, timeout=5)
+    events = []
+
+    def process_task(task, index, task_type, *args):
+        events.append(("start", index, task_type))
+        barrier.wait()
+        events.append(("end", index, task_type))
+        return make_result(task.question, task_type=task_type, response=f"{task_type.value} {index}")
+
+    monkeypatch.setattr(remote_eval, "process_task", process_task)
+    remote_eval.evaluate_remote_interleaved("model", DatasetName.REL_F1, [TaskType.SQL, TaskType.CYPHER])
+
+    indexes = [index for _, index, _ in events]
+    assert indexes == sorted(indexes)
+    for task_type, path in workspace.items():
+        assert [r["question"] for r in read_jsonl(path)] == ["q0", "q1", "q2", "q3"]
+
+
+def test_interleaved_resume_only_runs_missing_types(workspace, monkeypatch):
+    calls = []
+    interrupt_at = ("q2", TaskType.CYPHER)
+
+    def process_task(task, index, task_type, *args):
+        calls.append((task.question, task_type))
+        if (task.question, task_type) == interrupt_at:
+            raise KeyboardInterrupt
+        return make_result(task.question, task_type=task_type)
+
+    monkeypatch.setattr(remote_eval, "process_task", process_task)
+    with pytest.raises(KeyboardInterrupt):
+        remote_eval.evaluate_remote_interleaved("model", DatasetName.REL_F1, [TaskType.SQL, TaskType.CYPHER])
+
+    calls.clear()
+    interrupt_at = None
+    remote_eval.evaluate_remote_interleaved(
+        "model", DatasetName.REL_F1, [TaskType.SQL, TaskType.CYPHER], resume=True
+    )
+
+    assert sorted(calls) == sorted([("q2", TaskType.CYPHER), ("q3", TaskType.SQL), ("q3", TaskType.CYPHER)])
@@ -0,0 +1,140 @@
+from types import SimpleNamespace
+
+import pytest
+
+import evaluation.resilience as resilience
+from evaluation.resilience import (
+    CircuitBreaker,
+    LLMUnavailableError,
+    RetryPolicy,
+    call_with_retry,
+    get_provider_limiter,
+    set_provider_concurrency,
+)
+
+
+class FakeClock:
+    """Stands in for monotonic() and sleep(): sleeping advances the clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(resilience, "monotonic", clock.monotonic)
+    monkeypatch.setattr(resilience, "sleep", clock.sleep)
+    return clock
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def failing(errors, result="ok"):
+    """A call that raises ``errors`` in turn, then returns ``result``."""
+    calls = []
+
+    def fn():
+        calls.append(len(calls))
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    fn.calls = calls
+    return fn
+
+
+def test_backoff_is_jittered_within_the_exponential_bound(monkeypatch):
+    policy = RetryPolicy(base_delay=1.0, max_delay=10.0)
+    bounds = []
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: bounds.append((low, high)) or high)
+
+    assert [policy.delay(attempt) for attempt in range(6)] == [1.0, 2.0, 4.0, 8.0, 10.0, 10.0]
+    assert all(low == 0 for low, _ in bounds)
+
+    monkeypatch.undo()
+    for attempt in range(6):
+        assert 0 <= policy.delay(attempt) <= min(10.0, 2 ** attempt)
+
+
+def test_retry_after_is_honored(clock, monkeypatch):
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: 0.0)
+    fn = failing([ProviderError(429, {"retry-after": "7"}), ProviderError(529, {"retry-after-ms": "2500"})])
+
+    assert call_with_retry(fn, "test") == "ok"
+    assert clock.sleeps == [7.0, 2.5]
+
+
+def test_non_transient_errors_are_not_retried(clock):
+    fn = failing([ProviderError(400)])
+    with pytest.raises(ProviderError):
+        call_with_retry(fn, "test")
+    assert len(fn.calls) == 1
+    assert clock.sleeps == []
+
+
+def test_exhausted_retries_raise_llm_unavailable(clock):
+    fn = failing([ProviderError(503)] * 3)
+    with pytest.raises(LLMUnavailableError, match="failed 3 times"):
+        call_with_retry(fn, "test", policy=RetryPolicy(max_attempts=3, base_delay=0.1))
+    assert len(fn.calls) == 3
+    assert len(clock.sleeps) == 2
+
+
+def test_breaker_opens_half_opens_and_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=10.0)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.wait()
+    assert clock.sleeps == []
+
+    breaker.record_failure()
+    breaker.wait()
+    assert clock.sleeps == [10.0]
+
+    # Half-open after the cooldown: a single failure reopens it.
+    breaker.record_failure()
+    breaker.wait()
+    assert clock.sleeps == [10.0, 10.0]
+
+    # A success closes it, and the failure count starts over.
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.wait()
+    assert clock.sleeps == [10.0, 10.0]
+
+
+def test_retries_wait_for_an_open_breaker(clock, monkeypatch):
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: 0.0)
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=30.0)
+    fn = failing([ProviderError(429)])
+
+    assert call_with_retry(fn, "test", breaker=breaker) == "ok"
+    assert clock.sleeps == [0.0, 30.0]
+
+
+def test_provider_limiters_are_shared_per_provider(monkeypatch):
+    monkeypatch.setattr(resilience, "_limiters", {})
+    monkeypatch.setattr(resilience, "_provider_concurrency", {})
+    set_provider_concurrency({"anthropic": 2})
+
+    limiter = get_provider_limiter("anthropic/claude-sonnet-4-20250514")
+    assert limiter is get_provider_limiter("claude-sonnet-4-20250514")
+    assert limiter is not get_provider_limiter("openai/gpt-4o")
+    assert limiter.semaphore.acquire(blocking=False)
+    assert limiter.semaphore.acquire(blocking=False)
+    assert not limiter.semaphore.acquire(blocking=False)
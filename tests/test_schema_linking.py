@@ -0,0 +1,70 @@
+from evaluation.schema_linking import SchemaLinker, recall_check, terms
+from models import TaskType
+
+SQL_SCHEMA = "\n".join([
+    "Table name: drivers | Columns: driverId (INTEGER, PK), forename (VARCHAR), surname (VARCHAR)",
+    "Table name: results | Columns: resultId (INTEGER, PK), driverId (INTEGER, FK -> drivers), "
+    "raceId (INTEGER, FK -> races), points (DOUBLE)",
+    "Table name: races | Columns: raceId (INTEGER, PK), year (INTEGER), circuitId (INTEGER, FK -> circuits)",
+    "Table name: circuits | Columns: circuitId (INTEGER, PK), location (VARCHAR)",
+    "Table name: constructors | Columns: constructorId (INTEGER, PK), nationality (VARCHAR)",
+])
+
+CYPHER_SCHEMA = "\n".join([
+    "",
+    "Node: drivers(driverId: INTEGER, forename: STRING)",
+    "Node: races(raceId: INTEGER, year: INTEGER)",
+    "Node: circuits(circuitId: INTEGER, location: STRING)",
+    "Node: constructors(constructorId: INTEGER, nationality: STRING)",
+    "",
+    "Relationship: drivers -[DROVE_IN(points)]-> races",
+    "Relationship: races -[HELD_AT]-> circuits",
+    "Relationship: constructors -[COMPETED_IN]-> races",
+])
+
+
+def test_terms_split_identifiers_and_add_trigrams():
+    assert terms("driverId")[:2] == ["driver", "id"]
+    assert "#dr" in terms("driverId")
+
+
+def test_sql_prune_keeps_matches_and_fk_neighbors():
+    linker = SchemaLinker(SQL_SCHEMA, TaskType.SQL, top_k=1)
+    assert linker.select("What is the forename of every driver?") == {"drivers", "results"}
+
+    pruned = linker.prune("What is the forename of every driver?")
+    assert isinstance(pruned, str)
+    assert pruned.splitlines() == SQL_SCHEMA.splitlines()[:2]
+
+
+def test_sql_prune_keeps_list_format():
+    linker = SchemaLinker(SQL_SCHEMA.splitlines(), TaskType.SQL, top_k=1)
+    pruned = linker.prune("Which location hosts circuits?")
+    assert isinstance(pruned, list)
+    assert {line.split(" | ")[0] for line in pruned} == {"Table name: circuits", "Table name: races"}
+
+
+def test_cypher_prune_keeps_relationships_between_selected_labels():
+    linker = SchemaLinker(CYPHER_SCHEMA, TaskType.CYPHER, top_k=1)
+    # races is related to every other label
+    assert linker.select("In which year was a race held?") == {"races", "drivers", "circuits", "constructors"}
+
+    pruned = linker.prune("Which location has circuits?")
+    lines = [line for line in pruned.splitlines() if line]
+    assert lines == [
+        "Node: races(raceId: INTEGER, year: INTEGER)",
+        "Node: circuits(circuitId: INTEGER, location: STRING)",
+        "Relationship: races -[HELD_AT]-> circuits",
+    ]
+
+
+def test_no_match_keeps_whole_schema():
+    linker = SchemaLinker(SQL_SCHEMA, TaskType.SQL, top_k=1)
+    assert linker.select("zzz qqq") == set(linker.items)
+
+
+def test_recall_check():
+    linker = SchemaLinker(SQL_SCHEMA, TaskType.SQL, top_k=1)
+    recall = recall_check(linker, [("forename of every driver", {"drivers"}), ("forename of every driver", {"constructors"})])
+    assert recall["recall"] == 0.5
+    assert recall["complete"] == 0.5
@@ -0,0 +1,37 @@
+import pytest
+
+import evaluation.scoring as scoring
+from models import TaskType
+
+
+@pytest.fixture
+def results(monkeypatch):
+    """Serve query results from a dict instead of a database, with a row bound of 3."""
+    rows_by_query = {}
+    monkeypatch.setattr(scoring, "MAX_RESULT_ROWS", 3)
+    monkeypatch.setattr(scoring, "get_execution_cache", lambda: None)
+    monkeypatch.setattr(scoring, "get_db_fingerprint", lambda task_type, db_path: None)
+    monkeypatch.setattr(
+        scoring,
+        "_timed_query",
+        lambda task_type, query, db_path, max_rows, stage: (rows_by_query[query][:max_rows], 1.0),
+    )
+    return rows_by_query
+
+
+def test_equal_results_match(results):
+    results["gold"] = results["generated"] = [(1,), (2,)]
+    scores = scoring._execution_scores(TaskType.SQL, "generated", "gold", "db")
+    assert scores["execution_accuracy"]
+    assert scores["result_f1"] == 1.0
+
+
+def test_capped_gold_result_is_not_compared(results):
+    results["gold"] = [(i,) for i in range(5)]
+    results["generated"] = [(i,) for i in range(3)] + [(9,), (9,)]
+    scores = scoring._execution_scores(TaskType.SQL, "generated", "gold", "db")
+
+    assert scores["expected_execution"].truncated
+    assert scores["execution_success"]
+    assert not scores["execution_accuracy"]
+    assert scores["result_f1"] == 0.0
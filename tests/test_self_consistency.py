@@ -0,0 +1,96 @@
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+import evaluation.self_consistency as self_consistency
+from evaluation.remote_eval_utils import get_prompt_hash
+from evaluation.self_consistency import combine_usage, vote
+from models import LLMUsage, TaskType
+
+
+@pytest.fixture
+def executions(monkeypatch):
+    """Fake executor: the digest is whatever follows ``-- result`` in the query."""
+    executed = []
+
+    def execute_query(task_type, query, db_path):
+        executed.append(query)
+        if "fail" in query:
+            raise RuntimeError("execution failed")
+        return SimpleNamespace(digest=query.split("-- result ")[1].strip())
+
+    monkeypatch.setattr(self_consistency, "execute_query", execute_query)
+    return executed
+
+
+def run_vote(samples):
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        return vote(TaskType.SQL, samples, None, pool)
+
+
+def test_duplicates_are_executed_once(executions):
+    samples = [
+        "SELECT a FROM t -- result x",
+        "select a from t -- result x",
+        "SELECT b FROM t -- result y",
+    ]
+    query, votes = run_vote(samples)
+    assert len(executions) == 2
+    assert votes.candidates == 2
+    assert votes.votes == {"x": 2, "y": 1}
+    assert votes.winner == "x"
+    assert query == samples[0]
+
+
+def test_different_queries_with_same_result_pool_their_votes(executions):
+    samples = [
+        "SELECT b FROM t -- result y",
+        "SELECT a FROM t -- result x",
+        "SELECT a FROM u -- result x",
+    ]
+    query, votes = run_vote(samples)
+    assert votes.votes == {"y": 1, "x": 2}
+    assert query == samples[1]
+
+
+def test_tie_goes_to_result_sampled_first(executions):
+    samples = ["SELECT b FROM t -- result y", "SELECT a FROM t -- result x"]
+    query, votes = run_vote(samples)
+    assert votes.winner == "y"
+    assert query == samples[0]
+
+
+def test_invalid_and_failing_samples_do_not_vote(executions):
+    samples = ["SELEC nonsense (", "SELECT fail FROM t -- result z", "SELECT a FROM t -- result x"]
+    query, votes = run_vote(samples)
+    assert votes.votes == {"x": 1}
+    assert votes.failed == 2
+    assert query == samples[2]
+
+
+def test_no_valid_sample_falls_back_to_first(executions):
+    query, votes = run_vote(["not a query (", "neither ("])
+    assert query == "not a query ("
+    assert votes.winner is None
+    assert executions == []
+
+
+def test_combine_usage_sums_tokens_and_keeps_wall_clock():
+    usages = [
+        LLMUsage("m", 10, 5, time_to_first_token_ms=30, latency_ms=100, cost_usd=0.1),
+        LLMUsage("m", 10, 7, time_to_first_token_ms=20, latency_ms=150, cost_usd=None),
+    ]
+    combined = combine_usage(usages)
+    assert (combined.prompt_tokens, combined.completion_tokens) == (20, 12)
+    assert (combined.time_to_first_token_ms, combined.latency_ms, combined.cost_usd) == (20, 150, 0.1)
+    assert combine_usage([]) is None
+
+
+def test_prompt_hash_depends_on_samples():
+    single = get_prompt_hash(TaskType.SQL, "CREATE TABLE t (a INT);")
+    assert get_prompt_hash(TaskType.SQL, "CREATE TABLE t (a INT);", samples=1) == single
+    assert get_prompt_hash(TaskType.SQL, "CREATE TABLE t (a INT);", samples=5) != single
+    assert get_prompt_hash(TaskType.SQL, "CREATE TABLE t (a INT);", samples=3) != get_prompt_hash(
+        TaskType.SQL, "CREATE TABLE t (a INT);", samples=5
+    )
@@ -0,0 +1,20 @@
+import pytest
+
+import evaluation.sweep as sweep
+from models import TaskType
+
+
+def test_cypher_sweep_rejects_several_datasets(monkeypatch):
+    monkeypatch.setattr(sweep, "load_schema", lambda *args: pytest.fail("schemas loaded before validation"))
+    with pytest.raises(ValueError, match="Neo4j"):
+        sweep.evaluate_sweep(["anthropic/model"], ["rel-f1", "rel-stack"], [TaskType.SQL, TaskType.CYPHER])
+
+
+def test_sql_sweep_accepts_several_datasets(monkeypatch):
+    jobs = []
+    monkeypatch.setattr(sweep, "load_schema", lambda *args: "schema")
+    monkeypatch.setattr(sweep, "evaluate_remote_interleaved", lambda model, dataset, *args: jobs.append((model, dataset)))
+    outcomes = sweep.evaluate_sweep(["anthropic/model"], ["rel-f1", "rel-stack"], [TaskType.SQL])
+
+    assert sorted(jobs) == [("anthropic/model", "rel-f1"), ("anthropic/model", "rel-stack")]
+    assert all(outcome.error is None for outcome in outcomes)